@@ -370,8 +370,41 @@ def migrate_knowledge_vector_database():
                     fg='green'))
 
 
+@click.command('backfill-message-search-vector', help='Backfill the full text search vector of existing messages.')
+@click.option('--batch-size', default=1000, help='The number of messages updated in each transaction.')
+def backfill_message_search_vector(batch_size: int):
+    """
+    Backfill the search vector of the messages created before the search vector migration,
+    walking the messages by id so that each batch only reads its own range and is committed on its own.
+    """
+    click.echo(click.style('Start backfill message search vector.', fg='green'))
+    updated_count = 0
+    last_id = None
+    while True:
+        ids = db.session.execute(db.text(
+            'SELECT id FROM messages WHERE id > :last_id ORDER BY id LIMIT :batch_size'
+            if last_id else
+            'SELECT id FROM messages ORDER BY id LIMIT :batch_size'
+        ), {'last_id': last_id, 'batch_size': batch_size}).scalars().all()
+        if not ids:
+            break
+
+        result = db.session.execute(db.text(
+            'UPDATE messages SET search_vector = message_search_vector(query, answer) '
+            'WHERE id >= :first_id AND id <= :last_id AND search_vector IS NULL'
+        ), {'first_id': ids[0], 'last_id': ids[-1]})
+        db.session.commit()
+
+        updated_count += result.rowcount
+        last_id = ids[-1]
+        click.echo(f'Updated {updated_count} messages, up to message {last_id}.')
+
+    click.echo(click.style(f'Congratulations! Backfilled the search vector of {updated_count} messages.', fg='green'))
+
+
 def register_commands(app):
     app.cli.add_command(reset_password)
     app.cli.add_command(reset_email)
     app.cli.add_command(reset_encrypt_key_pair)
     app.cli.add_command(vdb_migrate)
+    app.cli.add_command(backfill_message_search_vector)
@@ -52,6 +52,9 @@ DEFAULTS = {
     'UPLOAD_FILE_SIZE_LIMIT': 15,
     'UPLOAD_FILE_BATCH_LIMIT': 5,
     'UPLOAD_IMAGE_FILE_SIZE_LIMIT': 10,
+    'ASR_AUDIO_SPOOL_MAX_SIZE': 1,
+    'ASR_AUDIO_NORMALIZATION_ENABLED': 'False',
+    'ASR_AUDIO_NORMALIZATION_MAX_WORKERS': 2,
     'OUTPUT_MODERATION_BUFFER_SIZE': 300,
     'MULTIMODAL_SEND_IMAGE_FORMAT': 'base64',
     'INVITE_EXPIRY_HOURS': 72,
@@ -59,7 +62,18 @@ DEFAULTS = {
     'CAN_REPLACE_LOGO': 'False',
     'ETL_TYPE': 'dify',
     'KEYWORD_STORE': 'jieba',
-    'BATCH_UPLOAD_LIMIT': 20
+    'BATCH_UPLOAD_LIMIT': 20,
+    'AGENT_TOOL_PARALLEL_ENABLED': 'True',
+    'AGENT_TOOL_PARALLEL_MAX_WORKERS': 4,
+    'AGENT_TOOL_INVOKE_TIMEOUT': 60,
+    'RERANK_DOCUMENT_MAX_TOKENS': 2048,
+    'RERANK_CACHE_TTL': 86400,
+    'EMBEDDING_MICRO_BATCH_ENABLED': 'False',
+    'EMBEDDING_MICRO_BATCH_WAIT_MS': 5,
+    'MODEL_CIRCUIT_BREAKER_ENABLED': 'False',
+    'MODEL_CIRCUIT_BREAKER_FAILURE_THRESHOLD': 5,
+    'MODEL_CIRCUIT_BREAKER_RECOVERY_TIMEOUT': 30,
+    'MODEL_MAX_CONCURRENT_INVOKES': 64,
 }
 
 
@@ -246,9 +260,46 @@ class Config:
         self.UPLOAD_FILE_BATCH_LIMIT = int(get_env('UPLOAD_FILE_BATCH_LIMIT'))
         self.UPLOAD_IMAGE_FILE_SIZE_LIMIT = int(get_env('UPLOAD_IMAGE_FILE_SIZE_LIMIT'))
 
+        # Speech to text Configurations.
+        # uploaded audio larger than this many MB is spooled to a temporary file instead of memory
+        self.ASR_AUDIO_SPOOL_MAX_SIZE = int(get_env('ASR_AUDIO_SPOOL_MAX_SIZE'))
+        # transcode uploaded audio to 16kHz mono mp3 with ffmpeg before it is sent to the provider
+        self.ASR_AUDIO_NORMALIZATION_ENABLED = get_bool_env('ASR_AUDIO_NORMALIZATION_ENABLED')
+        self.ASR_AUDIO_NORMALIZATION_MAX_WORKERS = int(get_env('ASR_AUDIO_NORMALIZATION_MAX_WORKERS'))
+
         # Moderation in app Configurations.
         self.OUTPUT_MODERATION_BUFFER_SIZE = int(get_env('OUTPUT_MODERATION_BUFFER_SIZE'))
 
+        # Agent tool Configurations.
+        # invoke the independent tool calls of one agent turn concurrently
+        self.AGENT_TOOL_PARALLEL_ENABLED = get_bool_env('AGENT_TOOL_PARALLEL_ENABLED')
+        self.AGENT_TOOL_PARALLEL_MAX_WORKERS = int(get_env('AGENT_TOOL_PARALLEL_MAX_WORKERS'))
+        # seconds to wait for each run of tools invoked in parallel in one agent turn,
+        # timed out tools are reported to the model as errors but keep running in the background
+        self.AGENT_TOOL_INVOKE_TIMEOUT = float(get_env('AGENT_TOOL_INVOKE_TIMEOUT'))
+
+        # Rerank Configurations.
+        # documents are truncated to this many tokens before reranking, 0 to disable
+        self.RERANK_DOCUMENT_MAX_TOKENS = int(get_env('RERANK_DOCUMENT_MAX_TOKENS'))
+        # seconds to cache the rerank score of a (query, document, model), 0 to disable
+        self.RERANK_CACHE_TTL = int(get_env('RERANK_CACHE_TTL'))
+
+        # Embedding Configurations.
+        # send the concurrent query embeddings of the same model to the provider in one batch
+        self.EMBEDDING_MICRO_BATCH_ENABLED = get_bool_env('EMBEDDING_MICRO_BATCH_ENABLED')
+        # milliseconds the first query of a batch waits for concurrent queries
+        self.EMBEDDING_MICRO_BATCH_WAIT_MS = int(get_env('EMBEDDING_MICRO_BATCH_WAIT_MS'))
+
+        # Model provider health Configurations.
+        # reject invokes of provider credentials which keep failing with rate limit, server or connection errors
+        self.MODEL_CIRCUIT_BREAKER_ENABLED = get_bool_env('MODEL_CIRCUIT_BREAKER_ENABLED')
+        # consecutive failures which open the circuit
+        self.MODEL_CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(get_env('MODEL_CIRCUIT_BREAKER_FAILURE_THRESHOLD'))
+        # seconds the circuit stays open before a trial invoke is let through
+        self.MODEL_CIRCUIT_BREAKER_RECOVERY_TIMEOUT = float(get_env('MODEL_CIRCUIT_BREAKER_RECOVERY_TIMEOUT'))
+        # upper bound of the concurrent invokes of a provider credentials, lowered adaptively on failures
+        self.MODEL_MAX_CONCURRENT_INVOKES = int(get_env('MODEL_MAX_CONCURRENT_INVOKES'))
+
         # Notion integration setting
         self.NOTION_CLIENT_ID = get_env('NOTION_CLIENT_ID')
         self.NOTION_CLIENT_SECRET = get_env('NOTION_CLIENT_SECRET')
@@ -8,6 +8,8 @@ from werkzeug.exceptions import NotFound, Unauthorized
 from constants.languages import supported_language
 from controllers.console import api
 from controllers.console.wraps import only_edition_cloud
+from core.model_runtime.utils.client_pool import model_async_client_pool, model_client_pool
+from core.model_runtime.utils.provider_health import provider_health_tracker
 from extensions.ext_database import db
 from models.model import App, InstalledApp, RecommendedApp
 
@@ -130,5 +132,21 @@ class InsertExploreAppApi(Resource):
         return {'result': 'success'}, 204
 
 
+class ModelProviderHealthApi(Resource):
+    @admin_required
+    def get(self):
+        # the health is tracked per process, so this is the health seen by the worker which serves the request
+        return {'data': provider_health_tracker.get_states()}
+
+
+class ModelClientPoolApi(Resource):
+    @admin_required
+    def get(self):
+        # the pool is per process as well, hits, misses and evictions of the worker which serves the request
+        return {'data': {**model_client_pool.get_metrics(), 'async': model_async_client_pool.get_metrics()}}
+
+
 api.add_resource(InsertExploreAppListApi, '/admin/insert-explore-apps')
 api.add_resource(InsertExploreAppApi, '/admin/insert-explore-apps/<uuid:app_id>')
+api.add_resource(ModelProviderHealthApi, '/admin/model-provider-health')
+api.add_resource(ModelClientPoolApi, '/admin/model-client-pool')
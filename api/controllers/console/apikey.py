@@ -8,6 +8,7 @@ from libs.helper import TimestampField
 from libs.login import login_required
 from models.dataset import Dataset
 from models.model import ApiToken, App
+from services.api_token_service import ApiTokenService
 
 from . import api
 from .setup import setup_required
@@ -111,6 +112,7 @@ class BaseApiKeyResource(Resource):
         if key is None:
             flask_restful.abort(404, message='API key not found')
 
+        ApiTokenService.delete_api_token_cache(key)
         db.session.query(ApiToken).filter(ApiToken.id == api_key_id).delete()
         db.session.commit()
 
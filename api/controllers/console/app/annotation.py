@@ -117,8 +117,20 @@ class AnnotationListApi(Resource):
         page = request.args.get('page', default=1, type=int)
         limit = request.args.get('limit', default=20, type=int)
         keyword = request.args.get('keyword', default=None, type=str)
+        cursor = request.args.get('cursor', default=None, type=str)
 
         app_id = str(app_id)
+        # cursor based pagination, for deep pages of large apps
+        if cursor is not None:
+            annotations = AppAnnotationService.get_annotation_list_by_cursor(app_id, cursor, min(limit, 100), keyword)
+            response = {
+                'data': marshal(annotations.items, annotation_fields),
+                'has_more': annotations.has_next,
+                'limit': annotations.per_page,
+                'next_cursor': annotations.next_cursor
+            }
+            return response, 200
+
         annotation_list, total = AppAnnotationService.get_annotation_list_by_app_id(app_id, page, limit, keyword)
         response = {
             'data': marshal(annotation_list, annotation_fields),
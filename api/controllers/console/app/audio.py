@@ -40,9 +40,11 @@ class ChatMessageAudioApi(Resource):
         app_id = str(app_id)
         app_model = _get_app(app_id, 'chat')
 
-        file = request.files['file']
-
         try:
+            # reject oversized uploads before the multipart body is parsed
+            AudioService.check_upload_size(request.content_length)
+            file = request.files.get('file')
+
             response = AudioService.transcript_asr(
                 tenant_id=app_model.tenant_id,
                 file=file,
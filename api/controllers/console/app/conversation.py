@@ -1,12 +1,13 @@
 from datetime import datetime
 
 import pytz
+from flask import Response, stream_with_context
 from flask_login import current_user
 from flask_restful import Resource, marshal_with, reqparse
 from flask_restful.inputs import int_range
-from sqlalchemy import func, or_
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import joinedload
-from werkzeug.exceptions import NotFound
+from werkzeug.exceptions import Forbidden, NotFound
 
 from controllers.console import api
 from controllers.console.app import _get_app
@@ -20,8 +21,10 @@ from fields.conversation_fields import (
     conversation_with_summary_pagination_fields,
 )
 from libs.helper import datetime_string
+from libs.keyset_pagination import keyset_paginate
 from libs.login import login_required
 from models.model import Conversation, Message, MessageAnnotation
+from services.app_log_export_service import AppLogExportService
 
 
 class CompletionConversationApi(Resource):
@@ -40,6 +43,7 @@ class CompletionConversationApi(Resource):
         parser.add_argument('annotation_status', type=str,
                             choices=['annotated', 'not_annotated', 'all'], default='all', location='args')
         parser.add_argument('page', type=int_range(1, 99999), default=1, location='args')
+        parser.add_argument('cursor', type=str, location='args')
         parser.add_argument('limit', type=int_range(1, 100), default=20, location='args')
         args = parser.parse_args()
 
@@ -49,14 +53,7 @@ class CompletionConversationApi(Resource):
         query = db.select(Conversation).where(Conversation.app_id == app.id, Conversation.mode == 'completion')
 
         if args['keyword']:
-            query = query.join(
-                Message, Message.conversation_id == Conversation.id
-            ).filter(
-                or_(
-                    Message.query.ilike('%{}%'.format(args['keyword'])),
-                    Message.answer.ilike('%{}%'.format(args['keyword']))
-                )
-            )
+            query = query.where(Conversation.id.in_(_search_message_conversation_ids(app.id, args['keyword'])))
 
         account = current_user
         timezone = pytz.timezone(account.timezone)
@@ -81,14 +78,21 @@ class CompletionConversationApi(Resource):
             query = query.where(Conversation.created_at < end_datetime_utc)
 
         if args['annotation_status'] == "annotated":
-            query = query.options(joinedload(Conversation.message_annotations)).join(
-                MessageAnnotation, MessageAnnotation.conversation_id == Conversation.id
-            )
+            # a filter instead of a join, conversations with several annotations must be one row of the page
+            query = query.where(Conversation.id.in_(
+                db.select(MessageAnnotation.conversation_id).where(MessageAnnotation.app_id == app.id)
+            ))
         elif args['annotation_status'] == "not_annotated":
             query = query.outerjoin(
                 MessageAnnotation, MessageAnnotation.conversation_id == Conversation.id
             ).group_by(Conversation.id).having(func.count(MessageAnnotation.id) == 0)
 
+        # cursor based pagination, for deep pages of large apps
+        if args['cursor'] is not None:
+            conversations = keyset_paginate(query, Conversation, args['cursor'], args['limit'])
+            Conversation.preload(conversations.items)
+            return conversations
+
         query = query.order_by(Conversation.created_at.desc())
 
         conversations = db.paginate(
@@ -98,6 +102,9 @@ class CompletionConversationApi(Resource):
             error_out=False
         )
 
+        # prefetch the properties marshalled for each conversation
+        Conversation.preload(conversations.items)
+
         return conversations
 
 
@@ -151,6 +158,7 @@ class ChatConversationApi(Resource):
                             choices=['annotated', 'not_annotated', 'all'], default='all', location='args')
         parser.add_argument('message_count_gte', type=int_range(1, 99999), required=False, location='args')
         parser.add_argument('page', type=int_range(1, 99999), required=False, default=1, location='args')
+        parser.add_argument('cursor', type=str, location='args')
         parser.add_argument('limit', type=int_range(1, 100), required=False, default=20, location='args')
         args = parser.parse_args()
 
@@ -160,16 +168,12 @@ class ChatConversationApi(Resource):
         query = db.select(Conversation).where(Conversation.app_id == app.id, Conversation.mode == 'chat')
 
         if args['keyword']:
-            query = query.join(
-                Message, Message.conversation_id == Conversation.id
-            ).filter(
+            query = query.where(
                 or_(
-                    Message.query.ilike('%{}%'.format(args['keyword'])),
-                    Message.answer.ilike('%{}%'.format(args['keyword'])),
+                    Conversation.id.in_(_search_message_conversation_ids(app.id, args['keyword'])),
                     Conversation.name.ilike('%{}%'.format(args['keyword'])),
                     Conversation.introduction.ilike('%{}%'.format(args['keyword'])),
-                ),
-
+                )
             )
 
         account = current_user
@@ -195,9 +199,10 @@ class ChatConversationApi(Resource):
             query = query.where(Conversation.created_at < end_datetime_utc)
 
         if args['annotation_status'] == "annotated":
-            query = query.options(joinedload(Conversation.message_annotations)).join(
-                MessageAnnotation, MessageAnnotation.conversation_id == Conversation.id
-            )
+            # a filter instead of a join, conversations with several annotations must be one row of the page
+            query = query.where(Conversation.id.in_(
+                db.select(MessageAnnotation.conversation_id).where(MessageAnnotation.app_id == app.id)
+            ))
         elif args['annotation_status'] == "not_annotated":
             query = query.outerjoin(
                 MessageAnnotation, MessageAnnotation.conversation_id == Conversation.id
@@ -211,6 +216,12 @@ class ChatConversationApi(Resource):
                 .having(func.count(Message.id) >= args['message_count_gte'])
             )
 
+        # cursor based pagination, for deep pages of large apps
+        if args['cursor'] is not None:
+            conversations = keyset_paginate(query, Conversation, args['cursor'], args['limit'])
+            Conversation.preload(conversations.items)
+            return conversations
+
         query = query.order_by(Conversation.created_at.desc())
 
         conversations = db.paginate(
@@ -220,6 +231,9 @@ class ChatConversationApi(Resource):
             error_out=False
         )
 
+        # prefetch the properties marshalled for each conversation
+        Conversation.preload(conversations.items)
+
         return conversations
 
 
@@ -257,10 +271,89 @@ class ChatConversationDetailApi(Resource):
         return {'result': 'success'}, 204
 
 
+class AppLogExportApi(Resource):
+
+    @setup_required
+    @login_required
+    @account_initialization_required
+    def get(self, app_id):
+        app_id = str(app_id)
+
+        # The role of the current user in the ta table must be admin or owner
+        if not current_user.is_admin_or_owner:
+            raise Forbidden()
+
+        parser = reqparse.RequestParser()
+        parser.add_argument('format', type=str, choices=['ndjson', 'csv'], default='ndjson', location='args')
+        parser.add_argument('start', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
+        parser.add_argument('end', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
+        args = parser.parse_args()
+
+        # get app info
+        app = _get_app(app_id)
+
+        account = current_user
+        timezone = pytz.timezone(account.timezone)
+        utc_timezone = pytz.utc
+
+        start_datetime_utc = None
+        if args['start']:
+            start_datetime = datetime.strptime(args['start'], '%Y-%m-%d %H:%M')
+            start_datetime = start_datetime.replace(second=0)
+
+            start_datetime_timezone = timezone.localize(start_datetime)
+            start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
+
+        end_datetime_utc = None
+        if args['end']:
+            end_datetime = datetime.strptime(args['end'], '%Y-%m-%d %H:%M')
+            end_datetime = end_datetime.replace(second=59)
+
+            end_datetime_timezone = timezone.localize(end_datetime)
+            end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
+
+        export = AppLogExportService.export_messages(
+            app_model=app,
+            export_format=args['format'],
+            start=start_datetime_utc,
+            end=end_datetime_utc
+        )
+
+        if args['format'] == 'csv':
+            mimetype = 'text/csv'
+        else:
+            mimetype = 'application/x-ndjson'
+
+        return Response(stream_with_context(export), status=200, mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename=app-{app.id}-logs.{args["format"]}'
+        })
+
+
 api.add_resource(CompletionConversationApi, '/apps/<uuid:app_id>/completion-conversations')
 api.add_resource(CompletionConversationDetailApi, '/apps/<uuid:app_id>/completion-conversations/<uuid:conversation_id>')
 api.add_resource(ChatConversationApi, '/apps/<uuid:app_id>/chat-conversations')
 api.add_resource(ChatConversationDetailApi, '/apps/<uuid:app_id>/chat-conversations/<uuid:conversation_id>')
+api.add_resource(AppLogExportApi, '/apps/<uuid:app_id>/logs/export')
+
+
+def _search_message_conversation_ids(app_id, keyword):
+    """
+    Ids of the conversations which have messages matching the keyword, using the full text index of messages.
+    Messages which are not backfilled yet have no search vector, they are still matched by ILIKE.
+    """
+    return db.select(Message.conversation_id).where(
+        Message.app_id == app_id,
+        or_(
+            Message.search_vector.op('@@')(func.message_search_query(keyword)),
+            and_(
+                Message.search_vector.is_(None),
+                or_(
+                    Message.query.ilike('%{}%'.format(keyword)),
+                    Message.answer.ilike('%{}%'.format(keyword))
+                )
+            )
+        )
+    )
 
 
 def _get_conversation(app_id, conversation_id, mode):
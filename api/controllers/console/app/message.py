@@ -30,6 +30,7 @@ from libs.infinite_scroll_pagination import InfiniteScrollPagination
 from libs.login import login_required
 from models.model import Conversation, Message, MessageAnnotation, MessageFeedback
 from services.annotation_service import AppAnnotationService
+from services.app_statistic_service import AppStatisticService
 from services.completion_service import CompletionService
 from services.errors.app import MoreLikeThisDisabledError
 from services.errors.conversation import ConversationNotExistsError
@@ -98,6 +99,7 @@ class ChatMessageListApi(Resource):
                 has_more = True
 
         history_messages = list(reversed(history_messages))
+        Message.preload(history_messages)
 
         return InfiniteScrollPagination(
             data=history_messages,
@@ -152,6 +154,10 @@ class MessageFeedbackApi(Resource):
 
         db.session.commit()
 
+        if not args['rating']:
+            # deleted feedbacks are not picked up by the incremental statistics rollup
+            AppStatisticService.mark_stale(message.app_id, message.created_at)
+
         return {'result': 'success'}
 
 
@@ -9,6 +9,7 @@ from controllers.console.app import _get_app
 from controllers.console.setup import setup_required
 from controllers.console.wraps import account_initialization_required
 from core.entities.application_entities import AgentToolEntity
+from core.helper.app_model_config_cache import AppModelConfigCache
 from core.tools.tool_manager import ToolManager
 from core.tools.utils.configuration import ToolParameterConfigurationManager
 from events.app_event import app_model_config_was_updated
@@ -124,6 +125,9 @@ class ModelConfigResource(Resource):
         app.app_model_config_id = new_app_model_config.id
         db.session.commit()
 
+        # the replaced config is only read by the former conversations from now on
+        AppModelConfigCache(original_app_model_config.id).delete()
+
         app_model_config_was_updated.send(
             app,
             app_model_config=new_app_model_config
@@ -13,53 +13,108 @@ from controllers.console.wraps import account_initialization_required
 from extensions.ext_database import db
 from libs.helper import datetime_string
 from libs.login import login_required
+from services.app_statistic_service import ROLLUP_PERIOD, AppStatisticService, floor_rollup_period
 
 
-class DailyConversationStatistic(Resource):
+def _get_statistic_arg_dict(app_model) -> dict:
+    """
+    Get the sql args of the statistic of an app, with the requested time range converted to utc.
 
-    @setup_required
-    @login_required
-    @account_initialization_required
-    def get(self, app_id):
-        account = current_user
-        app_id = str(app_id)
-        app_model = _get_app(app_id)
+    Rollup periods which are entirely within the requested range and before the rollup end are read from the rollup,
+    the messages of the partial periods at both ends of the range and the later messages are read directly.
+    """
+    parser = reqparse.RequestParser()
+    parser.add_argument('start', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
+    parser.add_argument('end', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
+    args = parser.parse_args()
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('start', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        parser.add_argument('end', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        args = parser.parse_args()
+    account = current_user
+    arg_dict = {
+        'tz': account.timezone,
+        'app_id': app_model.id,
+        'covered_until': AppStatisticService.get_rollup_until()
+    }
 
-        sql_query = '''
-        SELECT date(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date, count(distinct messages.conversation_id) AS conversation_count
-            FROM messages where app_id = :app_id 
-        '''
-        arg_dict = {'tz': account.timezone, 'app_id': app_model.id}
+    timezone = pytz.timezone(account.timezone)
+    utc_timezone = pytz.utc
+
+    if args['start']:
+        start_datetime = datetime.strptime(args['start'], '%Y-%m-%d %H:%M')
+        start_datetime = start_datetime.replace(second=0)
+
+        start_datetime_timezone = timezone.localize(start_datetime)
+        arg_dict['start'] = start_datetime_timezone.astimezone(utc_timezone)
+
+        start_utc = arg_dict['start'].replace(tzinfo=None)
+        covered_since = floor_rollup_period(start_utc)
+        if covered_since < start_utc:
+            covered_since += ROLLUP_PERIOD
+        arg_dict['covered_since'] = covered_since
+
+    if args['end']:
+        end_datetime = datetime.strptime(args['end'], '%Y-%m-%d %H:%M')
+        end_datetime = end_datetime.replace(second=0)
 
-        timezone = pytz.timezone(account.timezone)
-        utc_timezone = pytz.utc
+        end_datetime_timezone = timezone.localize(end_datetime)
+        arg_dict['end'] = end_datetime_timezone.astimezone(utc_timezone)
 
-        if args['start']:
-            start_datetime = datetime.strptime(args['start'], '%Y-%m-%d %H:%M')
-            start_datetime = start_datetime.replace(second=0)
+        arg_dict['covered_until'] = min(arg_dict['covered_until'],
+                                        floor_rollup_period(arg_dict['end'].replace(tzinfo=None)))
 
-            start_datetime_timezone = timezone.localize(start_datetime)
-            start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
+    return arg_dict
 
-            sql_query += ' and created_at >= :start'
-            arg_dict['start'] = start_datetime_utc
 
-        if args['end']:
-            end_datetime = datetime.strptime(args['end'], '%Y-%m-%d %H:%M')
-            end_datetime = end_datetime.replace(second=0)
+def _time_range_condition(column: str, arg_dict: dict) -> str:
+    condition = ''
+    if 'start' in arg_dict:
+        condition += f' and {column} >= :start'
+
+    if 'end' in arg_dict:
+        condition += f' and {column} < :end'
+
+    return condition
+
+
+def _not_rolled_up_condition(column: str, arg_dict: dict) -> str:
+    # the rows of the requested range which are outside of the periods read from the rollup
+    condition = f'{column} >= :covered_until'
+    if 'covered_since' in arg_dict:
+        condition = f'({condition} or {column} < :covered_since)'
+
+    return f' and {condition}{_time_range_condition(column, arg_dict)}'
+
+
+def _rollup_query(columns: str, arg_dict: dict) -> str:
+    condition = ' and period_start >= :covered_since' if 'covered_since' in arg_dict else ''
+    return f'''SELECT date(DATE_TRUNC('day', period_start AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date, {columns}
+            FROM app_statistic_rollups
+            WHERE app_id = :app_id and period_start < :covered_until{condition}'''
+
+
+def _message_query(columns: str, arg_dict: dict) -> str:
+    return f'''SELECT date(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date, {columns}
+            FROM messages
+            WHERE app_id = :app_id{_not_rolled_up_condition('created_at', arg_dict)}'''
+
+
+class DailyConversationStatistic(Resource):
 
-            end_datetime_timezone = timezone.localize(end_datetime)
-            end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
+    @setup_required
+    @login_required
+    @account_initialization_required
+    def get(self, app_id):
+        app_id = str(app_id)
+        app_model = _get_app(app_id)
 
-            sql_query += ' and created_at < :end'
-            arg_dict['end'] = end_datetime_utc
+        arg_dict = _get_statistic_arg_dict(app_model)
 
-        sql_query += ' GROUP BY date order by date'
+        sql_query = f'''
+        SELECT date, count(distinct conversation_id) AS conversation_count FROM (
+            {_rollup_query('unnest(conversation_ids) AS conversation_id', arg_dict)}
+            UNION ALL
+            {_message_query('conversation_id', arg_dict)}
+        ) statistic GROUP BY date order by date
+        '''
 
         response_data = []
 
@@ -82,50 +137,23 @@ class DailyTerminalsStatistic(Resource):
     @login_required
     @account_initialization_required
     def get(self, app_id):
-        account = current_user
         app_id = str(app_id)
         app_model = _get_app(app_id)
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('start', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        parser.add_argument('end', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        args = parser.parse_args()
-
-        sql_query = '''
-                SELECT date(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date, count(distinct messages.from_end_user_id) AS terminal_count
-                    FROM messages where app_id = :app_id 
-                '''
-        arg_dict = {'tz': account.timezone, 'app_id': app_model.id}
-
-        timezone = pytz.timezone(account.timezone)
-        utc_timezone = pytz.utc
-
-        if args['start']:
-            start_datetime = datetime.strptime(args['start'], '%Y-%m-%d %H:%M')
-            start_datetime = start_datetime.replace(second=0)
-
-            start_datetime_timezone = timezone.localize(start_datetime)
-            start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and created_at >= :start'
-            arg_dict['start'] = start_datetime_utc
+        arg_dict = _get_statistic_arg_dict(app_model)
 
-        if args['end']:
-            end_datetime = datetime.strptime(args['end'], '%Y-%m-%d %H:%M')
-            end_datetime = end_datetime.replace(second=0)
-
-            end_datetime_timezone = timezone.localize(end_datetime)
-            end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and created_at < :end'
-            arg_dict['end'] = end_datetime_utc
-
-        sql_query += ' GROUP BY date order by date'
+        sql_query = f'''
+        SELECT date, count(distinct end_user_id) AS terminal_count FROM (
+            {_rollup_query('unnest(end_user_ids) AS end_user_id', arg_dict)}
+            UNION ALL
+            {_message_query('from_end_user_id AS end_user_id', arg_dict)}
+        ) statistic GROUP BY date order by date
+        '''
 
         response_data = []
 
         with db.engine.begin() as conn:
-            rs = conn.execute(db.text(sql_query), arg_dict)            
+            rs = conn.execute(db.text(sql_query), arg_dict)
             for i in rs:
                 response_data.append({
                     'date': str(i.date),
@@ -138,51 +166,23 @@ class DailyTerminalsStatistic(Resource):
 
 
 class DailyTokenCostStatistic(Resource):
+
     @setup_required
     @login_required
     @account_initialization_required
     def get(self, app_id):
-        account = current_user
         app_id = str(app_id)
         app_model = _get_app(app_id)
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('start', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        parser.add_argument('end', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        args = parser.parse_args()
-
-        sql_query = '''
-                SELECT date(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date, 
-                    (sum(messages.message_tokens) + sum(messages.answer_tokens)) as token_count,
-                    sum(total_price) as total_price
-                    FROM messages where app_id = :app_id 
-                '''
-        arg_dict = {'tz': account.timezone, 'app_id': app_model.id}
-
-        timezone = pytz.timezone(account.timezone)
-        utc_timezone = pytz.utc
-
-        if args['start']:
-            start_datetime = datetime.strptime(args['start'], '%Y-%m-%d %H:%M')
-            start_datetime = start_datetime.replace(second=0)
-
-            start_datetime_timezone = timezone.localize(start_datetime)
-            start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and created_at >= :start'
-            arg_dict['start'] = start_datetime_utc
-
-        if args['end']:
-            end_datetime = datetime.strptime(args['end'], '%Y-%m-%d %H:%M')
-            end_datetime = end_datetime.replace(second=0)
+        arg_dict = _get_statistic_arg_dict(app_model)
 
-            end_datetime_timezone = timezone.localize(end_datetime)
-            end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and created_at < :end'
-            arg_dict['end'] = end_datetime_utc
-
-        sql_query += ' GROUP BY date order by date'
+        sql_query = f'''
+        SELECT date, CAST(sum(token_count) AS bigint) AS token_count, sum(total_price) AS total_price FROM (
+            {_rollup_query('token_count, total_price', arg_dict)} and message_count > 0
+            UNION ALL
+            {_message_query('message_tokens + answer_tokens AS token_count, total_price', arg_dict)}
+        ) statistic GROUP BY date order by date
+        '''
 
         response_data = []
 
@@ -202,58 +202,33 @@ class DailyTokenCostStatistic(Resource):
 
 
 class AverageSessionInteractionStatistic(Resource):
+
     @setup_required
     @login_required
     @account_initialization_required
     def get(self, app_id):
-        account = current_user
         app_id = str(app_id)
         app_model = _get_app(app_id, 'chat')
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('start', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        parser.add_argument('end', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        args = parser.parse_args()
-
-        sql_query = """SELECT date(DATE_TRUNC('day', c.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date, 
-AVG(subquery.message_count) AS interactions
-FROM (SELECT m.conversation_id, COUNT(m.id) AS message_count
-    FROM conversations c
-    JOIN messages m ON c.id = m.conversation_id
-    WHERE c.override_model_configs IS NULL AND c.app_id = :app_id"""
-        arg_dict = {'tz': account.timezone, 'app_id': app_model.id}
-
-        timezone = pytz.timezone(account.timezone)
-        utc_timezone = pytz.utc
-
-        if args['start']:
-            start_datetime = datetime.strptime(args['start'], '%Y-%m-%d %H:%M')
-            start_datetime = start_datetime.replace(second=0)
-
-            start_datetime_timezone = timezone.localize(start_datetime)
-            start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and c.created_at >= :start'
-            arg_dict['start'] = start_datetime_utc
-
-        if args['end']:
-            end_datetime = datetime.strptime(args['end'], '%Y-%m-%d %H:%M')
-            end_datetime = end_datetime.replace(second=0)
-
-            end_datetime_timezone = timezone.localize(end_datetime)
-            end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and c.created_at < :end'
-            arg_dict['end'] = end_datetime_utc
-
-        sql_query += """
-        GROUP BY m.conversation_id) subquery
-LEFT JOIN conversations c on c.id=subquery.conversation_id
-GROUP BY date
-ORDER BY date"""
+        arg_dict = _get_statistic_arg_dict(app_model)
+
+        sql_query = f'''
+        SELECT date, CAST(sum(message_count) AS numeric) / sum(conversation_count) AS interactions FROM (
+            {_rollup_query('session_count AS conversation_count, session_message_count AS message_count', arg_dict)}
+                and session_count > 0
+            UNION ALL
+            SELECT date(DATE_TRUNC('day', c.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+                1 AS conversation_count, COUNT(m.id) AS message_count
+                FROM conversations c
+                JOIN messages m ON c.id = m.conversation_id
+                WHERE c.override_model_configs IS NULL
+                    AND c.app_id = :app_id{_not_rolled_up_condition('c.created_at', arg_dict)}
+                GROUP BY c.id
+        ) statistic GROUP BY date order by date
+        '''
 
         response_data = []
-        
+
         with db.engine.begin() as conn:
             rs = conn.execute(db.text(sql_query), arg_dict)
             for i in rs:
@@ -268,52 +243,25 @@ ORDER BY date"""
 
 
 class UserSatisfactionRateStatistic(Resource):
+
     @setup_required
     @login_required
     @account_initialization_required
     def get(self, app_id):
-        account = current_user
         app_id = str(app_id)
         app_model = _get_app(app_id)
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('start', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        parser.add_argument('end', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        args = parser.parse_args()
-
-        sql_query = '''
-                        SELECT date(DATE_TRUNC('day', m.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date, 
-                            COUNT(m.id) as message_count, COUNT(mf.id) as feedback_count 
-                            FROM messages m
-                            LEFT JOIN message_feedbacks mf on mf.message_id=m.id
-                            WHERE m.app_id = :app_id 
-                        '''
-        arg_dict = {'tz': account.timezone, 'app_id': app_model.id}
-
-        timezone = pytz.timezone(account.timezone)
-        utc_timezone = pytz.utc
-
-        if args['start']:
-            start_datetime = datetime.strptime(args['start'], '%Y-%m-%d %H:%M')
-            start_datetime = start_datetime.replace(second=0)
-
-            start_datetime_timezone = timezone.localize(start_datetime)
-            start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and m.created_at >= :start'
-            arg_dict['start'] = start_datetime_utc
-
-        if args['end']:
-            end_datetime = datetime.strptime(args['end'], '%Y-%m-%d %H:%M')
-            end_datetime = end_datetime.replace(second=0)
-
-            end_datetime_timezone = timezone.localize(end_datetime)
-            end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and m.created_at < :end'
-            arg_dict['end'] = end_datetime_utc
+        arg_dict = _get_statistic_arg_dict(app_model)
 
-        sql_query += ' GROUP BY date order by date'
+        sql_query = f'''
+        SELECT date, sum(message_count) AS message_count, sum(feedback_count) AS feedback_count FROM (
+            {_rollup_query('message_count, feedback_count', arg_dict)} and message_count > 0
+            UNION ALL
+            {_message_query("""1 AS message_count,
+                (SELECT COUNT(mf.id) FROM message_feedbacks mf WHERE mf.message_id = messages.id) AS feedback_count""",
+                            arg_dict)}
+        ) statistic GROUP BY date order by date
+        '''
 
         response_data = []
 
@@ -331,56 +279,28 @@ class UserSatisfactionRateStatistic(Resource):
 
 
 class AverageResponseTimeStatistic(Resource):
+
     @setup_required
     @login_required
     @account_initialization_required
     def get(self, app_id):
-        account = current_user
         app_id = str(app_id)
         app_model = _get_app(app_id, 'completion')
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('start', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        parser.add_argument('end', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        args = parser.parse_args()
-
-        sql_query = '''
-                SELECT date(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date, 
-                    AVG(provider_response_latency) as latency
-                    FROM messages
-                    WHERE app_id = :app_id
-                '''
-        arg_dict = {'tz': account.timezone, 'app_id': app_model.id}
-
-        timezone = pytz.timezone(account.timezone)
-        utc_timezone = pytz.utc
-
-        if args['start']:
-            start_datetime = datetime.strptime(args['start'], '%Y-%m-%d %H:%M')
-            start_datetime = start_datetime.replace(second=0)
-
-            start_datetime_timezone = timezone.localize(start_datetime)
-            start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
+        arg_dict = _get_statistic_arg_dict(app_model)
 
-            sql_query += ' and created_at >= :start'
-            arg_dict['start'] = start_datetime_utc
-
-        if args['end']:
-            end_datetime = datetime.strptime(args['end'], '%Y-%m-%d %H:%M')
-            end_datetime = end_datetime.replace(second=0)
-
-            end_datetime_timezone = timezone.localize(end_datetime)
-            end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and created_at < :end'
-            arg_dict['end'] = end_datetime_utc
-
-        sql_query += ' GROUP BY date order by date'
+        sql_query = f'''
+        SELECT date, sum(provider_response_latency) / sum(message_count) AS latency FROM (
+            {_rollup_query('message_count, provider_response_latency', arg_dict)} and message_count > 0
+            UNION ALL
+            {_message_query('1 AS message_count, provider_response_latency', arg_dict)}
+        ) statistic GROUP BY date order by date
+        '''
 
         response_data = []
 
         with db.engine.begin() as conn:
-            rs = conn.execute(db.text(sql_query), arg_dict)            
+            rs = conn.execute(db.text(sql_query), arg_dict)
             for i in rs:
                 response_data.append({
                     'date': str(i.date),
@@ -393,52 +313,28 @@ class AverageResponseTimeStatistic(Resource):
 
 
 class TokensPerSecondStatistic(Resource):
+
     @setup_required
     @login_required
     @account_initialization_required
     def get(self, app_id):
-        account = current_user
         app_id = str(app_id)
         app_model = _get_app(app_id)
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('start', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        parser.add_argument('end', type=datetime_string('%Y-%m-%d %H:%M'), location='args')
-        args = parser.parse_args()
-
-        sql_query = '''SELECT date(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date, 
-    CASE 
-        WHEN SUM(provider_response_latency) = 0 THEN 0
-        ELSE (SUM(answer_tokens) / SUM(provider_response_latency))
-    END as tokens_per_second
-FROM messages
-WHERE app_id = :app_id'''
-        arg_dict = {'tz': account.timezone, 'app_id': app_model.id}
-
-        timezone = pytz.timezone(account.timezone)
-        utc_timezone = pytz.utc
-
-        if args['start']:
-            start_datetime = datetime.strptime(args['start'], '%Y-%m-%d %H:%M')
-            start_datetime = start_datetime.replace(second=0)
-
-            start_datetime_timezone = timezone.localize(start_datetime)
-            start_datetime_utc = start_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and created_at >= :start'
-            arg_dict['start'] = start_datetime_utc
-
-        if args['end']:
-            end_datetime = datetime.strptime(args['end'], '%Y-%m-%d %H:%M')
-            end_datetime = end_datetime.replace(second=0)
-
-            end_datetime_timezone = timezone.localize(end_datetime)
-            end_datetime_utc = end_datetime_timezone.astimezone(utc_timezone)
-
-            sql_query += ' and created_at < :end'
-            arg_dict['end'] = end_datetime_utc
-
-        sql_query += ' GROUP BY date order by date'
+        arg_dict = _get_statistic_arg_dict(app_model)
+
+        sql_query = f'''
+        SELECT date,
+            CASE
+                WHEN SUM(provider_response_latency) = 0 THEN 0
+                ELSE (SUM(answer_tokens) / SUM(provider_response_latency))
+            END as tokens_per_second
+        FROM (
+            {_rollup_query('answer_tokens, provider_response_latency', arg_dict)} and message_count > 0
+            UNION ALL
+            {_message_query('answer_tokens, provider_response_latency', arg_dict)}
+        ) statistic GROUP BY date order by date
+        '''
 
         response_data = []
 
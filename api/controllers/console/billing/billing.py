@@ -1,5 +1,7 @@
+from flask import request
 from flask_login import current_user
 from flask_restful import Resource, reqparse
+from werkzeug.exceptions import Unauthorized
 
 from controllers.console import api
 from controllers.console.setup import setup_required
@@ -40,5 +42,24 @@ class Invoices(Resource):
         return BillingService.get_invoices(current_user.email, current_user.current_tenant_id)
 
 
+class SubscriptionWebhook(Resource):
+
+    @only_edition_cloud
+    def post(self):
+        """Called by the billing api when the subscription of a tenant is changed"""
+        secret_key = request.headers.get('Billing-Api-Secret-Key', '')
+        if not BillingService.is_webhook_secret_key_valid(secret_key):
+            raise Unauthorized('Invalid billing api secret key.')
+
+        parser = reqparse.RequestParser()
+        parser.add_argument('tenant_id', type=str, required=True, location='json')
+        args = parser.parse_args()
+
+        BillingService.delete_info_cache(args['tenant_id'])
+
+        return {'result': 'success'}
+
+
 api.add_resource(Subscription, '/billing/subscription')
 api.add_resource(Invoices, '/billing/invoices')
+api.add_resource(SubscriptionWebhook, '/billing/webhook/subscription')
@@ -23,6 +23,7 @@ from fields.document_fields import document_status_fields
 from libs.login import login_required
 from models.dataset import Dataset, Document, DocumentSegment
 from models.model import ApiToken, UploadFile
+from services.api_token_service import ApiTokenService
 from services.dataset_service import DatasetService, DocumentService
 
 
@@ -446,6 +447,7 @@ class DatasetApiDeleteApi(Resource):
         if key is None:
             flask_restful.abort(404, message='API key not found')
 
+        ApiTokenService.delete_api_token_cache(key)
         db.session.query(ApiToken).filter(ApiToken.id == api_key_id).delete()
         db.session.commit()
 
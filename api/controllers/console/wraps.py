@@ -5,6 +5,7 @@ from flask import abort, current_app, request
 from flask_login import current_user
 
 from controllers.console.workspace.error import AccountNotInitializedError
+from services.billing_service import BillingService
 from services.feature_service import FeatureService
 from services.operation_service import OperationService
 
@@ -76,6 +77,12 @@ def cloud_edition_billing_resource_check(resource: str,
                     abort(403, error_msg)
                 elif resource == 'annotation' and 0 < annotation_quota_limit.limit < annotation_quota_limit.size:
                     abort(403, error_msg)
+                elif resource != 'workspace_custom':
+                    # the usage is changed by the view, so the next check refreshes the sizes in the background
+                    try:
+                        return view(*args, **kwargs)
+                    finally:
+                        BillingService.mark_info_stale(current_user.current_tenant_id)
                 else:
                     return view(*args, **kwargs)
 
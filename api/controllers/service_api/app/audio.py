@@ -38,9 +38,11 @@ class AudioApi(Resource):
         if not app_model_config.speech_to_text_dict['enabled']:
             raise AppUnavailableError()
 
-        file = request.files['file']
-
         try:
+            # reject oversized uploads before the multipart body is parsed
+            AudioService.check_upload_size(request.content_length)
+            file = request.files.get('file')
+
             response = AudioService.transcript_asr(
                 tenant_id=app_model.tenant_id,
                 file=file,
@@ -1,5 +1,4 @@
 from collections.abc import Callable
-from datetime import datetime
 from enum import Enum
 from functools import wraps
 from typing import Optional
@@ -13,7 +12,9 @@ from werkzeug.exceptions import NotFound, Unauthorized
 from extensions.ext_database import db
 from libs.login import _get_user
 from models.account import Account, Tenant, TenantAccountJoin
-from models.model import ApiToken, App, EndUser
+from models.model import App, EndUser
+from services.api_token_service import ApiTokenService
+from services.billing_service import BillingService
 from services.feature_service import FeatureService
 
 
@@ -100,7 +101,11 @@ def cloud_edition_billing_resource_check(resource: str,
                 elif resource == 'documents' and 0 < documents_upload_quota.limit <= documents_upload_quota.size:
                     raise Unauthorized(error_msg)
                 else:
-                    return view(*args, **kwargs)
+                    # the usage is changed by the view, so the next check refreshes the sizes in the background
+                    try:
+                        return view(*args, **kwargs)
+                    finally:
+                        BillingService.mark_info_stale(api_token.tenant_id)
 
             return view(*args, **kwargs)
         return decorated
@@ -154,16 +159,12 @@ def validate_and_get_api_token(scope=None):
     if auth_scheme != 'bearer':
         raise Unauthorized("Authorization scheme must be 'Bearer'")
 
-    api_token = db.session.query(ApiToken).filter(
-        ApiToken.token == auth_token,
-        ApiToken.type == scope,
-    ).first()
+    api_token = ApiTokenService.get_api_token(auth_token, scope)
 
     if not api_token:
         raise Unauthorized("Access token is invalid")
 
-    api_token.last_used_at = datetime.utcnow()
-    db.session.commit()
+    ApiTokenService.update_last_used_at(api_token)
 
     return api_token
 
@@ -175,26 +176,7 @@ def create_or_update_end_user_for_user_id(app_model: App, user_id: Optional[str]
     if not user_id:
         user_id = 'DEFAULT-USER'
 
-    end_user = db.session.query(EndUser) \
-        .filter(
-        EndUser.tenant_id == app_model.tenant_id,
-        EndUser.app_id == app_model.id,
-        EndUser.session_id == user_id,
-        EndUser.type == 'service_api'
-    ).first()
-
-    if end_user is None:
-        end_user = EndUser(
-            tenant_id=app_model.tenant_id,
-            app_id=app_model.id,
-            type='service_api',
-            is_anonymous=True if user_id == 'DEFAULT-USER' else False,
-            session_id=user_id
-        )
-        db.session.add(end_user)
-        db.session.commit()
-
-    return end_user
+    return ApiTokenService.get_or_create_end_user(app_model, user_id)
 
 
 class DatasetApiResource(Resource):
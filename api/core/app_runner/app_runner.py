@@ -258,7 +258,7 @@ class AppRunner:
         """
         model = None
         prompt_messages = []
-        text = ''
+        text_chunks = []
         usage = None
         for result in invoke_result:
             if not agent:
@@ -266,7 +266,8 @@ class AppRunner:
             else:
                 queue_manager.publish_agent_chunk_message(result, PublishFrom.APPLICATION_MANAGER)
 
-            text += result.delta.message.content
+            if result.delta.message.content:
+                text_chunks.append(result.delta.message.content)
 
             if not model:
                 model = result.model
@@ -283,7 +284,7 @@ class AppRunner:
         llm_result = LLMResult(
             model=model,
             prompt_messages=prompt_messages,
-            message=AssistantPromptMessage(content=text),
+            message=AssistantPromptMessage(content=''.join(text_chunks)),
             usage=usage
         )
 
@@ -1,9 +1,9 @@
-import json
 import logging
 import time
 from collections.abc import Generator
 from typing import Optional, Union, cast
 
+import orjson
 from pydantic import BaseModel
 
 from core.app_runner.moderation_handler import ModerationRule, OutputModerationHandler
@@ -83,6 +83,9 @@ class GenerateTaskPipeline:
         )
         self._start_at = time.perf_counter()
         self._output_moderation_handler = self._init_output_moderation()
+        self._chunk_envelopes: dict[str, tuple[str, str]] = {}
+        # streamed answer deltas, joined into the llm result message when the stream ends
+        self._answer_chunks: list[str] = []
 
     def process(self, stream: bool) -> Union[dict, Generator]:
         """
@@ -206,6 +209,8 @@ class GenerateTaskPipeline:
                 if isinstance(event, QueueMessageEndEvent):
                     self._task_state.llm_result = event.llm_result
                 else:
+                    self._flush_answer_chunks()
+
                     model_config = self._application_generate_entity.app_orchestration_config_entity.model_config
                     model = model_config.model
                     model_type_instance = model_config.provider_model_bundle.model_type_instance
@@ -295,6 +300,7 @@ class GenerateTaskPipeline:
                         }
                     }
 
+                    self._answer_chunks.clear()
                     self._task_state.llm_result.message.content = annotation.content
             elif isinstance(event, QueueAgentThoughtEvent):
                 agent_thought: MessageAgentThought = (
@@ -366,6 +372,7 @@ class GenerateTaskPipeline:
                 if self._output_moderation_handler:
                     if self._output_moderation_handler.should_direct_output():
                         # stop subscribe new token when output moderation should direct output
+                        self._answer_chunks.clear()
                         self._task_state.llm_result.message.content = self._output_moderation_handler.get_final_output()
                         self._queue_manager.publish_chunk_message(LLMResultChunk(
                             model=self._task_state.llm_result.model,
@@ -383,9 +390,8 @@ class GenerateTaskPipeline:
                     else:
                         self._output_moderation_handler.append_new_token(delta_text)
 
-                self._task_state.llm_result.message.content += delta_text
-                response = self._handle_chunk(delta_text, agent=isinstance(event, QueueAgentMessageEvent))
-                yield self._yield_response(response)
+                self._answer_chunks.append(delta_text)
+                yield self._handle_chunk(delta_text, agent=isinstance(event, QueueAgentMessageEvent))
             elif isinstance(event, QueueMessageReplaceEvent):
                 response = {
                     'event': 'message_replace',
@@ -404,6 +410,15 @@ class GenerateTaskPipeline:
             else:
                 continue
 
+    def _flush_answer_chunks(self) -> None:
+        """
+        Join the streamed answer chunks into the llm result message.
+        :return:
+        """
+        if self._answer_chunks:
+            self._task_state.llm_result.message.content += ''.join(self._answer_chunks)
+            self._answer_chunks.clear()
+
     def _save_message(self, llm_result: LLMResult) -> None:
         """
         Save message.
@@ -436,25 +451,46 @@ class GenerateTaskPipeline:
             extras=self._application_generate_entity.extras
         )
 
-    def _handle_chunk(self, text: str, agent: bool = False) -> dict:
+    def _handle_chunk(self, text: str, agent: bool = False) -> str:
         """
-        Handle completed event.
+        Handle chunk event, the stream response is built from the envelope of the message
+        so that only the text is serialized for each chunk.
         :param text: text
-        :return:
+        :param agent: whether the chunk is an agent message
+        :return: stream response
         """
-        response = {
-            'event': 'message' if not agent else 'agent_message',
+        event = 'message' if not agent else 'agent_message'
+        envelope = self._chunk_envelopes.get(event)
+        if envelope is None:
+            envelope = self._chunk_envelopes[event] = self._build_chunk_envelope(event)
+
+        prefix, suffix = envelope
+        return prefix + orjson.dumps(text).decode('utf-8') + suffix
+
+    def _build_chunk_envelope(self, event: str) -> tuple[str, str]:
+        """
+        Build the serialized fields before and after the answer of the chunk responses,
+        they are the same for all the chunks of the message.
+        :param event: event name
+        :return: prefix and suffix
+        """
+        head = {
+            'event': event,
             'id': self._message.id,
             'task_id': self._application_generate_entity.task_id,
             'message_id': self._message.id,
-            'answer': text,
+        }
+
+        tail = {
             'created_at': int(self._message.created_at.timestamp())
         }
 
         if self._conversation.mode == 'chat':
-            response['conversation_id'] = self._conversation.id
+            tail['conversation_id'] = self._conversation.id
 
-        return response
+        prefix = 'data: ' + orjson.dumps(head).decode('utf-8')[:-1] + ',"answer":'
+        suffix = ',' + orjson.dumps(tail).decode('utf-8')[1:] + '\n\n'
+        return prefix, suffix
 
     def _handle_error(self, event: QueueErrorEvent) -> Exception:
         """
@@ -552,7 +588,7 @@ class GenerateTaskPipeline:
         :param response: response
         :return:
         """
-        return "data: " + json.dumps(response) + "\n\n"
+        return "data: " + orjson.dumps(response, option=orjson.OPT_NON_STR_KEYS).decode('utf-8') + "\n\n"
 
     def _prompt_messages_to_prompt_for_saving(self, prompt_messages: list[PromptMessage]) -> list[dict]:
         """
@@ -3,8 +3,10 @@ import logging
 from typing import Optional, cast
 
 import numpy as np
+from flask import current_app
 from sqlalchemy.exc import IntegrityError
 
+from core.embedding.embedding_batcher import embedding_batcher
 from core.model_manager import ModelInstance
 from core.model_runtime.entities.model_entities import ModelPropertyKey
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
@@ -25,10 +27,7 @@ class CacheEmbedding(Embeddings):
         """Embed search docs in batches of 10."""
         text_embeddings = []
         try:
-            model_type_instance = cast(TextEmbeddingModel, self._model_instance.model_type_instance)
-            model_schema = model_type_instance.get_model_schema(self._model_instance.model, self._model_instance.credentials)
-            max_chunks = model_schema.model_properties[ModelPropertyKey.MAX_CHUNKS] \
-                if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties else 1
+            max_chunks = self._get_max_chunks()
             for i in range(0, len(texts), max_chunks):
                 batch_texts = texts[i:i + max_chunks]
 
@@ -64,10 +63,20 @@ class CacheEmbedding(Embeddings):
 
 
         try:
-            embedding_result = self._model_instance.invoke_text_embedding(
-                texts=[text],
-                user=self._user
-            )
+            if current_app.config.get('EMBEDDING_MICRO_BATCH_ENABLED'):
+                # concurrent queries of the same model are sent to the provider in one batch
+                embedding_result = embedding_batcher.embed(
+                    model_instance=self._model_instance,
+                    text=text,
+                    user=self._user,
+                    max_wait=int(current_app.config.get('EMBEDDING_MICRO_BATCH_WAIT_MS', 5)) / 1000,
+                    max_batch_size=self._get_max_chunks()
+                )
+            else:
+                embedding_result = self._model_instance.invoke_text_embedding(
+                    texts=[text],
+                    user=self._user
+                )
 
             embedding_results = embedding_result.embeddings[0]
             embedding_results = (embedding_results / np.linalg.norm(embedding_results)).tolist()
@@ -90,3 +99,10 @@ class CacheEmbedding(Embeddings):
             logging.exception('Failed to add embedding to redis')
 
         return embedding_results
+
+    def _get_max_chunks(self) -> int:
+        """Max number of texts of one embedding request of the model."""
+        model_type_instance = cast(TextEmbeddingModel, self._model_instance.model_type_instance)
+        model_schema = model_type_instance.get_model_schema(self._model_instance.model, self._model_instance.credentials)
+        return model_schema.model_properties[ModelPropertyKey.MAX_CHUNKS] \
+            if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties else 1
@@ -0,0 +1,113 @@
+import threading
+from typing import Optional
+
+from core.model_manager import ModelInstance
+from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage, TextEmbeddingResult
+from core.model_runtime.utils.helper import credentials_fingerprint
+
+
+class _PendingEmbedding:
+    def __init__(self, text: str, user: Optional[str]) -> None:
+        self.text = text
+        self.user = user
+        self.embedding: Optional[list[float]] = None
+        self.usage: Optional[EmbeddingUsage] = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+
+
+class _EmbeddingBatch:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.items: list[_PendingEmbedding] = []
+        # set when the batch is full, so its leader sends it without waiting any longer
+        self.full = threading.Event()
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching of single text embeddings.
+
+    The first caller of a provider, model and credentials opens a batch and becomes its leader,
+    concurrent callers of the same model join the batch, and after the wait time, or once the batch is full,
+    the leader embeds all the texts of the batch with one request to the provider.
+    Each caller gets the embedding of its own text, or the error of the request.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._open_batches: dict[tuple[str, str, str], _EmbeddingBatch] = {}
+
+    def embed(self, model_instance: ModelInstance, text: str, user: Optional[str] = None,
+              max_wait: float = 0.005, max_batch_size: int = 1) -> TextEmbeddingResult:
+        """
+        Embed a single text in a batch with the concurrent texts of the same model
+
+        :param model_instance: text embedding model instance
+        :param text: text to embed
+        :param user: unique user id
+        :param max_wait: seconds the leader waits for more texts before the batch is sent
+        :param max_batch_size: max number of texts of a batch, the max chunks of the model
+        :return: embeddings result of the text, with the usage of the whole batch
+        """
+        if max_batch_size <= 1:
+            return model_instance.invoke_text_embedding(texts=[text], user=user)
+
+        key = (model_instance.provider, model_instance.model, credentials_fingerprint(model_instance.credentials))
+        pending = _PendingEmbedding(text, user)
+
+        with self._lock:
+            batch = self._open_batches.get(key)
+            is_leader = batch is None
+            if is_leader:
+                batch = _EmbeddingBatch(max_batch_size)
+                self._open_batches[key] = batch
+
+            batch.items.append(pending)
+            if len(batch.items) >= batch.max_size:
+                # later callers open a new batch
+                del self._open_batches[key]
+                batch.full.set()
+
+        if is_leader:
+            batch.full.wait(max_wait)
+
+            with self._lock:
+                if self._open_batches.get(key) is batch:
+                    del self._open_batches[key]
+
+            self._send(model_instance, batch)
+
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+
+        return TextEmbeddingResult(
+            model=model_instance.model,
+            embeddings=[pending.embedding],
+            usage=pending.usage
+        )
+
+    @staticmethod
+    def _send(model_instance: ModelInstance, batch: _EmbeddingBatch) -> None:
+        # the same query of concurrent requests is only embedded once
+        texts = list(dict.fromkeys(item.text for item in batch.items))
+        users = {item.user for item in batch.items}
+
+        try:
+            embedding_result = model_instance.invoke_text_embedding(
+                texts=texts,
+                user=users.pop() if len(users) == 1 else None
+            )
+
+            embeddings = dict(zip(texts, embedding_result.embeddings))
+            for item in batch.items:
+                item.embedding = embeddings[item.text]
+                item.usage = embedding_result.usage
+        except Exception as e:
+            for item in batch.items:
+                item.error = e
+        finally:
+            for item in batch.items:
+                item.done.set()
+
+embedding_batcher = EmbeddingBatcher()
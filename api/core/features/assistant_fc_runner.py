@@ -1,7 +1,10 @@
 import json
 import logging
 from collections.abc import Generator
-from typing import Any, Union
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Optional, Union
+
+from flask import Flask, current_app
 
 from core.application_queue_manager import PublishFrom
 from core.features.assistant_base_runner import BaseAssistantApplicationRunner
@@ -14,6 +17,7 @@ from core.model_runtime.entities.message_entities import (
     ToolPromptMessage,
     UserPromptMessage,
 )
+from core.tools.entities.tool_entities import ToolInvokeMessage
 from core.tools.errors import (
     ToolInvokeError,
     ToolNotFoundError,
@@ -22,6 +26,8 @@ from core.tools.errors import (
     ToolProviderCredentialValidationError,
     ToolProviderNotFoundError,
 )
+from core.tools.tool.tool import Tool
+from extensions.ext_database import db
 from models.model import Conversation, Message, MessageAgentThought
 
 logger = logging.getLogger(__name__)
@@ -244,70 +250,34 @@ class AssistantFunctionCallApplicationRunner(BaseAssistantApplicationRunner):
             
             # call tools
             tool_responses = []
-            for tool_call_id, tool_call_name, tool_call_args in tool_calls:
-                tool_instance = tool_instances.get(tool_call_name)
-                if not tool_instance:
-                    tool_response = {
-                        "tool_call_id": tool_call_id,
-                        "tool_call_name": tool_call_name,
-                        "tool_response": f"there is not a tool named {tool_call_name}"
-                    }
-                    tool_responses.append(tool_response)
+            # results are handled before the next sequential tool is invoked, which may use files of earlier tools
+            for (tool_call_id, tool_call_name, tool_call_args), (tool_invoke_message, error_response) \
+                    in self._invoke_tools(tool_calls=tool_calls, tool_instances=tool_instances):
+                if error_response is None:
+                    # extract binary data from tool invoke message
+                    binary_files = self.extract_tool_response_binary(tool_invoke_message)
+                    # create message file
+                    message_files = self.create_message_files(binary_files)
+                    # publish files
+                    for message_file, save_as in message_files:
+                        if save_as:
+                            self.variables_pool.set_file(tool_name=tool_call_name, value=message_file.id, name=save_as)
+
+                        # publish message file
+                        self.queue_manager.publish_message_file(message_file, PublishFrom.APPLICATION_MANAGER)
+                        # add message file ids
+                        message_file_ids.append(message_file.id)
+
+                    observation = self._convert_tool_response_to_str(tool_invoke_message)
                 else:
-                    # invoke tool
-                    error_response = None
-                    try:
-                        tool_invoke_message = tool_instance.invoke(
-                            user_id=self.user_id, 
-                            tool_parameters=tool_call_args, 
-                        )
-                        # transform tool invoke message to get LLM friendly message
-                        tool_invoke_message = self.transform_tool_invoke_messages(tool_invoke_message)
-                        # extract binary data from tool invoke message
-                        binary_files = self.extract_tool_response_binary(tool_invoke_message)
-                        # create message file
-                        message_files = self.create_message_files(binary_files)
-                        # publish files
-                        for message_file, save_as in message_files:
-                            if save_as:
-                                self.variables_pool.set_file(tool_name=tool_call_name, value=message_file.id, name=save_as)
-
-                            # publish message file
-                            self.queue_manager.publish_message_file(message_file, PublishFrom.APPLICATION_MANAGER)
-                            # add message file ids
-                            message_file_ids.append(message_file.id)
-                            
-                    except ToolProviderCredentialValidationError as e:
-                        error_response = "Please check your tool provider credentials"
-                    except (
-                        ToolNotFoundError, ToolNotSupportedError, ToolProviderNotFoundError
-                    ) as e:
-                        error_response = f"there is not a tool named {tool_call_name}"
-                    except (
-                        ToolParameterValidationError
-                    ) as e:
-                        error_response = f"tool parameters validation error: {e}, please check your tool parameters"
-                    except ToolInvokeError as e:
-                        error_response = f"tool invoke error: {e}"
-                    except Exception as e:
-                        error_response = f"unknown error: {e}"
-
-                    if error_response:
-                        observation = error_response
-                        tool_response = {
-                            "tool_call_id": tool_call_id,
-                            "tool_call_name": tool_call_name,
-                            "tool_response": error_response
-                        }
-                        tool_responses.append(tool_response)
-                    else:
-                        observation = self._convert_tool_response_to_str(tool_invoke_message)
-                        tool_response = {
-                            "tool_call_id": tool_call_id,
-                            "tool_call_name": tool_call_name,
-                            "tool_response": observation
-                        }
-                        tool_responses.append(tool_response)
+                    observation = error_response
+
+                tool_response = {
+                    "tool_call_id": tool_call_id,
+                    "tool_call_name": tool_call_name,
+                    "tool_response": observation
+                }
+                tool_responses.append(tool_response)
 
                 prompt_messages = self.organize_prompt_messages(
                     prompt_template=prompt_template,
@@ -349,6 +319,152 @@ class AssistantFunctionCallApplicationRunner(BaseAssistantApplicationRunner):
             system_fingerprint=''
         ), PublishFrom.APPLICATION_MANAGER)
 
+    def _invoke_tools(self, tool_calls: list[tuple[str, str, dict[str, Any]]],
+                      tool_instances: dict[str, Tool]
+                      ) -> Generator[tuple[tuple[str, str, dict[str, Any]],
+                                           tuple[Optional[list[ToolInvokeMessage]], Optional[str]]], None, None]:
+        """
+        Invoke tools of one turn in the order of tool calls, yielding each result as soon as it is needed.
+
+        Runs of consecutive parallel safe tools are invoked concurrently in a bounded pool. The other tools may
+        depend on files of earlier tools, so each one is only invoked once the caller has handled the results
+        yielded before it.
+
+        AGENT_TOOL_INVOKE_TIMEOUT bounds each run of parallel tools, not each tool, tools which are not done
+        by then are reported as timed out. A tool which is already running can not be stopped,
+        it keeps running in its pool thread until it returns and its result is dropped.
+        Sequentially invoked tools are not bounded, the same as when parallel invoke is disabled.
+
+        :param tool_calls: [(tool_call_id, tool_call_name, tool_call_args)]
+        :param tool_instances: tool instances
+        :return: ((tool_call_id, tool_call_name, tool_call_args), (tool_invoke_messages, error_response))
+        """
+        parallel_enabled = current_app.config.get('AGENT_TOOL_PARALLEL_ENABLED')
+
+        index = 0
+        while index < len(tool_calls):
+            parallel_tool_calls = []
+            if parallel_enabled:
+                while index < len(tool_calls):
+                    tool_instance = tool_instances.get(tool_calls[index][1])
+                    if not tool_instance or not tool_instance.is_parallel_safe():
+                        break
+
+                    parallel_tool_calls.append(tool_calls[index])
+                    index += 1
+
+            if len(parallel_tool_calls) > 1:
+                results = self._invoke_tools_in_parallel(parallel_tool_calls, tool_instances)
+                yield from zip(parallel_tool_calls, results)
+                continue
+
+            if not parallel_tool_calls:
+                parallel_tool_calls.append(tool_calls[index])
+                index += 1
+
+            tool_call = parallel_tool_calls[0]
+            tool_instance = tool_instances.get(tool_call[1])
+            if not tool_instance:
+                yield tool_call, (None, f"there is not a tool named {tool_call[1]}")
+                continue
+
+            yield tool_call, self._invoke_tool(tool_instance, tool_call[1], tool_call[2])
+
+    def _invoke_tools_in_parallel(self, tool_calls: list[tuple[str, str, dict[str, Any]]],
+                                  tool_instances: dict[str, Tool]
+                                  ) -> list[tuple[Optional[list[ToolInvokeMessage]], Optional[str]]]:
+        """
+        Invoke parallel safe tools concurrently, within a single deadline
+
+        :param tool_calls: [(tool_call_id, tool_call_name, tool_call_args)]
+        :param tool_instances: tool instances
+        :return: [(tool_invoke_messages, error_response)] in the order of tool calls
+        """
+        max_workers = int(current_app.config.get('AGENT_TOOL_PARALLEL_MAX_WORKERS', 4))
+        timeout = float(current_app.config.get('AGENT_TOOL_INVOKE_TIMEOUT', 60))
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tool_calls)))
+        try:
+            futures = [
+                executor.submit(
+                    self._invoke_tool_in_app_context,
+                    current_app._get_current_object(),
+                    tool_instances[tool_call_name],
+                    tool_call_name,
+                    tool_call_args
+                )
+                for _, tool_call_name, tool_call_args in tool_calls
+            ]
+
+            # a single deadline for all the parallel tools
+            wait(futures, timeout=timeout)
+
+            results = []
+            for (tool_call_id, tool_call_name, _), future in zip(tool_calls, futures):
+                if future.done():
+                    results.append(future.result())
+                    continue
+
+                # only tools which have not started yet can be cancelled
+                if not future.cancel():
+                    logger.warning(f'tool {tool_call_name} of tool call {tool_call_id} timed out after {timeout}s, '
+                                   f'it keeps running in the background and its result is dropped')
+                    future.add_done_callback(
+                        lambda _, name=tool_call_name, call_id=tool_call_id: logger.warning(
+                            f'timed out tool {name} of tool call {call_id} finished, its result is dropped'
+                        )
+                    )
+                results.append((None, f"tool invoke error: {tool_call_name} timed out after {timeout}s"))
+
+            return results
+        finally:
+            # do not wait for timed out tools, tools which have not started are not started anymore
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _invoke_tool_in_app_context(self, flask_app: Flask,
+                                    tool_instance: Tool,
+                                    tool_call_name: str,
+                                    tool_call_args: dict[str, Any]
+                                    ) -> tuple[Optional[list[ToolInvokeMessage]], Optional[str]]:
+        """
+        Invoke tool in a worker thread
+        """
+        with flask_app.app_context():
+            try:
+                return self._invoke_tool(tool_instance, tool_call_name, tool_call_args)
+            finally:
+                db.session.close()
+
+    def _invoke_tool(self, tool_instance: Tool,
+                     tool_call_name: str,
+                     tool_call_args: dict[str, Any]
+                     ) -> tuple[Optional[list[ToolInvokeMessage]], Optional[str]]:
+        """
+        Invoke tool and transform its response into LLM friendly messages
+
+        :return: (tool_invoke_messages, error_response)
+        """
+        try:
+            tool_invoke_message = tool_instance.invoke(
+                user_id=self.user_id,
+                tool_parameters=tool_call_args,
+            )
+            # transform tool invoke message to get LLM friendly message
+            return self.transform_tool_invoke_messages(tool_invoke_message), None
+        except ToolProviderCredentialValidationError as e:
+            return None, "Please check your tool provider credentials"
+        except (
+            ToolNotFoundError, ToolNotSupportedError, ToolProviderNotFoundError
+        ) as e:
+            return None, f"there is not a tool named {tool_call_name}"
+        except (
+            ToolParameterValidationError
+        ) as e:
+            return None, f"tool parameters validation error: {e}, please check your tool parameters"
+        except ToolInvokeError as e:
+            return None, f"tool invoke error: {e}"
+        except Exception as e:
+            return None, f"unknown error: {e}"
+
     def check_tool_calls(self, llm_result_chunk: LLMResultChunk) -> bool:
         """
         Check if there is any tool call in llm result chunk
@@ -0,0 +1,49 @@
+import json
+from json import JSONDecodeError
+from typing import Optional
+
+from extensions.ext_redis import redis_client
+
+# app model configs are never updated in place, publishing inserts a new one,
+# the short ttl only bounds the memory used by configs which are no longer read
+APP_MODEL_CONFIG_CACHE_TTL = 300
+
+
+class AppModelConfigCache:
+    def __init__(self, app_model_config_id: str):
+        self.cache_key = f"app_model_config:id:{app_model_config_id}"
+
+    def get(self) -> Optional[dict]:
+        """
+        Get cached app model config columns.
+
+        :return:
+        """
+        cached_app_model_config = redis_client.get(self.cache_key)
+        if cached_app_model_config:
+            try:
+                cached_app_model_config = cached_app_model_config.decode('utf-8')
+                cached_app_model_config = json.loads(cached_app_model_config)
+            except JSONDecodeError:
+                return None
+
+            return cached_app_model_config
+        else:
+            return None
+
+    def set(self, app_model_config: dict) -> None:
+        """
+        Cache app model config columns.
+
+        :param app_model_config: app model config columns
+        :return:
+        """
+        redis_client.setex(self.cache_key, APP_MODEL_CONFIG_CACHE_TTL, json.dumps(app_model_config))
+
+    def delete(self) -> None:
+        """
+        Delete cached app model config.
+
+        :return:
+        """
+        redis_client.delete(self.cache_key)
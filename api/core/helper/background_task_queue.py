@@ -0,0 +1,93 @@
+import atexit
+import logging
+import queue
+import threading
+from collections.abc import Callable
+from typing import Any, Optional
+
+from flask import Flask, current_app
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTaskQueue:
+    """
+    In-process bounded FIFO task queue, executed by a single daemon thread in the flask app context.
+
+    It is meant for lightweight side effects which should not block the response, such as small
+    database updates. Tasks are executed in the order they are submitted, and when the queue is full
+    the task is executed inline as backpressure.
+    """
+    def __init__(self, name: str, maxsize: int = 1000) -> None:
+        self.name = name
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """
+        Submit a task, must be called in the flask app context
+
+        :param func: task function
+        :param args: task args
+        :param kwargs: task kwargs
+        :return:
+        """
+        flask_app = current_app._get_current_object()
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait((flask_app, func, args, kwargs))
+        except queue.Full:
+            logger.warning(f'background task queue {self.name} is full, run task inline')
+            self._run(flask_app, func, args, kwargs)
+
+    def join(self, timeout: float = 5) -> None:
+        """
+        Wait for the queued tasks to finish, at most timeout seconds
+
+        :param timeout: seconds to wait
+        :return:
+        """
+        done = threading.Event()
+
+        def _wait():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=_wait, daemon=True).start()
+        done.wait(timeout)
+
+    def _ensure_started(self) -> None:
+        # start lazily, so that the thread is started in the forked worker processes
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name=f'background-{self.name}', daemon=True)
+                self._thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            flask_app, func, args, kwargs = self._queue.get()
+            try:
+                self._run(flask_app, func, args, kwargs)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, flask_app: Flask, func: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        with flask_app.app_context():
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception(f'background task {func.__name__} of queue {self.name} failed')
+
+
+# side effects after a message was created, e.g. provider quota and last used time
+message_side_effect_queue = BackgroundTaskQueue('message-side-effect')
+atexit.register(message_side_effect_queue.join)
+
+# refreshes of stale cached billing info of tenants
+billing_info_refresh_queue = BackgroundTaskQueue('billing-info-refresh', maxsize=100)
+atexit.register(billing_info_refresh_queue.join)
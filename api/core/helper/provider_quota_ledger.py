@@ -0,0 +1,168 @@
+import logging
+
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.provider import Provider, ProviderType
+
+logger = logging.getLogger(__name__)
+
+# used quota of a provider is written back to the database at most once in this many seconds
+PROVIDER_QUOTA_FLUSH_INTERVAL = 60
+PROVIDER_QUOTA_DIRTY_KEY = 'provider_quota:dirty'
+
+# KEYS: ledger key, dirty set key
+# ARGV: amount, [used, limit, provider id] to initialize a missing ledger
+# returns -1 if the ledger does not exist, 0 if the quota is exhausted, 1 if deducted
+_DEDUCT_SCRIPT = redis_client.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    if #ARGV < 4 then
+        return -1
+    end
+    redis.call('HSET', KEYS[1], 'used', ARGV[2], 'limit', ARGV[3], 'provider_id', ARGV[4])
+end
+local used = tonumber(redis.call('HGET', KEYS[1], 'used'))
+local limit = tonumber(redis.call('HGET', KEYS[1], 'limit'))
+if limit ~= -1 and used >= limit then
+    return 0
+end
+redis.call('HINCRBY', KEYS[1], 'used', ARGV[1])
+redis.call('SADD', KEYS[2], KEYS[1])
+return 1
+""")
+
+# KEYS: ledger key, dirty set key
+# ARGV: flushed used, current limit in the database
+# the ledger is dropped once it is fully flushed, so that the database is the source of truth again
+_FINISH_FLUSH_SCRIPT = redis_client.register_script("""
+local used = redis.call('HGET', KEYS[1], 'used')
+if used == false or tonumber(used) <= tonumber(ARGV[1]) then
+    redis.call('DEL', KEYS[1])
+    redis.call('SREM', KEYS[2], KEYS[1])
+    return 1
+end
+redis.call('HSET', KEYS[1], 'limit', ARGV[2])
+return 0
+""")
+
+
+class ProviderQuotaLedger:
+    """
+    Used quota of a hosted system provider, counted atomically in redis.
+
+    Deductions never touch the provider row, the used quota is written back to the database in batches
+    by `flush_ledger`, either after a deduction once per flush interval or by the periodic reconcile task.
+    Ledgers with unflushed usage stay in the dirty set until the write back succeeded, the write back sets
+    an absolute value, so replaying it after a crash is safe.
+    """
+    def __init__(self, tenant_id: str, provider_name: str, quota_type: str):
+        self.tenant_id = tenant_id
+        self.provider_name = provider_name
+        self.quota_type = quota_type
+        self.ledger_key = f"provider_quota:tenant_id:{tenant_id}:provider:{provider_name}:quota_type:{quota_type}"
+
+    def deduct(self, amount: int) -> bool:
+        """
+        Deduct quota, does nothing if the quota is exhausted.
+
+        :param amount: used quota
+        :return: whether the quota was deducted
+        """
+        result = _DEDUCT_SCRIPT(keys=[self.ledger_key, PROVIDER_QUOTA_DIRTY_KEY], args=[amount])
+        if result == -1:
+            provider_record = db.session.query(Provider).filter(
+                Provider.tenant_id == self.tenant_id,
+                Provider.provider_name == self.provider_name,
+                Provider.provider_type == ProviderType.SYSTEM.value,
+                Provider.quota_type == self.quota_type
+            ).first()
+
+            if not provider_record:
+                return False
+
+            result = _DEDUCT_SCRIPT(
+                keys=[self.ledger_key, PROVIDER_QUOTA_DIRTY_KEY],
+                args=[
+                    amount,
+                    provider_record.quota_used or 0,
+                    # a null limit never passes the check, same as the database
+                    provider_record.quota_limit if provider_record.quota_limit is not None else 0,
+                    provider_record.id
+                ]
+            )
+
+        if result != 1:
+            return False
+
+        if redis_client.set(f"{self.ledger_key}:flush_throttle", 1, ex=PROVIDER_QUOTA_FLUSH_INTERVAL, nx=True):
+            self.flush_ledger(self.ledger_key)
+
+        return True
+
+    @classmethod
+    def get_quota_used(cls, tenant_id: str, provider_name: str, quota_types: list[str]) -> dict[str, int]:
+        """
+        Get used quota of the ledgers with unflushed usage.
+
+        :param tenant_id: workspace id
+        :param provider_name: provider name
+        :param quota_types: quota types
+        :return: used quota of quota types, quota types without ledger are omitted
+        """
+        pipeline = redis_client.pipeline(transaction=False)
+        for quota_type in quota_types:
+            pipeline.hget(cls(tenant_id, provider_name, quota_type).ledger_key, 'used')
+
+        return {
+            quota_type: int(used)
+            for quota_type, used in zip(quota_types, pipeline.execute())
+            if used is not None
+        }
+
+    @classmethod
+    def flush_ledger(cls, ledger_key: str) -> None:
+        """
+        Write the used quota of a ledger back to the database.
+
+        :param ledger_key: ledger key
+        :return:
+        """
+        used, provider_id = redis_client.hmget(ledger_key, ['used', 'provider_id'])
+        if used is None or provider_id is None:
+            redis_client.srem(PROVIDER_QUOTA_DIRTY_KEY, ledger_key)
+            return
+
+        used = int(used)
+        provider_id = provider_id.decode('utf-8')
+
+        # used quota only grows, never let a stale flush overwrite a newer one
+        db.session.query(Provider).filter(
+            Provider.id == provider_id,
+            Provider.quota_used < used
+        ).update({'quota_used': used}, synchronize_session=False)
+        db.session.commit()
+
+        quota_limit = db.session.query(Provider.quota_limit).filter(Provider.id == provider_id).scalar()
+
+        _FINISH_FLUSH_SCRIPT(
+            keys=[ledger_key, PROVIDER_QUOTA_DIRTY_KEY],
+            args=[used, quota_limit if quota_limit is not None else 0]
+        )
+
+    @classmethod
+    def flush_all(cls) -> int:
+        """
+        Write the used quota of all the ledgers with unflushed usage back to the database.
+
+        :return: number of flushed ledgers
+        """
+        flushed = 0
+        for ledger_key in redis_client.sscan_iter(PROVIDER_QUOTA_DIRTY_KEY, count=100):
+            ledger_key = ledger_key.decode('utf-8')
+            try:
+                cls.flush_ledger(ledger_key)
+                flushed += 1
+            except Exception:
+                db.session.rollback()
+                logger.exception(f'Failed to flush provider quota ledger {ledger_key}')
+
+        return flushed
@@ -0,0 +1,84 @@
+import threading
+import time
+from typing import Any, Optional
+
+from core.helper.lru_cache import LRUCache
+from extensions.ext_redis import redis_client
+
+TOOL_RUNTIME_CACHE_TTL = 300
+
+
+class ToolRuntimeCacheEntry:
+    def __init__(self, provider_controller: Any, credentials: dict, version: int, expires_at: float):
+        self.provider_controller = provider_controller
+        self.credentials = credentials
+        self.version = version
+        self.expires_at = expires_at
+
+
+class ToolRuntimeCache:
+    """
+    Process level cache of parsed tool provider controllers and decrypted credentials of a tenant.
+
+    Entries expire after a ttl, and are invalidated for all the processes by bumping the
+    tenant version in redis whenever a tool provider of the tenant is changed.
+    """
+    _cache = LRUCache(capacity=2048)
+    _lock = threading.Lock()
+
+    def __init__(self, tenant_id: str, provider_type: str, provider_id: str):
+        self.tenant_id = tenant_id
+        self.cache_key = (tenant_id, provider_type, provider_id)
+
+    def get(self) -> Optional[ToolRuntimeCacheEntry]:
+        """
+        Get cached provider controller and decrypted credentials.
+
+        :return:
+        """
+        with self._lock:
+            entry: Optional[ToolRuntimeCacheEntry] = self._cache.get(self.cache_key)
+
+        if entry is None or entry.expires_at < time.time():
+            return None
+
+        if entry.version != self._get_version(self.tenant_id):
+            return None
+
+        return entry
+
+    def set(self, provider_controller: Any, credentials: dict) -> None:
+        """
+        Cache provider controller and decrypted credentials.
+
+        :param provider_controller: provider controller
+        :param credentials: decrypted credentials
+        :return:
+        """
+        entry = ToolRuntimeCacheEntry(
+            provider_controller=provider_controller,
+            credentials=credentials,
+            version=self._get_version(self.tenant_id),
+            expires_at=time.time() + TOOL_RUNTIME_CACHE_TTL
+        )
+        with self._lock:
+            self._cache.put(self.cache_key, entry)
+
+    @classmethod
+    def invalidate(cls, tenant_id: str) -> None:
+        """
+        Invalidate all the cached tool runtimes of a tenant in all processes.
+
+        :param tenant_id: tenant id
+        :return:
+        """
+        redis_client.incr(cls._get_version_key(tenant_id))
+
+    @classmethod
+    def _get_version(cls, tenant_id: str) -> int:
+        version = redis_client.get(cls._get_version_key(tenant_id))
+        return int(version) if version else 0
+
+    @staticmethod
+    def _get_version_key(tenant_id: str) -> str:
+        return f"tool_runtime_version:tenant_id:{tenant_id}"
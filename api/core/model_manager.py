@@ -1,5 +1,7 @@
-from collections.abc import Generator
-from typing import IO, Optional, Union, cast
+from collections.abc import Callable, Generator
+from typing import IO, Any, Optional, Union, cast
+
+from flask import current_app, g, has_app_context
 
 from core.entities.provider_configuration import ProviderModelBundle
 from core.errors.error import ProviderTokenNotInitError
@@ -15,6 +17,11 @@ from core.model_runtime.model_providers.__base.rerank_model import RerankModel
 from core.model_runtime.model_providers.__base.speech2text_model import Speech2TextModel
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.model_runtime.model_providers.__base.tts_model import TTSModel
+from core.model_runtime.utils.provider_health import (
+    ProviderHealth,
+    ProviderHealthStream,
+    provider_health_tracker,
+)
 from core.provider_manager import ProviderManager
 
 
@@ -67,7 +74,8 @@ class ModelInstance:
             raise Exception("Model type instance is not LargeLanguageModel")
 
         self.model_type_instance = cast(LargeLanguageModel, self.model_type_instance)
-        return self.model_type_instance.invoke(
+        return self._invoke_with_provider_health(
+            self.model_type_instance.invoke,
             model=self.model,
             credentials=self.credentials,
             prompt_messages=prompt_messages,
@@ -92,7 +100,8 @@ class ModelInstance:
             raise Exception("Model type instance is not TextEmbeddingModel")
 
         self.model_type_instance = cast(TextEmbeddingModel, self.model_type_instance)
-        return self.model_type_instance.invoke(
+        return self._invoke_with_provider_health(
+            self.model_type_instance.invoke,
             model=self.model,
             credentials=self.credentials,
             texts=texts,
@@ -117,7 +126,8 @@ class ModelInstance:
             raise Exception("Model type instance is not RerankModel")
 
         self.model_type_instance = cast(RerankModel, self.model_type_instance)
-        return self.model_type_instance.invoke(
+        return self._invoke_with_provider_health(
+            self.model_type_instance.invoke,
             model=self.model,
             credentials=self.credentials,
             query=query,
@@ -193,6 +203,49 @@ class ModelInstance:
             streaming=streaming
         )
 
+    def _invoke_with_provider_health(self, invoke: Callable, **kwargs: Any) -> Any:
+        """
+        Invoke the model through the circuit breaker and concurrency limit of the provider credentials
+
+        :param invoke: invoke function of the model type instance
+        :param kwargs: invoke arguments
+        :return: invoke result, stream results hold the invoke slot until they are consumed
+        """
+        health = self._get_provider_health()
+        if health is None:
+            return invoke(**kwargs)
+
+        is_trial = health.acquire()
+        try:
+            result = invoke(**kwargs)
+        except Exception as e:
+            health.release(is_trial, e)
+            raise
+
+        if isinstance(result, Generator):
+            return ProviderHealthStream(health, is_trial, result)
+
+        health.release(is_trial)
+        return result
+
+    def _get_provider_health(self) -> Optional[ProviderHealth]:
+        """
+        Get the health of the provider credentials, None if the circuit breaker is disabled
+
+        :return:
+        """
+        config = current_app.config
+        if not config.get('MODEL_CIRCUIT_BREAKER_ENABLED'):
+            return None
+
+        return provider_health_tracker.get_health(
+            provider=self.provider,
+            credentials=self.credentials,
+            failure_threshold=int(config.get('MODEL_CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5)),
+            recovery_timeout=float(config.get('MODEL_CIRCUIT_BREAKER_RECOVERY_TIMEOUT', 30)),
+            max_concurrency=int(config.get('MODEL_MAX_CONCURRENT_INVOKES', 64))
+        )
+
     def get_tts_voices(self, language: str) -> list:
         """
         Invoke large language tts model voices
@@ -212,6 +265,13 @@ class ModelInstance:
 
 
 class ModelManager:
+    """
+    Model manager, resolves model instances of a tenant.
+
+    Provider configurations and model instances are cached in the current app context,
+    which lives as long as a request, a generate thread or a celery task, so the model, embedding, rerank
+    and moderation models of a request only resolve each provider configuration once.
+    """
     def __init__(self) -> None:
         self._provider_manager = ProviderManager()
 
@@ -226,13 +286,17 @@ class ModelManager:
         """
         if not provider:
             return self.get_default_model_instance(tenant_id, model_type)
-        provider_model_bundle = self._provider_manager.get_provider_model_bundle(
-            tenant_id=tenant_id,
-            provider=provider,
-            model_type=model_type
-        )
 
-        return ModelInstance(provider_model_bundle, model)
+        request_cache = self._get_request_cache()
+        cache_key = ('model_instance', tenant_id, provider, model_type, model)
+        if cache_key in request_cache:
+            return request_cache[cache_key]
+
+        provider_model_bundle = self._get_provider_model_bundle(tenant_id, provider, model_type, request_cache)
+        model_instance = ModelInstance(provider_model_bundle, model)
+        request_cache[cache_key] = model_instance
+
+        return model_instance
 
     def get_default_model_instance(self, tenant_id: str, model_type: ModelType) -> ModelInstance:
         """
@@ -241,13 +305,19 @@ class ModelManager:
         :param model_type: model type
         :return:
         """
-        default_model_entity = self._provider_manager.get_default_model(
-            tenant_id=tenant_id,
-            model_type=model_type
-        )
+        request_cache = self._get_request_cache()
+        cache_key = ('default_model', tenant_id, model_type)
+        default_model_entity = request_cache.get(cache_key)
+        if default_model_entity is None:
+            default_model_entity = self._provider_manager.get_default_model(
+                tenant_id=tenant_id,
+                model_type=model_type
+            )
+
+            if not default_model_entity:
+                raise ProviderTokenNotInitError(f"Default model not found for {model_type}")
 
-        if not default_model_entity:
-            raise ProviderTokenNotInitError(f"Default model not found for {model_type}")
+            request_cache[cache_key] = default_model_entity
 
         return self.get_model_instance(
             tenant_id=tenant_id,
@@ -255,3 +325,38 @@ class ModelManager:
             model_type=model_type,
             model=default_model_entity.model
         )
+
+    def _get_provider_model_bundle(self, tenant_id: str, provider: str, model_type: ModelType,
+                                   request_cache: dict) -> ProviderModelBundle:
+        """
+        Get provider model bundle, the provider configuration is only built once per request
+        :param tenant_id: tenant id
+        :param provider: provider name
+        :param model_type: model type
+        :param request_cache: cache of the current app context
+        :return:
+        """
+        cache_key = ('provider_configuration', tenant_id, provider)
+        provider_configuration = request_cache.get(cache_key)
+        if provider_configuration is None:
+            provider_configuration = self._provider_manager.get_provider_configuration(tenant_id, provider)
+            if not provider_configuration:
+                raise ValueError(f"Provider {provider} does not exist.")
+
+            request_cache[cache_key] = provider_configuration
+
+        provider_instance = provider_configuration.get_provider_instance()
+
+        return ProviderModelBundle(
+            configuration=provider_configuration,
+            provider_instance=provider_instance,
+            model_type_instance=provider_instance.get_model_instance(model_type)
+        )
+
+    @staticmethod
+    def _get_request_cache() -> dict:
+        # outside of an app context nothing is cached
+        if not has_app_context():
+            return {}
+
+        return g.setdefault('_model_manager_cache', {})
@@ -35,3 +35,13 @@ class InvokeAuthorizationError(InvokeError):
 class InvokeBadRequestError(InvokeError):
     """Raised when the Invoke returns bad request."""
     description = "Bad Request Error"
+
+
+class InvokeCircuitOpenError(InvokeServerUnavailableError):
+    """Raised when the Invoke is rejected because the circuit breaker of the provider credentials is open."""
+    description = "Model provider is temporarily unavailable after repeated failures, please try again later."
+
+
+class InvokeConcurrencyLimitError(InvokeRateLimitError):
+    """Raised when the Invoke is rejected because the provider credentials have too many invokes in flight."""
+    description = "Too many concurrent requests to the model provider, please try again later."
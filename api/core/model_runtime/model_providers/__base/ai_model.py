@@ -1,6 +1,8 @@
 import decimal
 import os
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import Optional
 
 import yaml
@@ -18,6 +20,16 @@ from core.model_runtime.entities.model_entities import (
 )
 from core.model_runtime.errors.invoke import InvokeAuthorizationError, InvokeError
 from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
+from core.model_runtime.utils.helper import credentials_fingerprint
+
+# customizable model schemas are built from the credentials,
+# they are cached by model class, model and a fingerprint of the credentials
+CUSTOMIZABLE_MODEL_SCHEMA_CACHE_SIZE = 1024
+
+# predefined model schemas indexed by model name, read from the yaml files once per model class
+_predefined_model_schema_maps: dict[type, dict[str, AIModelEntity]] = {}
+_customizable_model_schemas: OrderedDict[tuple[type, str, str], AIModelEntity] = OrderedDict()
+_customizable_model_schemas_lock = threading.Lock()
 
 
 class AIModel(ABC):
@@ -124,6 +136,11 @@ class AIModel(ABC):
         if self.model_schemas:
             return self.model_schemas
 
+        model_schema_map = _predefined_model_schema_maps.get(type(self))
+        if model_schema_map is not None:
+            self.model_schemas = list(model_schema_map.values())
+            return self.model_schemas
+
         model_schemas = []
 
         # get module name
@@ -211,6 +228,7 @@ class AIModel(ABC):
 
         # cache model schemas
         self.model_schemas = model_schemas
+        _predefined_model_schema_maps[type(self)] = {model_schema.model: model_schema for model_schema in model_schemas}
 
         return model_schemas
 
@@ -223,19 +241,49 @@ class AIModel(ABC):
         :return: model schema
         """
         # get predefined models (predefined_models)
-        models = self.predefined_models()
+        model_schema_map = _predefined_model_schema_maps.get(type(self))
+        if model_schema_map is None:
+            model_schema_map = {model_schema.model: model_schema for model_schema in self.predefined_models()}
+            _predefined_model_schema_maps[type(self)] = model_schema_map
 
-        model_map = {model.model: model for model in models}
-        if model in model_map:
-            return model_map[model]
+        if model in model_schema_map:
+            return model_schema_map[model]
 
         if credentials:
-            model_schema = self.get_customizable_model_schema_from_credentials(model, credentials)
+            model_schema = self._get_cached_customizable_model_schema(model, credentials)
             if model_schema:
                 return model_schema
 
         return None
 
+    def _get_cached_customizable_model_schema(self, model: str, credentials: dict) -> Optional[AIModelEntity]:
+        """
+        Get customizable model schema from credentials, cached by model and a fingerprint of the credentials
+
+        :param model: model name
+        :param credentials: model credentials
+        :return: model schema
+        """
+        key = (type(self), model, credentials_fingerprint(credentials))
+
+        with _customizable_model_schemas_lock:
+            if key in _customizable_model_schemas:
+                _customizable_model_schemas.move_to_end(key)
+                return _customizable_model_schemas[key]
+
+        model_schema = self.get_customizable_model_schema_from_credentials(model, credentials)
+
+        # schemas which could not be built are not cached, they are built again on the next call
+        if model_schema is None:
+            return None
+
+        with _customizable_model_schemas_lock:
+            _customizable_model_schemas[key] = model_schema
+            while len(_customizable_model_schemas) > CUSTOMIZABLE_MODEL_SCHEMA_CACHE_SIZE:
+                _customizable_model_schemas.popitem(last=False)
+
+        return model_schema
+
     def get_customizable_model_schema_from_credentials(self, model: str, credentials: dict) -> Optional[AIModelEntity]:
         """
         Get customizable model schema from credentials
@@ -1,10 +1,13 @@
+import asyncio
 import logging
 import os
 import re
+import threading
 import time
 from abc import abstractmethod
-from collections.abc import Generator
-from typing import Optional, Union
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Callable, Generator
+from typing import Any, Optional, Union
 
 from core.model_runtime.callbacks.base_callback import Callback
 from core.model_runtime.callbacks.logging_callback import LoggingCallback
@@ -17,6 +20,7 @@ from core.model_runtime.entities.message_entities import (
     UserPromptMessage,
 )
 from core.model_runtime.entities.model_entities import (
+    AIModelEntity,
     ModelPropertyKey,
     ModelType,
     ParameterRule,
@@ -24,6 +28,7 @@ from core.model_runtime.entities.model_entities import (
     PriceType,
 )
 from core.model_runtime.model_providers.__base.ai_model import AIModel
+from core.model_runtime.utils.async_helper import iterate_in_thread
 
 logger = logging.getLogger(__name__)
 
@@ -139,6 +144,116 @@ class LargeLanguageModel(AIModel):
 
         return result
 
+    async def ainvoke(self, model: str, credentials: dict,
+                      prompt_messages: list[PromptMessage], model_parameters: Optional[dict] = None,
+                      tools: Optional[list[PromptMessageTool]] = None, stop: Optional[list[str]] = None,
+                      stream: bool = True, user: Optional[str] = None, callbacks: list[Callback] = None) \
+            -> Union[LLMResult, AsyncGenerator]:
+        """
+        Invoke large language model asynchronously, the async counterpart of invoke
+
+        :param model: model name
+        :param credentials: model credentials
+        :param prompt_messages: prompt messages
+        :param model_parameters: model parameters
+        :param tools: tools for tool calling
+        :param stop: stop words
+        :param stream: is stream response
+        :param user: unique user id
+        :param callbacks: callbacks
+        :return: full response or stream response chunk async generator result
+        """
+        # validate and filter model parameters
+        if model_parameters is None:
+            model_parameters = {}
+
+        model_parameters = self._validate_and_filter_model_parameters(model, model_parameters, credentials)
+
+        self.started_at = time.perf_counter()
+
+        callbacks = callbacks or []
+
+        if bool(os.environ.get("DEBUG")):
+            callbacks.append(LoggingCallback())
+
+        # trigger before invoke callbacks
+        self._trigger_before_invoke_callbacks(
+            model=model,
+            credentials=credentials,
+            prompt_messages=prompt_messages,
+            model_parameters=model_parameters,
+            tools=tools,
+            stop=stop,
+            stream=stream,
+            user=user,
+            callbacks=callbacks
+        )
+
+        try:
+            if "response_format" in model_parameters:
+                # code block mode rewrites the prompt and the stream, it only has the sync implementation
+                result = await asyncio.to_thread(
+                    self._code_block_mode_wrapper,
+                    model=model,
+                    credentials=credentials,
+                    prompt_messages=prompt_messages,
+                    model_parameters=model_parameters,
+                    tools=tools,
+                    stop=stop,
+                    stream=stream,
+                    user=user,
+                    callbacks=callbacks
+                )
+                if isinstance(result, Generator):
+                    result = iterate_in_thread(result)
+            else:
+                result = await self._ainvoke(model, credentials, prompt_messages, model_parameters, tools, stop,
+                                             stream, user)
+        except Exception as e:
+            self._trigger_invoke_error_callbacks(
+                model=model,
+                ex=e,
+                credentials=credentials,
+                prompt_messages=prompt_messages,
+                model_parameters=model_parameters,
+                tools=tools,
+                stop=stop,
+                stream=stream,
+                user=user,
+                callbacks=callbacks
+            )
+
+            raise self._transform_invoke_error(e)
+
+        if stream and isinstance(result, AsyncGenerator):
+            return self._ainvoke_result_generator(
+                model=model,
+                result=result,
+                credentials=credentials,
+                prompt_messages=prompt_messages,
+                model_parameters=model_parameters,
+                tools=tools,
+                stop=stop,
+                stream=stream,
+                user=user,
+                callbacks=callbacks
+            )
+        else:
+            self._trigger_after_invoke_callbacks(
+                model=model,
+                result=result,
+                credentials=credentials,
+                prompt_messages=prompt_messages,
+                model_parameters=model_parameters,
+                tools=tools,
+                stop=stop,
+                stream=stream,
+                user=user,
+                callbacks=callbacks
+            )
+
+        return result
+
     def _code_block_mode_wrapper(self, model: str, credentials: dict, prompt_messages: list[PromptMessage],
                            model_parameters: dict, tools: Optional[list[PromptMessageTool]] = None,
                            stop: Optional[list[str]] = None, stream: bool = True, user: Optional[str] = None,
@@ -383,9 +498,8 @@ if you are not sure about the structure.
         :param result: result generator
         :return: result generator
         """
-        prompt_message = AssistantPromptMessage(
-            content=""
-        )
+        # deltas are joined once the stream ended, appending to the message content is quadratic in answer length
+        content_chunks: list[str] = []
         usage = None
         system_fingerprint = None
         real_model = model
@@ -407,7 +521,73 @@ if you are not sure about the structure.
                     callbacks=callbacks
                 )
 
-                prompt_message.content += chunk.delta.message.content
+                if chunk.delta.message.content:
+                    content_chunks.append(chunk.delta.message.content)
+                real_model = chunk.model
+                if chunk.delta.usage:
+                    usage = chunk.delta.usage
+
+                if chunk.system_fingerprint:
+                    system_fingerprint = chunk.system_fingerprint
+        except Exception as e:
+            raise self._transform_invoke_error(e)
+
+        self._trigger_after_invoke_callbacks(
+            model=model,
+            result=LLMResult(
+                model=real_model,
+                prompt_messages=prompt_messages,
+                message=AssistantPromptMessage(content=''.join(content_chunks)),
+                usage=usage if usage else LLMUsage.empty_usage(),
+                system_fingerprint=system_fingerprint
+            ),
+            credentials=credentials,
+            prompt_messages=prompt_messages,
+            model_parameters=model_parameters,
+            tools=tools,
+            stop=stop,
+            stream=stream,
+            user=user,
+            callbacks=callbacks
+        )
+
+    async def _ainvoke_result_generator(self, model: str, result: AsyncGenerator, credentials: dict,
+                                        prompt_messages: list[PromptMessage], model_parameters: dict,
+                                        tools: Optional[list[PromptMessageTool]] = None,
+                                        stop: Optional[list[str]] = None, stream: bool = True,
+                                        user: Optional[str] = None, callbacks: list[Callback] = None) \
+            -> AsyncGenerator:
+        """
+        Invoke result async generator, the async counterpart of _invoke_result_generator
+
+        :param result: result generator
+        :return: result async generator
+        """
+        # deltas are joined once the stream ended, appending to the message content is quadratic in answer length
+        content_chunks: list[str] = []
+        usage = None
+        system_fingerprint = None
+        real_model = model
+
+        try:
+            async for chunk in result:
+                yield chunk
+
+                self._trigger_new_chunk_callbacks(
+                    chunk=chunk,
+                    model=model,
+                    credentials=credentials,
+                    prompt_messages=prompt_messages,
+                    model_parameters=model_parameters,
+                    tools=tools,
+                    stop=stop,
+                    stream=stream,
+                    user=user,
+                    callbacks=callbacks
+                )
+
+                if chunk.delta.message.content:
+                    content_chunks.append(chunk.delta.message.content)
                 real_model = chunk.model
                 if chunk.delta.usage:
                     usage = chunk.delta.usage
@@ -422,7 +602,7 @@ if you are not sure about the structure.
             result=LLMResult(
                 model=real_model,
                 prompt_messages=prompt_messages,
-                message=prompt_message,
+                message=AssistantPromptMessage(content=''.join(content_chunks)),
                 usage=usage if usage else LLMUsage.empty_usage(),
                 system_fingerprint=system_fingerprint
             ),
@@ -456,6 +636,34 @@ if you are not sure about the structure.
         :return: full response or stream response chunk generator result
         """
         raise NotImplementedError
+
+    async def _ainvoke(self, model: str, credentials: dict,
+                       prompt_messages: list[PromptMessage], model_parameters: dict,
+                       tools: Optional[list[PromptMessageTool]] = None, stop: Optional[list[str]] = None,
+                       stream: bool = True, user: Optional[str] = None) \
+            -> Union[LLMResult, AsyncGenerator]:
+        """
+        Invoke large language model asynchronously.
+        Providers with an async client override it, the others run _invoke in worker threads.
+
+        :param model: model name
+        :param credentials: model credentials
+        :param prompt_messages: prompt messages
+        :param model_parameters: model parameters
+        :param tools: tools for tool calling
+        :param stop: stop words
+        :param stream: is stream response
+        :param user: unique user id
+        :return: full response or stream response chunk async generator result
+        """
+        result = await asyncio.to_thread(
+            self._invoke, model, credentials, prompt_messages, model_parameters, tools, stop, stream, user
+        )
+
+        if isinstance(result, Generator):
+            return iterate_in_thread(result)
+
+        return result
     
     @abstractmethod
     def get_num_tokens(self, model: str, credentials: dict, prompt_messages: list[PromptMessage],
@@ -745,11 +953,13 @@ if you are not sure about the structure.
         :param credentials: model credentials
         :return:
         """
-        parameter_rules = self.get_parameter_rules(model, credentials)
+        model_schema = self.get_model_schema(model, credentials)
+        if not model_schema:
+            return {}
 
         # validate model parameters
         filtered_model_parameters = {}
-        for parameter_rule in parameter_rules:
+        for parameter_rule in _get_compiled_parameter_rules(model_schema):
             parameter_name = parameter_rule.name
             parameter_value = model_parameters.get(parameter_name)
             if parameter_value is None:
@@ -766,54 +976,116 @@ if you are not sure about the structure.
                     else:
                         continue
 
-            # validate parameter value type
-            if parameter_rule.type == ParameterType.INT:
-                if not isinstance(parameter_value, int):
-                    raise ValueError(f"Model Parameter {parameter_name} should be int.")
-
-                # validate parameter value range
-                if parameter_rule.min is not None and parameter_value < parameter_rule.min:
-                    raise ValueError(
-                        f"Model Parameter {parameter_name} should be greater than or equal to {parameter_rule.min}.")
-
-                if parameter_rule.max is not None and parameter_value > parameter_rule.max:
-                    raise ValueError(
-                        f"Model Parameter {parameter_name} should be less than or equal to {parameter_rule.max}.")
-            elif parameter_rule.type == ParameterType.FLOAT:
-                if not isinstance(parameter_value, float | int):
-                    raise ValueError(f"Model Parameter {parameter_name} should be float.")
-
-                # validate parameter value precision
-                if parameter_rule.precision is not None:
-                    if parameter_rule.precision == 0:
-                        if parameter_value != int(parameter_value):
-                            raise ValueError(f"Model Parameter {parameter_name} should be int.")
-                    else:
-                        if parameter_value != round(parameter_value, parameter_rule.precision):
-                            raise ValueError(
-                                f"Model Parameter {parameter_name} should be round to {parameter_rule.precision} decimal places.")
-
-                # validate parameter value range
-                if parameter_rule.min is not None and parameter_value < parameter_rule.min:
-                    raise ValueError(
-                        f"Model Parameter {parameter_name} should be greater than or equal to {parameter_rule.min}.")
-
-                if parameter_rule.max is not None and parameter_value > parameter_rule.max:
-                    raise ValueError(
-                        f"Model Parameter {parameter_name} should be less than or equal to {parameter_rule.max}.")
-            elif parameter_rule.type == ParameterType.BOOLEAN:
-                if not isinstance(parameter_value, bool):
-                    raise ValueError(f"Model Parameter {parameter_name} should be bool.")
-            elif parameter_rule.type == ParameterType.STRING:
-                if not isinstance(parameter_value, str):
-                    raise ValueError(f"Model Parameter {parameter_name} should be string.")
-
-                # validate options
-                if parameter_rule.options and parameter_value not in parameter_rule.options:
-                    raise ValueError(f"Model Parameter {parameter_name} should be one of {parameter_rule.options}.")
-            else:
-                raise ValueError(f"Model Parameter {parameter_name} type {parameter_rule.type} is not supported.")
+            parameter_rule.validate(parameter_value)
 
             filtered_model_parameters[parameter_name] = parameter_value
 
         return filtered_model_parameters
+
+
+class _CompiledParameterRule:
+    """
+    Parameter rule with a validator of its type, options and range, compiled once per model schema.
+    """
+    def __init__(self, parameter_rule: ParameterRule) -> None:
+        self.name = parameter_rule.name
+        self.use_template = parameter_rule.use_template
+        self.required = parameter_rule.required
+        self.default = parameter_rule.default
+        self.validate = _compile_parameter_validator(parameter_rule)
+
+
+def _compile_parameter_validator(parameter_rule: ParameterRule) -> Callable[[Any], None]:
+    """
+    Compile the validator of the value of a parameter rule, which raises ValueError for invalid values
+
+    :param parameter_rule: parameter rule
+    :return: validator
+    """
+    parameter_name = parameter_rule.name
+    parameter_type = parameter_rule.type
+    min_value = parameter_rule.min
+    max_value = parameter_rule.max
+    precision = parameter_rule.precision
+    options = parameter_rule.options
+
+    def validate_range(parameter_value: Any) -> None:
+        if min_value is not None and parameter_value < min_value:
+            raise ValueError(
+                f"Model Parameter {parameter_name} should be greater than or equal to {min_value}.")
+
+        if max_value is not None and parameter_value > max_value:
+            raise ValueError(
+                f"Model Parameter {parameter_name} should be less than or equal to {max_value}.")
+
+    if parameter_type == ParameterType.INT:
+        def validate(parameter_value: Any) -> None:
+            if not isinstance(parameter_value, int):
+                raise ValueError(f"Model Parameter {parameter_name} should be int.")
+
+            validate_range(parameter_value)
+    elif parameter_type == ParameterType.FLOAT:
+        def validate(parameter_value: Any) -> None:
+            if not isinstance(parameter_value, float | int):
+                raise ValueError(f"Model Parameter {parameter_name} should be float.")
+
+            # validate parameter value precision
+            if precision is not None:
+                if precision == 0:
+                    if parameter_value != int(parameter_value):
+                        raise ValueError(f"Model Parameter {parameter_name} should be int.")
+                else:
+                    if parameter_value != round(parameter_value, precision):
+                        raise ValueError(
+                            f"Model Parameter {parameter_name} should be round to {precision} decimal places.")
+
+            validate_range(parameter_value)
+    elif parameter_type == ParameterType.BOOLEAN:
+        def validate(parameter_value: Any) -> None:
+            if not isinstance(parameter_value, bool):
+                raise ValueError(f"Model Parameter {parameter_name} should be bool.")
+    elif parameter_type == ParameterType.STRING:
+        def validate(parameter_value: Any) -> None:
+            if not isinstance(parameter_value, str):
+                raise ValueError(f"Model Parameter {parameter_name} should be string.")
+
+            # validate options
+            if options and parameter_value not in options:
+                raise ValueError(f"Model Parameter {parameter_name} should be one of {options}.")
+    else:
+        def validate(parameter_value: Any) -> None:
+            raise ValueError(f"Model Parameter {parameter_name} type {parameter_type} is not supported.")
+
+    return validate
+
+
+# compiled parameter rules by model schema id, the schema is kept with them so that the id is not reused
+COMPILED_PARAMETER_RULES_CACHE_SIZE = 2048
+_compiled_parameter_rules: OrderedDict[int, tuple[AIModelEntity, list[_CompiledParameterRule]]] = OrderedDict()
+_compiled_parameter_rules_lock = threading.Lock()
+
+
+def _get_compiled_parameter_rules(model_schema: AIModelEntity) -> list[_CompiledParameterRule]:
+    """
+    Get the compiled parameter rules of the model schema
+
+    :param model_schema: model schema
+    :return: compiled parameter rules
+    """
+    key = id(model_schema)
+    with _compiled_parameter_rules_lock:
+        entry = _compiled_parameter_rules.get(key)
+        if entry is not None and entry[0] is model_schema:
+            _compiled_parameter_rules.move_to_end(key)
+            return entry[1]
+
+    compiled_parameter_rules = [
+        _CompiledParameterRule(parameter_rule) for parameter_rule in model_schema.parameter_rules
+    ]
+
+    with _compiled_parameter_rules_lock:
+        _compiled_parameter_rules[key] = (model_schema, compiled_parameter_rules)
+        while len(_compiled_parameter_rules) > COMPILED_PARAMETER_RULES_CACHE_SIZE:
+            _compiled_parameter_rules.popitem(last=False)
+
+    return compiled_parameter_rules
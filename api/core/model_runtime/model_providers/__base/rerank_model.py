@@ -1,3 +1,4 @@
+import asyncio
 import time
 from abc import abstractmethod
 from typing import Optional
@@ -36,6 +37,29 @@ class RerankModel(AIModel):
         except Exception as e:
             raise self._transform_invoke_error(e)
 
+    async def ainvoke(self, model: str, credentials: dict,
+                      query: str, docs: list[str], score_threshold: Optional[float] = None,
+                      top_n: Optional[int] = None, user: Optional[str] = None) \
+            -> RerankResult:
+        """
+        Invoke rerank model asynchronously, the async counterpart of invoke
+
+        :param model: model name
+        :param credentials: model credentials
+        :param query: search query
+        :param docs: docs for reranking
+        :param score_threshold: score threshold
+        :param top_n: top n
+        :param user: unique user id
+        :return: rerank result
+        """
+        self.started_at = time.perf_counter()
+
+        try:
+            return await self._ainvoke(model, credentials, query, docs, score_threshold, top_n, user)
+        except Exception as e:
+            raise self._transform_invoke_error(e)
+
     @abstractmethod
     def _invoke(self, model: str, credentials: dict,
                 query: str, docs: list[str], score_threshold: Optional[float] = None, top_n: Optional[int] = None,
@@ -54,3 +78,22 @@ class RerankModel(AIModel):
         :return: rerank result
         """
         raise NotImplementedError
+
+    async def _ainvoke(self, model: str, credentials: dict,
+                       query: str, docs: list[str], score_threshold: Optional[float] = None,
+                       top_n: Optional[int] = None, user: Optional[str] = None) \
+            -> RerankResult:
+        """
+        Invoke rerank model asynchronously.
+        Providers with an async client override it, the others run _invoke in a worker thread.
+
+        :param model: model name
+        :param credentials: model credentials
+        :param query: search query
+        :param docs: docs for reranking
+        :param score_threshold: score threshold
+        :param top_n: top n
+        :param user: unique user id
+        :return: rerank result
+        """
+        return await asyncio.to_thread(self._invoke, model, credentials, query, docs, score_threshold, top_n, user)
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from abc import abstractmethod
 from typing import Optional
@@ -32,6 +33,25 @@ class TextEmbeddingModel(AIModel):
         except Exception as e:
             raise self._transform_invoke_error(e)
 
+    async def ainvoke(self, model: str, credentials: dict,
+                      texts: list[str], user: Optional[str] = None) \
+            -> TextEmbeddingResult:
+        """
+        Invoke text embedding model asynchronously, the async counterpart of invoke
+
+        :param model: model name
+        :param credentials: model credentials
+        :param texts: texts to embed
+        :param user: unique user id
+        :return: embeddings result
+        """
+        self.started_at = time.perf_counter()
+
+        try:
+            return await self._ainvoke(model, credentials, texts, user)
+        except Exception as e:
+            raise self._transform_invoke_error(e)
+
     @abstractmethod
     def _invoke(self, model: str, credentials: dict,
                 texts: list[str], user: Optional[str] = None) \
@@ -47,6 +67,21 @@ class TextEmbeddingModel(AIModel):
         """
         raise NotImplementedError
 
+    async def _ainvoke(self, model: str, credentials: dict,
+                       texts: list[str], user: Optional[str] = None) \
+            -> TextEmbeddingResult:
+        """
+        Invoke text embedding model asynchronously.
+        Providers with an async client override it, the others run _invoke in a worker thread.
+
+        :param model: model name
+        :param credentials: model credentials
+        :param texts: texts to embed
+        :param user: unique user id
+        :return: embeddings result
+        """
+        return await asyncio.to_thread(self._invoke, model, credentials, texts, user)
+
     @abstractmethod
     def get_num_tokens(self, model: str, credentials: dict, texts: list[str]) -> int:
         """
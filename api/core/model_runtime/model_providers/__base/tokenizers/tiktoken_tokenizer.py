@@ -0,0 +1,51 @@
+import json
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Optional
+
+import tiktoken
+
+from core.model_runtime.entities.message_entities import PromptMessageTool
+from core.model_runtime.model_providers.__base.tokenizers.token_count_cache import token_count_cache
+
+
+class TiktokenTokenizer:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def get_encoding_for_model(model: str) -> Optional[tiktoken.Encoding]:
+        """
+        Get the encoding of the model, resolved once per model.
+
+        :param model: model name
+        :return: encoding, None if the model is unknown to tiktoken
+        """
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return None
+
+    @staticmethod
+    def get_num_tokens(encoding: tiktoken.Encoding, text: str) -> int:
+        """
+        Get number of tokens of the text, cached by the hash of the text.
+
+        :param encoding: encoding
+        :param text: text
+        :return: number of tokens
+        """
+        return token_count_cache.get_num_tokens(encoding.name, text, lambda t: len(encoding.encode(t)))
+
+    @staticmethod
+    def get_num_tokens_for_tool(encoding: tiktoken.Encoding, tool: PromptMessageTool,
+                                count: Callable[[tiktoken.Encoding, PromptMessageTool], int]) -> int:
+        """
+        Get number of tokens of the tool schema, cached by the hash of the schema.
+
+        :param encoding: encoding
+        :param tool: tool
+        :param count: function which counts the tokens of the tool
+        :return: number of tokens
+        """
+        schema = json.dumps(tool.dict(), sort_keys=True, ensure_ascii=False)
+        return token_count_cache.get_num_tokens(f'{encoding.name}:{count.__qualname__}', schema,
+                                                lambda _: count(encoding, tool))
@@ -0,0 +1,46 @@
+import hashlib
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import Lock
+
+TOKEN_COUNT_CACHE_CAPACITY = 8192
+
+
+class TokenCountCache:
+    """
+    Bounded LRU cache of token counts, keyed by the tokenizer and a hash of the text,
+    the same system prompts, histories and tool schemas are counted many times for a single invoke.
+    """
+    def __init__(self, capacity: int = TOKEN_COUNT_CACHE_CAPACITY) -> None:
+        self.capacity = capacity
+        self._cache: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+        self._lock = Lock()
+
+    def get_num_tokens(self, tokenizer: str, text: str, count: Callable[[str], int]) -> int:
+        """
+        Get the cached number of tokens of the text, counted by count on a miss.
+
+        :param tokenizer: name of the tokenizer, the counts of different tokenizers are cached separately
+        :param text: text
+        :param count: function which counts the tokens of the text
+        :return: number of tokens
+        """
+        key = (tokenizer, hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest())
+
+        with self._lock:
+            num_tokens = self._cache.get(key)
+            if num_tokens is not None:
+                self._cache.move_to_end(key)
+                return num_tokens
+
+        num_tokens = count(text)
+
+        with self._lock:
+            self._cache[key] = num_tokens
+            if len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+
+        return num_tokens
+
+
+token_count_cache = TokenCountCache()
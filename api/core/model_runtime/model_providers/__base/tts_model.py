@@ -2,11 +2,18 @@ import hashlib
 import subprocess
 import uuid
 from abc import abstractmethod
+from collections.abc import Callable, Generator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, reduce
+from io import BytesIO
 from typing import Optional
 
+from pydub import AudioSegment
+
 from core.model_runtime.entities.model_entities import ModelPropertyKey, ModelType
 from core.model_runtime.errors.invoke import InvokeBadRequestError
 from core.model_runtime.model_providers.__base.ai_model import AIModel
+from extensions.ext_storage import storage
 
 
 class TTSModel(AIModel):
@@ -139,22 +146,172 @@ class TTSModel(AIModel):
         if buf:
             yield ''.join(buf)
 
+    def _synthesize_audio(self, model: str, tenant_id: Optional[str], content_text: str, voice: str,
+                          audio_type: str, word_limit: int, max_workers: int,
+                          synthesize: Callable[[str], Optional[bytes]]) -> bytes:
+        """
+        Synthesize the audio of the whole text, cached in storage when tenant id is given
+
+        :param model: model name
+        :param tenant_id: user tenant id
+        :param content_text: text content to be translated
+        :param voice: model timbre
+        :param audio_type: audio file type
+        :param word_limit: word limit of a sentence
+        :param max_workers: max number of sentences synthesized concurrently
+        :param synthesize: function which synthesizes the audio of a sentence
+        :return: audio
+        """
+        file_path = self._get_audio_file_path(model, tenant_id, content_text, voice, audio_type) if tenant_id else None
+        if file_path and storage.exists(file_path):
+            return storage.load_once(file_path)
+
+        audio_bytes_list = list(self._synthesize_sentences(content_text, word_limit, max_workers, synthesize))
+        if not audio_bytes_list:
+            return b''
+
+        audio = self._concat_audio(audio_bytes_list, audio_type)
+        if file_path:
+            storage.save(file_path, audio)
+
+        return audio
+
+    def _synthesize_audio_streaming(self, model: str, tenant_id: str, content_text: str, voice: str,
+                                    audio_type: str, word_limit: int, max_workers: int,
+                                    synthesize: Callable[[str], Optional[bytes]]) -> Generator[bytes, None, None]:
+        """
+        Synthesize the audio of the text sentence by sentence, the audio of the first sentence is
+        yielded as soon as it is synthesized. Only mp3 frames can be concatenated as they are,
+        audio of other types is yielded once all sentences are synthesized.
+        The finished audio is cached in storage.
+
+        :param model: model name
+        :param tenant_id: user tenant id
+        :param content_text: text content to be translated
+        :param voice: model timbre
+        :param audio_type: audio file type
+        :param word_limit: word limit of a sentence
+        :param max_workers: max number of sentences synthesized concurrently
+        :param synthesize: function which synthesizes the audio of a sentence
+        :return: audio chunk generator
+        """
+        file_path = self._get_audio_file_path(model, tenant_id, content_text, voice, audio_type)
+        if storage.exists(file_path):
+            yield from storage.load_stream(file_path)
+            return
+
+        audio_bytes_list = []
+        for audio_bytes in self._synthesize_sentences(content_text, word_limit, max_workers, synthesize):
+            if audio_type == 'mp3':
+                audio_bytes = self._strip_id3_tags(audio_bytes, keep_header=not audio_bytes_list)
+                yield audio_bytes
+
+            audio_bytes_list.append(audio_bytes)
+
+        if not audio_bytes_list:
+            return
+
+        if audio_type == 'mp3':
+            audio = b''.join(audio_bytes_list)
+        else:
+            audio = self._concat_audio(audio_bytes_list, audio_type)
+            yield audio
+
+        storage.save(file_path, audio)
+
+    def _synthesize_sentences(self, content_text: str, word_limit: int, max_workers: int,
+                              synthesize: Callable[[str], Optional[bytes]]) -> Generator[bytes, None, None]:
+        """
+        Split the text into sentences and synthesize them in a thread pool,
+        the audio of each sentence is yielded in order as soon as it is synthesized
+
+        :param content_text: text content to be translated
+        :param word_limit: word limit of a sentence
+        :param max_workers: max number of sentences synthesized concurrently
+        :param synthesize: function which synthesizes the audio of a sentence
+        :return: audio of sentences
+        """
+        sentences = list(self._split_text_into_sentences(text=content_text, limit=word_limit))
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [executor.submit(synthesize, sentence) for sentence in sentences]
+            for future in futures:
+                try:
+                    audio_bytes = future.result()
+                except Exception as ex:
+                    raise InvokeBadRequestError(str(ex))
+
+                if audio_bytes:
+                    yield audio_bytes
+        finally:
+            # the remaining sentences are not needed when the client went away or a sentence failed
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _concat_audio(self, audio_bytes_list: list[bytes], audio_type: str) -> bytes:
+        """
+        Concatenate the audio of sentences, mp3 frames are concatenated without decoding
+
+        :param audio_bytes_list: audio of sentences
+        :param audio_type: audio file type
+        :return: audio
+        """
+        if audio_type == 'mp3':
+            return b''.join(self._strip_id3_tags(audio_bytes, keep_header=index == 0)
+                            for index, audio_bytes in enumerate(audio_bytes_list))
+
+        audio_segments = [AudioSegment.from_file(BytesIO(audio_bytes), format=audio_type)
+                          for audio_bytes in audio_bytes_list]
+        combined_segment = reduce(lambda x, y: x + y, audio_segments)
+        buffer = BytesIO()
+        combined_segment.export(buffer, format=audio_type)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _strip_id3_tags(audio_bytes: bytes, keep_header: bool) -> bytes:
+        """
+        Strip the ID3 tags of a mp3 clip, so that its frames can be appended to another clip
+
+        :param audio_bytes: mp3 clip
+        :param keep_header: keep the leading ID3v2 tag, for the first clip of the audio
+        :return: mp3 clip
+        """
+        if not keep_header and audio_bytes[:3] == b'ID3' and len(audio_bytes) >= 10:
+            # the tag size is a 28 bit synchsafe integer, excluding the header and the optional footer
+            tag_size = ((audio_bytes[6] & 0x7f) << 21 | (audio_bytes[7] & 0x7f) << 14
+                        | (audio_bytes[8] & 0x7f) << 7 | (audio_bytes[9] & 0x7f))
+            footer_size = 10 if audio_bytes[5] & 0x10 else 0
+            audio_bytes = audio_bytes[10 + tag_size + footer_size:]
+
+        # ID3v1 tag is the last 128 bytes
+        if audio_bytes[-128:-125] == b'TAG':
+            audio_bytes = audio_bytes[:-128]
+
+        return audio_bytes
+
+    def _get_audio_file_path(self, model: str, tenant_id: str, content_text: str, voice: str, audio_type: str) -> str:
+        """
+        Get the storage path of the synthesized audio of the text
+
+        :param model: model name
+        :param tenant_id: user tenant id
+        :param content_text: text content to be translated
+        :param voice: model timbre
+        :param audio_type: audio file type
+        :return: file path
+        """
+        tts_file_id = self._get_file_name(content_text)
+        return f'generate_files/audio/{tenant_id}/{tts_file_id}-{model}-{voice}.{audio_type}'
+
     @staticmethod
     def _is_ffmpeg_installed():
-        try:
-            output = subprocess.check_output("ffmpeg -version", shell=True)
-            if "ffmpeg version" in output.decode("utf-8"):
-                return True
-            else:
-                raise InvokeBadRequestError("ffmpeg is not installed, "
-                                            "details: https://docs.dify.ai/getting-started/install-self-hosted"
-                                            "/install-faq#id-14.-what-to-do-if-this-error-occurs-in-text-to-speech")
-        except Exception:
+        if not _check_ffmpeg_installed():
             raise InvokeBadRequestError("ffmpeg is not installed, "
                                         "details: https://docs.dify.ai/getting-started/install-self-hosted"
                                         "/install-faq#id-14.-what-to-do-if-this-error-occurs-in-text-to-speech")
 
-    # Todo: To improve the streaming function
+        return True
+
     @staticmethod
     def _get_file_name(file_content: str) -> str:
         hash_object = hashlib.sha256(file_content.encode())
@@ -163,3 +320,17 @@ class TTSModel(AIModel):
         namespace_uuid = uuid.UUID('a5da6ef9-b303-596f-8e88-bf8fa40f4b31')
         unique_uuid = uuid.uuid5(namespace_uuid, hex_digest)
         return str(unique_uuid)
+
+
+@lru_cache(maxsize=1)
+def _check_ffmpeg_installed() -> bool:
+    """
+    Check whether ffmpeg is installed, only once per process
+
+    :return: whether ffmpeg is installed
+    """
+    try:
+        output = subprocess.check_output(["ffmpeg", "-version"])
+        return "ffmpeg version" in output.decode("utf-8")
+    except Exception:
+        return False
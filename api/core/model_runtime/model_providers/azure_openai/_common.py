@@ -1,5 +1,6 @@
 import openai
 from httpx import Timeout
+from openai import AzureOpenAI
 
 from core.model_runtime.errors.invoke import (
     InvokeAuthorizationError,
@@ -10,6 +11,7 @@ from core.model_runtime.errors.invoke import (
     InvokeServerUnavailableError,
 )
 from core.model_runtime.model_providers.azure_openai._constant import AZURE_OPENAI_API_VERSION
+from core.model_runtime.utils.client_pool import model_client_pool, new_httpx_client
 
 
 class _CommonAzureOpenAI:
@@ -25,6 +27,13 @@ class _CommonAzureOpenAI:
 
         return credentials_kwargs
 
+    @staticmethod
+    def _get_client(credentials_kwargs: dict) -> AzureOpenAI:
+        return model_client_pool.get_client(
+            'azure_openai', credentials_kwargs,
+            lambda: AzureOpenAI(**credentials_kwargs, http_client=new_httpx_client())
+        )
+
     @property
     def _invoke_error_mapping(self) -> dict[type[InvokeError], list[type[Exception]]]:
         return {
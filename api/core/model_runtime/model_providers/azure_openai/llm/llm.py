@@ -4,7 +4,7 @@ from collections.abc import Generator
 from typing import Optional, Union, cast
 
 import tiktoken
-from openai import AzureOpenAI, Stream
+from openai import Stream
 from openai.types import Completion
 from openai.types.chat import ChatCompletion, ChatCompletionChunk, ChatCompletionMessageToolCall
 from openai.types.chat.chat_completion_chunk import ChoiceDeltaFunctionCall, ChoiceDeltaToolCall
@@ -25,6 +25,7 @@ from core.model_runtime.entities.message_entities import (
 from core.model_runtime.entities.model_entities import AIModelEntity, ModelPropertyKey
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.model_providers.__base.tokenizers.tiktoken_tokenizer import TiktokenTokenizer
 from core.model_runtime.model_providers.azure_openai._common import _CommonAzureOpenAI
 from core.model_runtime.model_providers.azure_openai._constant import LLM_BASE_MODELS, AzureBaseModel
 
@@ -94,7 +95,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
             raise CredentialsValidateFailedError(f'Base Model Name {credentials["base_model_name"]} is invalid')
 
         try:
-            client = AzureOpenAI(**self._to_credential_kwargs(credentials))
+            client = self._get_client(self._to_credential_kwargs(credentials))
 
             if ai_model_entity.entity.model_properties.get(ModelPropertyKey.MODE) == LLMMode.CHAT.value:
                 # chat model
@@ -125,7 +126,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
                   prompt_messages: list[PromptMessage], model_parameters: dict, stop: Optional[list[str]] = None,
                   stream: bool = True, user: Optional[str] = None) -> Union[LLMResult, Generator]:
 
-        client = AzureOpenAI(**self._to_credential_kwargs(credentials))
+        client = self._get_client(self._to_credential_kwargs(credentials))
 
         extra_model_kwargs = {}
 
@@ -184,7 +185,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
 
     def _handle_generate_stream_response(self, model: str, credentials: dict, response: Stream[Completion],
                                          prompt_messages: list[PromptMessage]) -> Generator:
-        full_text = ''
+        full_text_chunks = []
         for chunk in response:
             if len(chunk.choices) == 0:
                 continue
@@ -196,11 +197,11 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
 
             # transform assistant message to prompt message
             text = delta.text if delta.text else ''
-            assistant_prompt_message = AssistantPromptMessage(
+            assistant_prompt_message = AssistantPromptMessage.construct(
                 content=text
             )
 
-            full_text += text
+            full_text_chunks.append(text)
 
             if delta.finish_reason is not None:
                 # calculate num tokens
@@ -211,7 +212,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
                 else:
                     # calculate num tokens
                     prompt_tokens = self._num_tokens_from_string(credentials, prompt_messages[0].content)
-                    completion_tokens = self._num_tokens_from_string(credentials, full_text)
+                    completion_tokens = self._num_tokens_from_string(credentials, ''.join(full_text_chunks))
 
                 # transform usage
                 usage = self._calc_response_usage(model, credentials, prompt_tokens, completion_tokens)
@@ -228,11 +229,12 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
                     )
                 )
             else:
-                yield LLMResultChunk(
+                # chunks are built from the parsed response, skip the validation on the hot loop
+                yield LLMResultChunk.construct(
                     model=chunk.model,
                     prompt_messages=prompt_messages,
                     system_fingerprint=chunk.system_fingerprint,
-                    delta=LLMResultChunkDelta(
+                    delta=LLMResultChunkDelta.construct(
                         index=delta.index,
                         message=assistant_prompt_message,
                     )
@@ -243,7 +245,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
                        tools: Optional[list[PromptMessageTool]] = None, stop: Optional[list[str]] = None,
                        stream: bool = True, user: Optional[str] = None) -> Union[LLMResult, Generator]:
 
-        client = AzureOpenAI(**self._to_credential_kwargs(credentials))
+        client = self._get_client(self._to_credential_kwargs(credentials))
 
         response_format = model_parameters.get("response_format")
         if response_format:
@@ -332,11 +334,10 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
                                               prompt_messages: list[PromptMessage],
                                               tools: Optional[list[PromptMessageTool]] = None) -> Generator:
         index = 0
-        full_assistant_content = ''
         delta_assistant_message_function_call_storage: ChoiceDeltaFunctionCall = None
         real_model = model
         system_fingerprint = None
-        completion = ''
+        completion_chunks = []
         for chunk in response:
             if len(chunk.choices) == 0:
                 continue
@@ -375,22 +376,22 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
             tool_calls = [function_call] if function_call else []
 
             # transform assistant message to prompt message
-            assistant_prompt_message = AssistantPromptMessage(
+            assistant_prompt_message = AssistantPromptMessage.construct(
                 content=delta.delta.content if delta.delta.content else '',
                 tool_calls=tool_calls
             )
 
-            full_assistant_content += delta.delta.content if delta.delta.content else ''
-
             real_model = chunk.model
             system_fingerprint = chunk.system_fingerprint
-            completion += delta.delta.content if delta.delta.content else ''
+            if delta.delta.content:
+                completion_chunks.append(delta.delta.content)
 
-            yield LLMResultChunk(
+            # chunks are built from the parsed response, skip the validation on the hot loop
+            yield LLMResultChunk.construct(
                 model=real_model,
                 prompt_messages=prompt_messages,
                 system_fingerprint=system_fingerprint,
-                delta=LLMResultChunkDelta(
+                delta=LLMResultChunkDelta.construct(
                     index=index,
                     message=assistant_prompt_message,
                 )
@@ -402,7 +403,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
         prompt_tokens = self._num_tokens_from_messages(credentials, prompt_messages, tools)
 
         full_assistant_prompt_message = AssistantPromptMessage(
-            content=completion
+            content=''.join(completion_chunks)
         )
         completion_tokens = self._num_tokens_from_messages(credentials, [full_assistant_prompt_message])
 
@@ -526,12 +527,10 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
 
     def _num_tokens_from_string(self, credentials: dict, text: str,
                                 tools: Optional[list[PromptMessageTool]] = None) -> int:
-        try:
-            encoding = tiktoken.encoding_for_model(credentials['base_model_name'])
-        except KeyError:
-            encoding = tiktoken.get_encoding("cl100k_base")
+        encoding = TiktokenTokenizer.get_encoding_for_model(credentials['base_model_name']) \
+            or tiktoken.get_encoding("cl100k_base")
 
-        num_tokens = len(encoding.encode(text))
+        num_tokens = TiktokenTokenizer.get_num_tokens(encoding, text)
 
         if tools:
             num_tokens += self._num_tokens_for_tools(encoding, tools)
@@ -545,9 +544,8 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
         Official documentation: https://github.com/openai/openai-cookbook/blob/
         main/examples/How_to_format_inputs_to_ChatGPT_models.ipynb"""
         model = credentials['base_model_name']
-        try:
-            encoding = tiktoken.encoding_for_model(model)
-        except KeyError:
+        encoding = TiktokenTokenizer.get_encoding_for_model(model)
+        if encoding is None:
             logger.warning("Warning: model not found. Using cl100k_base encoding.")
             model = "cl100k_base"
             encoding = tiktoken.get_encoding(model)
@@ -588,16 +586,16 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
                 if key == "tool_calls":
                     for tool_call in value:
                         for t_key, t_value in tool_call.items():
-                            num_tokens += len(encoding.encode(t_key))
+                            num_tokens += TiktokenTokenizer.get_num_tokens(encoding, t_key)
                             if t_key == "function":
                                 for f_key, f_value in t_value.items():
-                                    num_tokens += len(encoding.encode(f_key))
-                                    num_tokens += len(encoding.encode(f_value))
+                                    num_tokens += TiktokenTokenizer.get_num_tokens(encoding, f_key)
+                                    num_tokens += TiktokenTokenizer.get_num_tokens(encoding, f_value)
                             else:
-                                num_tokens += len(encoding.encode(t_key))
-                                num_tokens += len(encoding.encode(t_value))
+                                num_tokens += TiktokenTokenizer.get_num_tokens(encoding, t_key)
+                                num_tokens += TiktokenTokenizer.get_num_tokens(encoding, t_value)
                 else:
-                    num_tokens += len(encoding.encode(str(value)))
+                    num_tokens += TiktokenTokenizer.get_num_tokens(encoding, str(value))
 
                 if key == "name":
                     num_tokens += tokens_per_name
@@ -615,39 +613,55 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
 
         num_tokens = 0
         for tool in tools:
-            num_tokens += len(encoding.encode('type'))
-            num_tokens += len(encoding.encode('function'))
-
-            # calculate num tokens for function object
-            num_tokens += len(encoding.encode('name'))
-            num_tokens += len(encoding.encode(tool.name))
-            num_tokens += len(encoding.encode('description'))
-            num_tokens += len(encoding.encode(tool.description))
-            parameters = tool.parameters
-            num_tokens += len(encoding.encode('parameters'))
-            if 'title' in parameters:
-                num_tokens += len(encoding.encode('title'))
-                num_tokens += len(encoding.encode(parameters.get("title")))
-            num_tokens += len(encoding.encode('type'))
-            num_tokens += len(encoding.encode(parameters.get("type")))
-            if 'properties' in parameters:
-                num_tokens += len(encoding.encode('properties'))
-                for key, value in parameters.get('properties').items():
-                    num_tokens += len(encoding.encode(key))
-                    for field_key, field_value in value.items():
+            num_tokens += TiktokenTokenizer.get_num_tokens_for_tool(
+                encoding, tool, AzureOpenAILargeLanguageModel._num_tokens_for_tool
+            )
+
+        return num_tokens
+
+    @staticmethod
+    def _num_tokens_for_tool(encoding: tiktoken.Encoding, tool: PromptMessageTool) -> int:
+        """
+        Calculate num tokens for the schema of a tool with tiktoken package.
+
+        :param encoding: encoding
+        :param tool: tool
+        :return: number of tokens
+        """
+        num_tokens = 0
+        num_tokens += len(encoding.encode('type'))
+        num_tokens += len(encoding.encode('function'))
+
+        # calculate num tokens for function object
+        num_tokens += len(encoding.encode('name'))
+        num_tokens += len(encoding.encode(tool.name))
+        num_tokens += len(encoding.encode('description'))
+        num_tokens += len(encoding.encode(tool.description))
+        parameters = tool.parameters
+        num_tokens += len(encoding.encode('parameters'))
+        if 'title' in parameters:
+            num_tokens += len(encoding.encode('title'))
+            num_tokens += len(encoding.encode(parameters.get("title")))
+        num_tokens += len(encoding.encode('type'))
+        num_tokens += len(encoding.encode(parameters.get("type")))
+        if 'properties' in parameters:
+            num_tokens += len(encoding.encode('properties'))
+            for key, value in parameters.get('properties').items():
+                num_tokens += len(encoding.encode(key))
+                for field_key, field_value in value.items():
+                    num_tokens += len(encoding.encode(field_key))
+                    if field_key == 'enum':
+                        for enum_field in field_value:
+                            num_tokens += 3
+                            num_tokens += len(encoding.encode(enum_field))
+                    else:
                         num_tokens += len(encoding.encode(field_key))
-                        if field_key == 'enum':
-                            for enum_field in field_value:
-                                num_tokens += 3
-                                num_tokens += len(encoding.encode(enum_field))
-                        else:
-                            num_tokens += len(encoding.encode(field_key))
-                            num_tokens += len(encoding.encode(str(field_value)))
-            if 'required' in parameters:
-                num_tokens += len(encoding.encode('required'))
-                for required_field in parameters['required']:
-                    num_tokens += 3
-                    num_tokens += len(encoding.encode(required_field))
+                        num_tokens += len(encoding.encode(str(field_value)))
+        if 'required' in parameters:
+            num_tokens += len(encoding.encode('required'))
+            for required_field in parameters['required']:
+                num_tokens += 3
+                num_tokens += len(encoding.encode(required_field))
 
         return num_tokens
 
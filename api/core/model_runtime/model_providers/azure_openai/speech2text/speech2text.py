@@ -1,8 +1,6 @@
 import copy
 from typing import IO, Optional
 
-from openai import AzureOpenAI
-
 from core.model_runtime.entities.model_entities import AIModelEntity
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.speech2text_model import Speech2TextModel
@@ -58,7 +56,7 @@ class AzureOpenAISpeech2TextModel(_CommonAzureOpenAI, Speech2TextModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = AzureOpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         response = client.audio.transcriptions.create(model=model, file=file)
 
@@ -11,6 +11,7 @@ from core.model_runtime.entities.model_entities import AIModelEntity, PriceType
 from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage, TextEmbeddingResult
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
+from core.model_runtime.model_providers.__base.tokenizers.tiktoken_tokenizer import TiktokenTokenizer
 from core.model_runtime.model_providers.azure_openai._common import _CommonAzureOpenAI
 from core.model_runtime.model_providers.azure_openai._constant import EMBEDDING_BASE_MODELS, AzureBaseModel
 
@@ -22,7 +23,7 @@ class AzureOpenAITextEmbeddingModel(_CommonAzureOpenAI, TextEmbeddingModel):
             -> TextEmbeddingResult:
         base_model_name = credentials['base_model_name']
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = AzureOpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         extra_model_kwargs = {}
         if user:
@@ -38,10 +39,7 @@ class AzureOpenAITextEmbeddingModel(_CommonAzureOpenAI, TextEmbeddingModel):
         indices = []
         used_tokens = 0
 
-        try:
-            enc = tiktoken.encoding_for_model(base_model_name)
-        except KeyError:
-            enc = tiktoken.get_encoding("cl100k_base")
+        enc = TiktokenTokenizer.get_encoding_for_model(base_model_name) or tiktoken.get_encoding("cl100k_base")
 
         for i, text in enumerate(texts):
             token = enc.encode(
@@ -104,16 +102,12 @@ class AzureOpenAITextEmbeddingModel(_CommonAzureOpenAI, TextEmbeddingModel):
         if len(texts) == 0:
             return 0
 
-        try:
-            enc = tiktoken.encoding_for_model(credentials['base_model_name'])
-        except KeyError:
-            enc = tiktoken.get_encoding("cl100k_base")
+        enc = TiktokenTokenizer.get_encoding_for_model(credentials['base_model_name']) or tiktoken.get_encoding("cl100k_base")
 
         total_num_tokens = 0
         for text in texts:
             # calculate the number of tokens in the encoded text
-            tokenized_text = enc.encode(text)
-            total_num_tokens += len(tokenized_text)
+            total_num_tokens += TiktokenTokenizer.get_num_tokens(enc, text)
 
         return total_num_tokens
 
@@ -132,7 +126,7 @@ class AzureOpenAITextEmbeddingModel(_CommonAzureOpenAI, TextEmbeddingModel):
 
         try:
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = AzureOpenAI(**credentials_kwargs)
+            client = self._get_client(credentials_kwargs)
 
             self._embedding_invoke(
                 model=model,
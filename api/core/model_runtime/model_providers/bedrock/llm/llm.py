@@ -31,6 +31,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.utils.client_pool import model_client_pool
 
 logger = logging.getLogger(__name__)
 
@@ -230,6 +231,22 @@ class BedrockLargeLanguageModel(LargeLanguageModel):
         
         return payload
 
+    @staticmethod
+    def _create_runtime_client(client_kwargs: dict):
+        """
+        Create bedrock runtime client, from a new session since the default session is not thread safe
+
+        :param client_kwargs: region and aws credentials
+        :return:
+        """
+        session = boto3.session.Session()
+        return session.client(
+            service_name='bedrock-runtime',
+            config=Config(region_name=client_kwargs['region_name']),
+            aws_access_key_id=client_kwargs['aws_access_key_id'],
+            aws_secret_access_key=client_kwargs['aws_secret_access_key']
+        )
+
     def _generate(self, model: str, credentials: dict,
                   prompt_messages: list[PromptMessage], model_parameters: dict,
                   stop: Optional[list[str]] = None, stream: bool = True,
@@ -246,15 +263,15 @@ class BedrockLargeLanguageModel(LargeLanguageModel):
         :param user: unique user id
         :return: full response or stream response chunk generator result
         """
-        client_config = Config(
-            region_name=credentials["aws_region"]
-        )
+        client_kwargs = {
+            'region_name': credentials["aws_region"],
+            'aws_access_key_id': credentials["aws_access_key_id"],
+            'aws_secret_access_key': credentials["aws_secret_access_key"]
+        }
 
-        runtime_client = boto3.client(
-            service_name='bedrock-runtime',
-            config=client_config,
-            aws_access_key_id=credentials["aws_access_key_id"],
-            aws_secret_access_key=credentials["aws_secret_access_key"]
+        runtime_client = model_client_pool.get_client(
+            'bedrock', client_kwargs,
+            lambda: self._create_runtime_client(client_kwargs)
         )
 
         model_prefix = model.split('.')[0]
@@ -40,6 +40,7 @@ from core.model_runtime.errors.invoke import (
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 from core.model_runtime.utils import helper
+from core.model_runtime.utils.client_pool import model_client_pool, new_httpx_client
 
 logger = logging.getLogger(__name__)
 
@@ -159,7 +160,10 @@ class ChatGLMLargeLanguageModel(LargeLanguageModel):
 
         kwargs = self._to_client_kwargs(credentials)
         # init model client
-        client = OpenAI(**kwargs)
+        client = model_client_pool.get_client(
+            'chatglm', kwargs,
+            lambda: OpenAI(**kwargs, http_client=new_httpx_client())
+        )
 
         extra_model_kwargs = {}
         if stop:
@@ -13,6 +13,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.rerank_model import RerankModel
+from core.model_runtime.utils.client_pool import model_client_pool
 
 
 class CohereRerankModel(RerankModel):
@@ -43,7 +44,10 @@ class CohereRerankModel(RerankModel):
             )
 
         # initialize client
-        client = cohere.Client(credentials.get('api_key'))
+        client = model_client_pool.get_client(
+            'cohere', {'api_key': credentials.get('api_key')},
+            lambda: cohere.Client(credentials.get('api_key'))
+        )
         results = client.rerank(
             query=query,
             documents=docs,
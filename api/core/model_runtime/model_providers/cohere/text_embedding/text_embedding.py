@@ -17,6 +17,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
+from core.model_runtime.utils.client_pool import model_client_pool
 
 
 class CohereTextEmbeddingModel(TextEmbeddingModel):
@@ -141,7 +142,10 @@ class CohereTextEmbeddingModel(TextEmbeddingModel):
             return Tokens([], [], {})
 
         # initialize client
-        client = cohere.Client(credentials.get('api_key'))
+        client = model_client_pool.get_client(
+            'cohere', {'api_key': credentials.get('api_key')},
+            lambda: cohere.Client(credentials.get('api_key'))
+        )
 
         response = client.tokenize(
             text=text,
@@ -178,7 +182,10 @@ class CohereTextEmbeddingModel(TextEmbeddingModel):
         :return: embeddings and used tokens
         """
         # initialize client
-        client = cohere.Client(credentials.get('api_key'))
+        client = model_client_pool.get_client(
+            'cohere', {'api_key': credentials.get('api_key')},
+            lambda: cohere.Client(credentials.get('api_key'))
+        )
 
         # call embedding model
         response = client.embed(
@@ -26,6 +26,7 @@ from core.model_runtime.entities.model_entities import (
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 from core.model_runtime.model_providers.huggingface_hub._common import _CommonHuggingfaceHub
+from core.model_runtime.utils.client_pool import model_client_pool
 
 
 class HuggingfaceHubLargeLanguageModel(_CommonHuggingfaceHub, LargeLanguageModel):
@@ -33,7 +34,10 @@ class HuggingfaceHubLargeLanguageModel(_CommonHuggingfaceHub, LargeLanguageModel
                 tools: Optional[list[PromptMessageTool]] = None, stop: Optional[list[str]] = None, stream: bool = True,
                 user: Optional[str] = None) -> Union[LLMResult, Generator]:
 
-        client = InferenceClient(token=credentials['huggingfacehub_api_token'])
+        client = model_client_pool.get_client(
+            'huggingface_hub', {'token': credentials['huggingfacehub_api_token']},
+            lambda: InferenceClient(token=credentials['huggingfacehub_api_token'])
+        )
 
         if credentials['huggingfacehub_api_type'] == 'inference_endpoints':
             model = credentials['huggingfacehub_endpoint_url']
@@ -84,7 +88,10 @@ class HuggingfaceHubLargeLanguageModel(_CommonHuggingfaceHub, LargeLanguageModel
                 raise CredentialsValidateFailedError('Huggingface Hub Task Type must be one of text2text-generation, '
                                                      'text-generation.')
 
-            client = InferenceClient(token=credentials['huggingfacehub_api_token'])
+            client = model_client_pool.get_client(
+                'huggingface_hub', {'token': credentials['huggingfacehub_api_token']},
+                lambda: InferenceClient(token=credentials['huggingfacehub_api_token'])
+            )
 
             if credentials['huggingfacehub_api_type'] == 'inference_endpoints':
                 model = credentials['huggingfacehub_endpoint_url']
@@ -94,7 +101,7 @@ class HuggingfaceHubLargeLanguageModel(_CommonHuggingfaceHub, LargeLanguageModel
                     prompt='Who are you?',
                     stream=True,
                     model=model)
-            except BadRequestError as e:
+            except BadRequestError:
                 raise CredentialsValidateFailedError('Only available for models running on with the `text-generation-inference`. '
                                                      'To learn more about the TGI project, please refer to https://github.com/huggingface/text-generation-inference.')
         except Exception as ex:
@@ -12,6 +12,7 @@ from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage,
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.model_runtime.model_providers.huggingface_hub._common import _CommonHuggingfaceHub
+from core.model_runtime.utils.client_pool import model_client_pool
 
 HUGGINGFACE_ENDPOINT_API = 'https://api.endpoints.huggingface.cloud/v2/endpoint/'
 
@@ -20,7 +21,10 @@ class HuggingfaceHubTextEmbeddingModel(_CommonHuggingfaceHub, TextEmbeddingModel
 
     def _invoke(self, model: str, credentials: dict, texts: list[str],
                 user: Optional[str] = None) -> TextEmbeddingResult:
-        client = InferenceClient(token=credentials['huggingfacehub_api_token'])
+        client = model_client_pool.get_client(
+            'huggingface_hub', {'token': credentials['huggingfacehub_api_token']},
+            lambda: InferenceClient(token=credentials['huggingfacehub_api_token'])
+        )
 
         execute_model = model
 
@@ -85,7 +89,10 @@ class HuggingfaceHubTextEmbeddingModel(_CommonHuggingfaceHub, TextEmbeddingModel
             else:
                 raise CredentialsValidateFailedError('Huggingface Hub Endpoint Type is invalid.')
 
-            client = InferenceClient(token=credentials['huggingfacehub_api_token'])
+            client = model_client_pool.get_client(
+                'huggingface_hub', {'token': credentials['huggingfacehub_api_token']},
+                lambda: InferenceClient(token=credentials['huggingfacehub_api_token'])
+            )
             client.feature_extraction(text='hello world', model=model)
         except Exception as ex:
             raise CredentialsValidateFailedError(str(ex))
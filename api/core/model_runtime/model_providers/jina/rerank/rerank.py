@@ -13,6 +13,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.rerank_model import RerankModel
+from core.model_runtime.utils.client_pool import model_client_pool, new_httpx_client
 
 
 class JinaRerankModel(RerankModel):
@@ -39,7 +40,8 @@ class JinaRerankModel(RerankModel):
             return RerankResult(model=model, docs=[])
 
         try:
-            response = httpx.post(
+            client = model_client_pool.get_client('jina', {}, new_httpx_client)
+            response = client.post(
                 "https://api.jina.ai/v1/rerank",
                 json={
                     "model": model,
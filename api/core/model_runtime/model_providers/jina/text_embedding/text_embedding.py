@@ -2,8 +2,6 @@ import time
 from json import JSONDecodeError, dumps
 from typing import Optional
 
-from requests import post
-
 from core.model_runtime.entities.model_entities import PriceType
 from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage, TextEmbeddingResult
 from core.model_runtime.errors.invoke import (
@@ -17,6 +15,7 @@ from core.model_runtime.errors.invoke import (
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.model_runtime.model_providers.jina.text_embedding.jina_tokenizer import JinaTokenizer
+from core.model_runtime.utils.client_pool import get_requests_session
 
 
 class JinaTextEmbeddingModel(TextEmbeddingModel):
@@ -55,7 +54,7 @@ class JinaTextEmbeddingModel(TextEmbeddingModel):
         }
 
         try:
-            response = post(url, headers=headers, data=dumps(data))
+            response = get_requests_session(url).post(url, headers=headers, data=dumps(data))
         except Exception as e:
             raise InvokeConnectionError(str(e))
         
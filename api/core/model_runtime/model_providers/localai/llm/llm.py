@@ -48,6 +48,7 @@ from core.model_runtime.errors.invoke import (
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 from core.model_runtime.utils import helper
+from core.model_runtime.utils.client_pool import model_client_pool, new_httpx_client
 
 
 class LocalAILarguageModel(LargeLanguageModel):
@@ -247,7 +248,10 @@ class LocalAILarguageModel(LargeLanguageModel):
         
         kwargs = self._to_client_kwargs(credentials)
         # init model client
-        client = OpenAI(**kwargs)
+        client = model_client_pool.get_client(
+            'localai', kwargs,
+            lambda: OpenAI(**kwargs, http_client=new_httpx_client())
+        )
 
         model_name = model
         completion_type = credentials['completion_type']
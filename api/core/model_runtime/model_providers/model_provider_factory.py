@@ -45,22 +45,35 @@ class ModelProviderFactory:
         # traverse all model_provider_extensions
         providers = []
         for name, model_provider_extension in model_provider_extensions.items():
-            # get model_provider instance
-            model_provider_instance = model_provider_extension.provider_instance
+            providers.append(self._get_provider_entity(model_provider_extension.provider_instance))
 
-            # get provider schema
-            provider_schema = model_provider_instance.get_provider_schema()
+        # return providers
+        return providers
 
-            for model_type in provider_schema.supported_model_types:
-                # get predefined models for given model type
-                models = model_provider_instance.models(model_type)
-                if models:
-                    provider_schema.models.extend(models)
+    def get_provider(self, provider: str) -> ProviderEntity:
+        """
+        Get provider by provider name
+        :param provider: provider name
+        :return: provider
+        """
+        return self._get_provider_entity(self.get_provider_instance(provider))
+
+    def _get_provider_entity(self, model_provider_instance: ModelProvider) -> ProviderEntity:
+        """
+        Get provider schema with the predefined models of all the supported model types
+        :param model_provider_instance: provider instance
+        :return: provider
+        """
+        # get provider schema
+        provider_schema = model_provider_instance.get_provider_schema()
 
-            providers.append(provider_schema)
+        models = list(provider_schema.models)
+        for model_type in provider_schema.supported_model_types:
+            # get predefined models for given model type
+            models.extend(model_provider_instance.models(model_type))
 
-        # return providers
-        return providers
+        # the schema is cached by the provider instance, so the models are set on a copy
+        return provider_schema.copy(update={'models': models})
 
     def provider_credentials_validate(self, provider: str, credentials: dict) -> dict:
         """
@@ -41,6 +41,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.utils.client_pool import get_requests_session
 
 logger = logging.getLogger(__name__)
 
@@ -197,7 +198,7 @@ class OllamaLargeLanguageModel(LargeLanguageModel):
                     data['images'] = images
 
         # send a post request to validate the credentials
-        response = requests.post(
+        response = get_requests_session(endpoint_url).post(
             endpoint_url,
             headers=headers,
             json=data,
@@ -300,7 +301,7 @@ class OllamaLargeLanguageModel(LargeLanguageModel):
             try:
                 chunk_json = json.loads(chunk)
                 # stream ended
-            except json.JSONDecodeError as e:
+            except json.JSONDecodeError:
                 yield create_final_llm_result_chunk(
                     index=chunk_index,
                     message=AssistantPromptMessage(content=""),
@@ -28,6 +28,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
+from core.model_runtime.utils.client_pool import get_requests_session
 
 logger = logging.getLogger(__name__)
 
@@ -88,7 +89,7 @@ class OllamaEmbeddingModel(TextEmbeddingModel):
             }
 
             # Make the request to the OpenAI API
-            response = requests.post(
+            response = get_requests_session(endpoint_url).post(
                 endpoint_url,
                 headers=headers,
                 data=json.dumps(payload),
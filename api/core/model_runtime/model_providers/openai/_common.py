@@ -1,5 +1,6 @@
 import openai
 from httpx import Timeout
+from openai import OpenAI
 
 from core.model_runtime.errors.invoke import (
     InvokeAuthorizationError,
@@ -9,6 +10,7 @@ from core.model_runtime.errors.invoke import (
     InvokeRateLimitError,
     InvokeServerUnavailableError,
 )
+from core.model_runtime.utils.client_pool import model_client_pool, new_httpx_client
 
 
 class _CommonOpenAI:
@@ -34,6 +36,18 @@ class _CommonOpenAI:
 
         return credentials_kwargs
 
+    def _get_client(self, credentials_kwargs: dict) -> OpenAI:
+        """
+        Get the pooled client of the credential kwargs
+
+        :param credentials_kwargs: credential kwargs
+        :return:
+        """
+        return model_client_pool.get_client(
+            'openai', credentials_kwargs,
+            lambda: OpenAI(**credentials_kwargs, http_client=new_httpx_client())
+        )
+
     @property
     def _invoke_error_mapping(self) -> dict[type[InvokeError], list[type[Exception]]]:
         """
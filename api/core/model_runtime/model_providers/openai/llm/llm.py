@@ -3,7 +3,7 @@ from collections.abc import Generator
 from typing import Optional, Union, cast
 
 import tiktoken
-from openai import OpenAI, Stream
+from openai import Stream
 from openai.types import Completion
 from openai.types.chat import ChatCompletion, ChatCompletionChunk, ChatCompletionMessageToolCall
 from openai.types.chat.chat_completion_chunk import ChoiceDeltaFunctionCall, ChoiceDeltaToolCall
@@ -25,6 +25,7 @@ from core.model_runtime.entities.message_entities import (
 from core.model_runtime.entities.model_entities import AIModelEntity, FetchFrom, I18nObject, ModelType, PriceConfig
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.model_providers.__base.tokenizers.tiktoken_tokenizer import TiktokenTokenizer
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
 
 logger = logging.getLogger(__name__)
@@ -256,7 +257,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         try:
             # transform credentials to kwargs for model instance
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = OpenAI(**credentials_kwargs)
+            client = self._get_client(credentials_kwargs)
 
             # handle fine tune remote models
             base_model = model
@@ -307,7 +308,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
 
         # transform credentials to kwargs for model instance
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         # get all remote models
         remote_models = client.models.list()
@@ -368,7 +369,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         extra_model_kwargs = {}
 
@@ -445,7 +446,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         :param prompt_messages: prompt messages
         :return: llm response chunk generator result
         """
-        full_text = ''
+        full_text_chunks = []
         for chunk in response:
             if len(chunk.choices) == 0:
                 continue
@@ -457,11 +458,11 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
 
             # transform assistant message to prompt message
             text = delta.text if delta.text else ''
-            assistant_prompt_message = AssistantPromptMessage(
+            assistant_prompt_message = AssistantPromptMessage.construct(
                 content=text
             )
 
-            full_text += text
+            full_text_chunks.append(text)
 
             if delta.finish_reason is not None:
                 # calculate num tokens
@@ -472,7 +473,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
                 else:
                     # calculate num tokens
                     prompt_tokens = self._num_tokens_from_string(model, prompt_messages[0].content)
-                    completion_tokens = self._num_tokens_from_string(model, full_text)
+                    completion_tokens = self._num_tokens_from_string(model, ''.join(full_text_chunks))
 
                 # transform usage
                 usage = self._calc_response_usage(model, credentials, prompt_tokens, completion_tokens)
@@ -489,11 +490,12 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
                     )
                 )
             else:
-                yield LLMResultChunk(
+                # chunks are built from the parsed response, skip the validation on the hot loop
+                yield LLMResultChunk.construct(
                     model=chunk.model,
                     prompt_messages=prompt_messages,
                     system_fingerprint=chunk.system_fingerprint,
-                    delta=LLMResultChunkDelta(
+                    delta=LLMResultChunkDelta.construct(
                         index=delta.index,
                         message=assistant_prompt_message,
                     )
@@ -520,7 +522,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         response_format = model_parameters.get("response_format")
         if response_format:
@@ -625,7 +627,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         :param tools: tools for tool calling
         :return: llm response chunk generator
         """
-        full_assistant_content = ''
+        full_assistant_content_chunks = []
         delta_assistant_message_function_call_storage: ChoiceDeltaFunctionCall = None
         for chunk in response:
             if len(chunk.choices) == 0:
@@ -664,19 +666,20 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
             tool_calls = [function_call] if function_call else []
 
             # transform assistant message to prompt message
-            assistant_prompt_message = AssistantPromptMessage(
+            assistant_prompt_message = AssistantPromptMessage.construct(
                 content=delta.delta.content if delta.delta.content else '',
                 tool_calls=tool_calls
             )
 
-            full_assistant_content += delta.delta.content if delta.delta.content else ''
+            if delta.delta.content:
+                full_assistant_content_chunks.append(delta.delta.content)
 
             if has_finish_reason:
                 # calculate num tokens
                 prompt_tokens = self._num_tokens_from_messages(model, prompt_messages, tools)
 
                 full_assistant_prompt_message = AssistantPromptMessage(
-                    content=full_assistant_content,
+                    content=''.join(full_assistant_content_chunks),
                     tool_calls=tool_calls
                 )
                 completion_tokens = self._num_tokens_from_messages(model, [full_assistant_prompt_message])
@@ -696,11 +699,12 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
                     )
                 )
             else:
-                yield LLMResultChunk(
+                # chunks are built from the parsed response, skip the validation on the hot loop
+                yield LLMResultChunk.construct(
                     model=chunk.model,
                     prompt_messages=prompt_messages,
                     system_fingerprint=chunk.system_fingerprint,
-                    delta=LLMResultChunkDelta(
+                    delta=LLMResultChunkDelta.construct(
                         index=delta.index,
                         message=assistant_prompt_message,
                     )
@@ -829,12 +833,9 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         :param tools: tools for tool calling
         :return: number of tokens
         """
-        try:
-            encoding = tiktoken.encoding_for_model(model)
-        except KeyError:
-            encoding = tiktoken.get_encoding("cl100k_base")
+        encoding = TiktokenTokenizer.get_encoding_for_model(model) or tiktoken.get_encoding("cl100k_base")
 
-        num_tokens = len(encoding.encode(text))
+        num_tokens = TiktokenTokenizer.get_num_tokens(encoding, text)
 
         if tools:
             num_tokens += self._num_tokens_for_tools(encoding, tools)
@@ -850,9 +851,8 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         if model.startswith('ft:'):
             model = model.split(':')[1]
 
-        try:
-            encoding = tiktoken.encoding_for_model(model)
-        except KeyError:
+        encoding = TiktokenTokenizer.get_encoding_for_model(model)
+        if encoding is None:
             logger.warning("Warning: model not found. Using cl100k_base encoding.")
             model = "cl100k_base"
             encoding = tiktoken.get_encoding(model)
@@ -893,16 +893,16 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
                 if key == "tool_calls":
                     for tool_call in value:
                         for t_key, t_value in tool_call.items():
-                            num_tokens += len(encoding.encode(t_key))
+                            num_tokens += TiktokenTokenizer.get_num_tokens(encoding, t_key)
                             if t_key == "function":
                                 for f_key, f_value in t_value.items():
-                                    num_tokens += len(encoding.encode(f_key))
-                                    num_tokens += len(encoding.encode(f_value))
+                                    num_tokens += TiktokenTokenizer.get_num_tokens(encoding, f_key)
+                                    num_tokens += TiktokenTokenizer.get_num_tokens(encoding, f_value)
                             else:
-                                num_tokens += len(encoding.encode(t_key))
-                                num_tokens += len(encoding.encode(t_value))
+                                num_tokens += TiktokenTokenizer.get_num_tokens(encoding, t_key)
+                                num_tokens += TiktokenTokenizer.get_num_tokens(encoding, t_value)
                 else:
-                    num_tokens += len(encoding.encode(str(value)))
+                    num_tokens += TiktokenTokenizer.get_num_tokens(encoding, str(value))
 
                 if key == "name":
                     num_tokens += tokens_per_name
@@ -925,39 +925,53 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         """
         num_tokens = 0
         for tool in tools:
-            num_tokens += len(encoding.encode('type'))
-            num_tokens += len(encoding.encode('function'))
-
-            # calculate num tokens for function object
-            num_tokens += len(encoding.encode('name'))
-            num_tokens += len(encoding.encode(tool.name))
-            num_tokens += len(encoding.encode('description'))
-            num_tokens += len(encoding.encode(tool.description))
-            parameters = tool.parameters
-            num_tokens += len(encoding.encode('parameters'))
-            if 'title' in parameters:
-                num_tokens += len(encoding.encode('title'))
-                num_tokens += len(encoding.encode(parameters.get("title")))
-            num_tokens += len(encoding.encode('type'))
-            num_tokens += len(encoding.encode(parameters.get("type")))
-            if 'properties' in parameters:
-                num_tokens += len(encoding.encode('properties'))
-                for key, value in parameters.get('properties').items():
-                    num_tokens += len(encoding.encode(key))
-                    for field_key, field_value in value.items():
+            num_tokens += TiktokenTokenizer.get_num_tokens_for_tool(encoding, tool, self._num_tokens_for_tool)
+
+        return num_tokens
+
+    @staticmethod
+    def _num_tokens_for_tool(encoding: tiktoken.Encoding, tool: PromptMessageTool) -> int:
+        """
+        Calculate num tokens for the schema of a tool with tiktoken package.
+
+        :param encoding: encoding
+        :param tool: tool
+        :return: number of tokens
+        """
+        num_tokens = 0
+        num_tokens += len(encoding.encode('type'))
+        num_tokens += len(encoding.encode('function'))
+
+        # calculate num tokens for function object
+        num_tokens += len(encoding.encode('name'))
+        num_tokens += len(encoding.encode(tool.name))
+        num_tokens += len(encoding.encode('description'))
+        num_tokens += len(encoding.encode(tool.description))
+        parameters = tool.parameters
+        num_tokens += len(encoding.encode('parameters'))
+        if 'title' in parameters:
+            num_tokens += len(encoding.encode('title'))
+            num_tokens += len(encoding.encode(parameters.get("title")))
+        num_tokens += len(encoding.encode('type'))
+        num_tokens += len(encoding.encode(parameters.get("type")))
+        if 'properties' in parameters:
+            num_tokens += len(encoding.encode('properties'))
+            for key, value in parameters.get('properties').items():
+                num_tokens += len(encoding.encode(key))
+                for field_key, field_value in value.items():
+                    num_tokens += len(encoding.encode(field_key))
+                    if field_key == 'enum':
+                        for enum_field in field_value:
+                            num_tokens += 3
+                            num_tokens += len(encoding.encode(enum_field))
+                    else:
                         num_tokens += len(encoding.encode(field_key))
-                        if field_key == 'enum':
-                            for enum_field in field_value:
-                                num_tokens += 3
-                                num_tokens += len(encoding.encode(enum_field))
-                        else:
-                            num_tokens += len(encoding.encode(field_key))
-                            num_tokens += len(encoding.encode(str(field_value)))
-            if 'required' in parameters:
-                num_tokens += len(encoding.encode('required'))
-                for required_field in parameters['required']:
-                    num_tokens += 3
-                    num_tokens += len(encoding.encode(required_field))
+                        num_tokens += len(encoding.encode(str(field_value)))
+        if 'required' in parameters:
+            num_tokens += len(encoding.encode('required'))
+            for required_field in parameters['required']:
+                num_tokens += 3
+                num_tokens += len(encoding.encode(required_field))
 
         return num_tokens
 
@@ -30,7 +30,7 @@ class OpenAIModerationModel(_CommonOpenAI, ModerationModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         # chars per chunk
         length = self._get_max_characters_per_chunk(model, credentials)
@@ -59,7 +59,7 @@ class OpenAIModerationModel(_CommonOpenAI, ModerationModel):
         try:
             # transform credentials to kwargs for model instance
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = OpenAI(**credentials_kwargs)
+            client = self._get_client(credentials_kwargs)
 
             # call moderation model
             self._moderation_invoke(
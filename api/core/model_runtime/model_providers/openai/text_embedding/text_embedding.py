@@ -10,6 +10,7 @@ from core.model_runtime.entities.model_entities import PriceType
 from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage, TextEmbeddingResult
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
+from core.model_runtime.model_providers.__base.tokenizers.tiktoken_tokenizer import TiktokenTokenizer
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
 
 
@@ -33,7 +34,7 @@ class OpenAITextEmbeddingModel(_CommonOpenAI, TextEmbeddingModel):
         # transform credentials to kwargs for model instance
         credentials_kwargs = self._to_credential_kwargs(credentials)
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         extra_model_kwargs = {}
         if user:
@@ -50,10 +51,7 @@ class OpenAITextEmbeddingModel(_CommonOpenAI, TextEmbeddingModel):
         indices = []
         used_tokens = 0
 
-        try:
-            enc = tiktoken.encoding_for_model(model)
-        except KeyError:
-            enc = tiktoken.get_encoding("cl100k_base")
+        enc = TiktokenTokenizer.get_encoding_for_model(model) or tiktoken.get_encoding("cl100k_base")
 
         for i, text in enumerate(texts):
             token = enc.encode(
@@ -125,16 +123,12 @@ class OpenAITextEmbeddingModel(_CommonOpenAI, TextEmbeddingModel):
         if len(texts) == 0:
             return 0
 
-        try:
-            enc = tiktoken.encoding_for_model(model)
-        except KeyError:
-            enc = tiktoken.get_encoding("cl100k_base")
+        enc = TiktokenTokenizer.get_encoding_for_model(model) or tiktoken.get_encoding("cl100k_base")
 
         total_num_tokens = 0
         for text in texts:
             # calculate the number of tokens in the encoded text
-            tokenized_text = enc.encode(text)
-            total_num_tokens += len(tokenized_text)
+            total_num_tokens += TiktokenTokenizer.get_num_tokens(enc, text)
 
         return total_num_tokens
 
@@ -149,7 +143,7 @@ class OpenAITextEmbeddingModel(_CommonOpenAI, TextEmbeddingModel):
         try:
             # transform credentials to kwargs for model instance
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = OpenAI(**credentials_kwargs)
+            client = self._get_client(credentials_kwargs)
 
             # call embedding model
             self._embedding_invoke(
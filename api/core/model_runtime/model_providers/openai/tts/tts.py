@@ -1,17 +1,12 @@
-import concurrent.futures
-from functools import reduce
-from io import BytesIO
+from functools import partial
 from typing import Optional
 
 from flask import Response, stream_with_context
-from openai import OpenAI
-from pydub import AudioSegment
 
 from core.model_runtime.errors.invoke import InvokeBadRequestError
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.tts_model import TTSModel
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
-from extensions.ext_storage import storage
 
 
 class OpenAIText2SpeechModel(_CommonOpenAI, TTSModel):
@@ -44,7 +39,8 @@ class OpenAIText2SpeechModel(_CommonOpenAI, TTSModel):
                                                                            voice=voice)),
                             status=200, mimetype=f'audio/{audio_type}')
         else:
-            return self._tts_invoke(model=model, credentials=credentials, content_text=content_text, voice=voice)
+            return self._tts_invoke(model=model, credentials=credentials, content_text=content_text, voice=voice,
+                                    tenant_id=tenant_id)
 
     def validate_credentials(self, model: str, credentials: dict, user: Optional[str] = None) -> None:
         """
@@ -65,7 +61,8 @@ class OpenAIText2SpeechModel(_CommonOpenAI, TTSModel):
         except Exception as ex:
             raise CredentialsValidateFailedError(str(ex))
 
-    def _tts_invoke(self, model: str, credentials: dict, content_text: str, voice: str) -> Response:
+    def _tts_invoke(self, model: str, credentials: dict, content_text: str, voice: str,
+                    tenant_id: Optional[str] = None) -> Response:
         """
         _tts_invoke text2speech model
 
@@ -73,38 +70,28 @@ class OpenAIText2SpeechModel(_CommonOpenAI, TTSModel):
         :param credentials: model credentials
         :param content_text: text content to be translated
         :param voice: model timbre
+        :param tenant_id: user tenant id, the audio is cached when it is given
         :return: text translated to audio file
         """
         audio_type = self._get_model_audio_type(model, credentials)
         word_limit = self._get_model_word_limit(model, credentials)
         max_workers = self._get_model_workers_limit(model, credentials)
         try:
-            sentences = list(self._split_text_into_sentences(text=content_text, limit=word_limit))
-            audio_bytes_list = list()
-
-            # Create a thread pool and map the function to the list of sentences
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [executor.submit(self._process_sentence, sentence=sentence, model=model, voice=voice,
-                                           credentials=credentials) for sentence in sentences]
-                for future in futures:
-                    try:
-                        if future.result():
-                            audio_bytes_list.append(future.result())
-                    except Exception as ex:
-                        raise InvokeBadRequestError(str(ex))
-
-            if len(audio_bytes_list) > 0:
-                audio_segments = [AudioSegment.from_file(BytesIO(audio_bytes), format=audio_type) for audio_bytes in
-                                  audio_bytes_list if audio_bytes]
-                combined_segment = reduce(lambda x, y: x + y, audio_segments)
-                buffer: BytesIO = BytesIO()
-                combined_segment.export(buffer, format=audio_type)
-                buffer.seek(0)
-                return Response(buffer.read(), status=200, mimetype=f"audio/{audio_type}")
+            audio = self._synthesize_audio(
+                model=model,
+                tenant_id=tenant_id,
+                content_text=content_text,
+                voice=voice,
+                audio_type=audio_type,
+                word_limit=word_limit,
+                max_workers=max_workers,
+                synthesize=partial(self._process_sentence, model=model, voice=voice, credentials=credentials)
+            )
+            if audio:
+                return Response(audio, status=200, mimetype=f"audio/{audio_type}")
         except Exception as ex:
             raise InvokeBadRequestError(str(ex))
 
-    # Todo: To improve the streaming function
     def _tts_invoke_streaming(self, model: str, tenant_id: str, credentials: dict, content_text: str,
                               voice: str) -> any:
         """
@@ -117,21 +104,20 @@ class OpenAIText2SpeechModel(_CommonOpenAI, TTSModel):
         :param voice: model timbre
         :return: text translated to audio file
         """
-        # transform credentials to kwargs for model instance
-        credentials_kwargs = self._to_credential_kwargs(credentials)
-        if not voice or voice not in self.get_tts_model_voices(model=model, credentials=credentials):
-            voice = self._get_model_default_voice(model, credentials)
         word_limit = self._get_model_word_limit(model, credentials)
         audio_type = self._get_model_audio_type(model, credentials)
-        tts_file_id = self._get_file_name(content_text)
-        file_path = f'generate_files/audio/{tenant_id}/{tts_file_id}.{audio_type}'
+        max_workers = self._get_model_workers_limit(model, credentials)
         try:
-            client = OpenAI(**credentials_kwargs)
-            sentences = list(self._split_text_into_sentences(text=content_text, limit=word_limit))
-            for sentence in sentences:
-                response = client.audio.speech.create(model=model, voice=voice, input=sentence.strip())
-                # response.stream_to_file(file_path)
-                storage.save(file_path, response.read())
+            yield from self._synthesize_audio_streaming(
+                model=model,
+                tenant_id=tenant_id,
+                content_text=content_text,
+                voice=voice,
+                audio_type=audio_type,
+                word_limit=word_limit,
+                max_workers=max_workers,
+                synthesize=partial(self._process_sentence, model=model, voice=voice, credentials=credentials)
+            )
         except Exception as ex:
             raise InvokeBadRequestError(str(ex))
 
@@ -148,7 +134,7 @@ class OpenAIText2SpeechModel(_CommonOpenAI, TTSModel):
         """
         # transform credentials to kwargs for model instance
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
         response = client.audio.speech.create(model=model, voice=voice, input=sentence.strip())
         if isinstance(response.read(), bytes):
             return response.read()
@@ -1,4 +1,5 @@
 
+import httpx
 import requests
 
 from core.model_runtime.errors.invoke import (
@@ -29,16 +30,38 @@ class _CommonOAI_API_Compat:
             InvokeBadRequestError: [
                 requests.exceptions.HTTPError,  # Invalid Endpoint URL or model name
                 requests.exceptions.InvalidURL,  # Misconfigured request or other API error
+                httpx.HTTPStatusError,
+                httpx.InvalidURL,
             ],
             InvokeRateLimitError: [
-                requests.exceptions.RetryError  # Too many requests sent in a short period of time
+                requests.exceptions.RetryError,  # Too many requests sent in a short period of time
+                InvokeRateLimitError,  # 429 status code
             ],
             InvokeServerUnavailableError: [
                 requests.exceptions.ConnectionError,  # Engine Overloaded
-                requests.exceptions.HTTPError  # Server Error
+                requests.exceptions.HTTPError,  # Server Error
+                httpx.ConnectError,
+                InvokeServerUnavailableError,  # 5xx status code
             ],
             InvokeConnectionError: [
                 requests.exceptions.ConnectTimeout,  # Timeout
-                requests.exceptions.ReadTimeout  # Timeout
+                requests.exceptions.ReadTimeout,  # Timeout
+                httpx.ConnectTimeout,
+                httpx.ReadTimeout,
             ]
-        }
\ No newline at end of file
+        }
+    @staticmethod
+    def _raise_for_unavailable_status(status_code: int, text: str) -> None:
+        """
+        Raise the errors of the status codes which mean the provider is unavailable,
+        so that they are told apart from other failed requests by the circuit breaker
+
+        :param status_code: response status code
+        :param text: response text
+        :return:
+        """
+        if status_code == 429:
+            raise InvokeRateLimitError(f"API request failed with status code {status_code}: {text}")
+
+        if status_code >= 500:
+            raise InvokeServerUnavailableError(f"API request failed with status code {status_code}: {text}")
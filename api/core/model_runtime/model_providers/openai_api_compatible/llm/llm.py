@@ -1,10 +1,12 @@
+import codecs
 import json
 import logging
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from decimal import Decimal
 from typing import Optional, Union, cast
 from urllib.parse import urljoin
 
+import httpx
 import requests
 
 from core.model_runtime.entities.common_entities import I18nObject
@@ -36,6 +38,7 @@ from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 from core.model_runtime.model_providers.openai_api_compatible._common import _CommonOAI_API_Compat
 from core.model_runtime.utils import helper
+from core.model_runtime.utils.client_pool import get_async_httpx_client, get_requests_session
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +79,42 @@ class OAIAPICompatLargeLanguageModel(_CommonOAI_API_Compat, LargeLanguageModel):
             user=user
         )
 
+    async def _ainvoke(self, model: str, credentials: dict,
+                       prompt_messages: list[PromptMessage], model_parameters: dict,
+                       tools: Optional[list[PromptMessageTool]] = None, stop: Optional[list[str]] = None,
+                       stream: bool = True, user: Optional[str] = None) \
+            -> Union[LLMResult, AsyncGenerator]:
+        """
+        Invoke large language model asynchronously
+
+        :param model: model name
+        :param credentials: model credentials
+        :param prompt_messages: prompt messages
+        :param model_parameters: model parameters
+        :param tools: tools for tool calling
+        :param stop: stop words
+        :param stream: is stream response
+        :param user: unique user id
+        :return: full response or stream response chunk async generator result
+        """
+        # providers built on this model adjust the credentials in their own _invoke or _generate,
+        # which the async request would skip, so they keep invoking in a worker thread
+        if (type(self)._invoke is not OAIAPICompatLargeLanguageModel._invoke
+                or type(self)._generate is not OAIAPICompatLargeLanguageModel._generate):
+            return await super()._ainvoke(model, credentials, prompt_messages, model_parameters,
+                                          tools, stop, stream, user)
+
+        return await self._agenerate(
+            model=model,
+            credentials=credentials,
+            prompt_messages=prompt_messages,
+            model_parameters=model_parameters,
+            tools=tools,
+            stop=stop,
+            stream=stream,
+            user=user
+        )
+
     def get_num_tokens(self, model: str, credentials: dict, prompt_messages: list[PromptMessage],
                        tools: Optional[list[PromptMessageTool]] = None) -> int:
         """
@@ -133,7 +172,7 @@ class OAIAPICompatLargeLanguageModel(_CommonOAI_API_Compat, LargeLanguageModel):
                 raise ValueError("Unsupported completion type for model configuration.")
 
             # send a post request to validate the credentials
-            response = requests.post(
+            response = get_requests_session(endpoint_url).post(
                 endpoint_url,
                 headers=headers,
                 json=data,
@@ -146,7 +185,7 @@ class OAIAPICompatLargeLanguageModel(_CommonOAI_API_Compat, LargeLanguageModel):
 
             try:
                 json_result = response.json()
-            except json.JSONDecodeError as e:
+            except json.JSONDecodeError:
                 raise CredentialsValidateFailedError('Credentials validation failed: JSON decode error')
 
             if (completion_type is LLMMode.CHAT
@@ -261,6 +300,85 @@ class OAIAPICompatLargeLanguageModel(_CommonOAI_API_Compat, LargeLanguageModel):
         :param user: unique user id
         :return: full response or stream response chunk generator result
         """
+        endpoint_url, headers, data = self._build_generate_request(model, credentials, prompt_messages,
+                                                                   model_parameters, tools, stop, stream, user)
+
+        response = get_requests_session(endpoint_url).post(
+            endpoint_url,
+            headers=headers,
+            json=data,
+            timeout=(10, 60),
+            stream=stream
+        )
+
+        if response.encoding is None or response.encoding == 'ISO-8859-1':
+            response.encoding = 'utf-8'
+
+        if response.status_code != 200:
+            self._raise_for_unavailable_status(response.status_code, response.text)
+            raise InvokeError(f"API request failed with status code {response.status_code}: {response.text}")
+
+        if stream:
+            return self._handle_generate_stream_response(model, credentials, response, prompt_messages)
+
+        return self._handle_generate_response(model, credentials, response, prompt_messages)
+
+    async def _agenerate(self, model: str, credentials: dict, prompt_messages: list[PromptMessage],
+                         model_parameters: dict, tools: Optional[list[PromptMessageTool]] = None,
+                         stop: Optional[list[str]] = None, stream: bool = True,
+                         user: Optional[str] = None) -> Union[LLMResult, AsyncGenerator]:
+        """
+        Invoke llm completion model asynchronously with the pooled async httpx client
+
+        :param model: model name
+        :param credentials: credentials
+        :param prompt_messages: prompt messages
+        :param model_parameters: model parameters
+        :param stop: stop words
+        :param stream: is stream response
+        :param user: unique user id
+        :return: full response or stream response chunk async generator result
+        """
+        endpoint_url, headers, data = self._build_generate_request(model, credentials, prompt_messages,
+                                                                   model_parameters, tools, stop, stream, user)
+
+        client = get_async_httpx_client(endpoint_url)
+        request = client.build_request(
+            'POST',
+            endpoint_url,
+            headers=headers,
+            json=data,
+            timeout=httpx.Timeout(60, connect=10)
+        )
+        response = await client.send(request, stream=stream)
+
+        if response.status_code != 200:
+            await response.aread()
+            await response.aclose()
+            self._raise_for_unavailable_status(response.status_code, response.text)
+            raise InvokeError(f"API request failed with status code {response.status_code}: {response.text}")
+
+        if stream:
+            return self._ahandle_generate_stream_response(model, credentials, response, prompt_messages)
+
+        return self._handle_generate_response(model, credentials, response, prompt_messages)
+
+    def _build_generate_request(self, model: str, credentials: dict, prompt_messages: list[PromptMessage],
+                                model_parameters: dict, tools: Optional[list[PromptMessageTool]] = None,
+                                stop: Optional[list[str]] = None, stream: bool = True,
+                                user: Optional[str] = None) -> tuple[str, dict, dict]:
+        """
+        Build the endpoint url, headers and body of the completion request
+
+        :param model: model name
+        :param credentials: credentials
+        :param prompt_messages: prompt messages
+        :param model_parameters: model parameters
+        :param stop: stop words
+        :param stream: is stream response
+        :param user: unique user id
+        :return: endpoint url, headers and body
+        """
         headers = {
             'Content-Type': 'application/json',
             'Accept-Charset': 'utf-8',
@@ -307,24 +425,7 @@ class OAIAPICompatLargeLanguageModel(_CommonOAI_API_Compat, LargeLanguageModel):
         if user:
             data["user"] = user
 
-        response = requests.post(
-            endpoint_url,
-            headers=headers,
-            json=data,
-            timeout=(10, 60),
-            stream=stream
-        )
-
-        if response.encoding is None or response.encoding == 'ISO-8859-1':
-            response.encoding = 'utf-8'
-
-        if response.status_code != 200:
-            raise InvokeError(f"API request failed with status code {response.status_code}: {response.text}")
-
-        if stream:
-            return self._handle_generate_stream_response(model, credentials, response, prompt_messages)
-
-        return self._handle_generate_response(model, credentials, response, prompt_messages)
+        return endpoint_url, headers, data
 
     def _handle_generate_stream_response(self, model: str, credentials: dict, response: requests.Response,
                                          prompt_messages: list[PromptMessage]) -> Generator:
@@ -337,109 +438,42 @@ class OAIAPICompatLargeLanguageModel(_CommonOAI_API_Compat, LargeLanguageModel):
         :param prompt_messages: prompt messages
         :return: llm response chunk generator
         """
-        full_assistant_content = ''
-        chunk_index = 0
+        parser = _StreamResponseParser(self, model, credentials, prompt_messages)
 
-        def create_final_llm_result_chunk(index: int, message: AssistantPromptMessage, finish_reason: str) \
-                -> LLMResultChunk:
-            # calculate num tokens
-            prompt_tokens = self._num_tokens_from_string(model, prompt_messages[0].content)
-            completion_tokens = self._num_tokens_from_string(model, full_assistant_content)
+        for chunk in response.iter_lines(decode_unicode=True, delimiter=parser.delimiter):
+            yield from parser.parse(chunk)
+            if parser.ended:
+                break
 
-            # transform usage
-            usage = self._calc_response_usage(model, credentials, prompt_tokens, completion_tokens)
-
-            return LLMResultChunk(
-                model=model,
-                prompt_messages=prompt_messages,
-                delta=LLMResultChunkDelta(
-                    index=index,
-                    message=message,
-                    finish_reason=finish_reason,
-                    usage=usage
-                )
-            )
-
-        # delimiter for stream response, need unicode_escape
-        import codecs
-        delimiter = credentials.get("stream_mode_delimiter", "\n\n")
-        delimiter = codecs.decode(delimiter, "unicode_escape")
-
-        for chunk in response.iter_lines(decode_unicode=True, delimiter=delimiter):
-            if chunk:
-                #ignore sse comments
-                if chunk.startswith(':'):
-                    continue                 
-                decoded_chunk = chunk.strip().lstrip('data: ').lstrip()
-                chunk_json = None
-                try:
-                    chunk_json = json.loads(decoded_chunk)
-                # stream ended
-                except json.JSONDecodeError as e:
-                    yield create_final_llm_result_chunk(
-                        index=chunk_index + 1,
-                        message=AssistantPromptMessage(content=""),
-                        finish_reason="Non-JSON encountered."
-                    )
-                    break
-                if not chunk_json or len(chunk_json['choices']) == 0:
-                    continue
-
-                choice = chunk_json['choices'][0]
-                finish_reason = chunk_json['choices'][0].get('finish_reason')
-                chunk_index += 1
-
-                if 'delta' in choice:
-                    delta = choice['delta']
-                    delta_content = delta.get('content')
-                    if delta_content is None or delta_content == '':
-                        continue
-
-                    assistant_message_tool_calls = delta.get('tool_calls', None)
-                    # assistant_message_function_call = delta.delta.function_call
-
-                    # extract tool calls from response
-                    if assistant_message_tool_calls:
-                        tool_calls = self._extract_response_tool_calls(assistant_message_tool_calls)
-                    # function_call = self._extract_response_function_call(assistant_message_function_call)
-                    # tool_calls = [function_call] if function_call else []
-
-                    # transform assistant message to prompt message
-                    assistant_prompt_message = AssistantPromptMessage(
-                        content=delta_content,
-                        tool_calls=tool_calls if assistant_message_tool_calls else []
-                    )
-
-                    full_assistant_content += delta_content
-                elif 'text' in choice:
-                    choice_text = choice.get('text', '')
-                    if choice_text == '':
-                        continue
-
-                    # transform assistant message to prompt message
-                    assistant_prompt_message = AssistantPromptMessage(content=choice_text)
-                    full_assistant_content += choice_text
-                else:
-                    continue
+    async def _ahandle_generate_stream_response(self, model: str, credentials: dict, response: httpx.Response,
+                                                prompt_messages: list[PromptMessage]) -> AsyncGenerator:
+        """
+        Handle llm stream response of the async httpx client
 
-                # check payload indicator for completion
-                if finish_reason is not None:
-                    yield create_final_llm_result_chunk(
-                        index=chunk_index,
-                        message=assistant_prompt_message,
-                        finish_reason=finish_reason
-                    )
-                else:
-                    yield LLMResultChunk(
-                        model=model,
-                        prompt_messages=prompt_messages,
-                        delta=LLMResultChunkDelta(
-                            index=chunk_index,
-                            message=assistant_prompt_message,
-                        )
-                    )
+        :param model: model name
+        :param credentials: model credentials
+        :param response: streamed response
+        :param prompt_messages: prompt messages
+        :return: llm response chunk async generator
+        """
+        parser = _StreamResponseParser(self, model, credentials, prompt_messages)
 
-            chunk_index += 1
+        try:
+            buffer = ''
+            async for text in response.aiter_text():
+                buffer += text
+                *chunks, buffer = buffer.split(parser.delimiter)
+                for chunk in chunks:
+                    for result_chunk in parser.parse(chunk):
+                        yield result_chunk
+
+                    if parser.ended:
+                        return
+
+            for result_chunk in parser.parse(buffer):
+                yield result_chunk
+        finally:
+            await response.aclose()
 
     def _handle_generate_response(self, model: str, credentials: dict, response: requests.Response,
                                   prompt_messages: list[PromptMessage]) -> LLMResult:
@@ -693,3 +727,126 @@ class OAIAPICompatLargeLanguageModel(_CommonOAI_API_Compat, LargeLanguageModel):
                 tool_calls.append(tool_call)
 
         return tool_calls
+
+
+class _StreamResponseParser:
+    """
+    Parser of the stream response of the completion api, fed with the stream chunks split by the delimiter,
+    shared by the sync and async stream handlers.
+    """
+    def __init__(self, llm: OAIAPICompatLargeLanguageModel, model: str, credentials: dict,
+                 prompt_messages: list[PromptMessage]) -> None:
+        self.llm = llm
+        self.model = model
+        self.credentials = credentials
+        self.prompt_messages = prompt_messages
+        self.full_assistant_content_chunks = []
+        self.chunk_index = 0
+        self.ended = False
+
+        # delimiter for stream response, need unicode_escape
+        self.delimiter = codecs.decode(credentials.get("stream_mode_delimiter", "\n\n"), "unicode_escape")
+
+    def _create_final_llm_result_chunk(self, index: int, message: AssistantPromptMessage, finish_reason: str) \
+            -> LLMResultChunk:
+        # calculate num tokens
+        prompt_tokens = self.llm._num_tokens_from_string(self.model, self.prompt_messages[0].content)
+        completion_tokens = self.llm._num_tokens_from_string(self.model, ''.join(self.full_assistant_content_chunks))
+
+        # transform usage
+        usage = self.llm._calc_response_usage(self.model, self.credentials, prompt_tokens, completion_tokens)
+
+        return LLMResultChunk(
+            model=self.model,
+            prompt_messages=self.prompt_messages,
+            delta=LLMResultChunkDelta(
+                index=index,
+                message=message,
+                finish_reason=finish_reason,
+                usage=usage
+            )
+        )
+
+    def parse(self, chunk: str) -> Generator[LLMResultChunk, None, None]:
+        """
+        Parse a stream chunk, sets ended when the stream ended
+
+        :param chunk: stream chunk
+        :return: llm response chunks
+        """
+        if chunk:
+            #ignore sse comments
+            if chunk.startswith(':'):
+                return
+            decoded_chunk = chunk.strip().lstrip('data: ').lstrip()
+            chunk_json = None
+            try:
+                chunk_json = json.loads(decoded_chunk)
+            # stream ended
+            except json.JSONDecodeError:
+                yield self._create_final_llm_result_chunk(
+                    index=self.chunk_index + 1,
+                    message=AssistantPromptMessage(content=""),
+                    finish_reason="Non-JSON encountered."
+                )
+                self.ended = True
+                return
+            if not chunk_json or len(chunk_json['choices']) == 0:
+                return
+
+            choice = chunk_json['choices'][0]
+            finish_reason = chunk_json['choices'][0].get('finish_reason')
+            self.chunk_index += 1
+
+            if 'delta' in choice:
+                delta = choice['delta']
+                delta_content = delta.get('content')
+                if delta_content is None or delta_content == '':
+                    return
+
+                assistant_message_tool_calls = delta.get('tool_calls', None)
+                # assistant_message_function_call = delta.delta.function_call
+
+                # extract tool calls from response
+                if assistant_message_tool_calls:
+                    tool_calls = self.llm._extract_response_tool_calls(assistant_message_tool_calls)
+                # function_call = self._extract_response_function_call(assistant_message_function_call)
+                # tool_calls = [function_call] if function_call else []
+
+                # transform assistant message to prompt message
+                assistant_prompt_message = AssistantPromptMessage.construct(
+                    content=delta_content,
+                    tool_calls=tool_calls if assistant_message_tool_calls else []
+                )
+
+                self.full_assistant_content_chunks.append(delta_content)
+            elif 'text' in choice:
+                choice_text = choice.get('text', '')
+                if choice_text == '':
+                    return
+
+                # transform assistant message to prompt message
+                assistant_prompt_message = AssistantPromptMessage.construct(content=choice_text)
+                self.full_assistant_content_chunks.append(choice_text)
+            else:
+                return
+
+            # check payload indicator for completion
+            if finish_reason is not None:
+                yield self._create_final_llm_result_chunk(
+                    index=self.chunk_index,
+                    message=assistant_prompt_message,
+                    finish_reason=finish_reason
+                )
+            else:
+                # chunks are built from the parsed response, skip the validation on the hot loop
+                yield LLMResultChunk.construct(
+                    model=self.model,
+                    prompt_messages=self.prompt_messages,
+                    delta=LLMResultChunkDelta.construct(
+                        index=self.chunk_index,
+                        message=assistant_prompt_message,
+                    )
+                )
+
+        self.chunk_index += 1
@@ -4,8 +4,8 @@ from decimal import Decimal
 from typing import Optional
 from urllib.parse import urljoin
 
+import httpx
 import numpy as np
-import requests
 
 from core.model_runtime.entities.common_entities import I18nObject
 from core.model_runtime.entities.model_entities import (
@@ -20,6 +20,7 @@ from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage,
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.model_runtime.model_providers.openai_api_compatible._common import _CommonOAI_API_Compat
+from core.model_runtime.utils.client_pool import get_async_httpx_client, get_requests_session
 
 
 class OAICompatEmbeddingModel(_CommonOAI_API_Compat, TextEmbeddingModel):
@@ -39,7 +40,64 @@ class OAICompatEmbeddingModel(_CommonOAI_API_Compat, TextEmbeddingModel):
         :param user: unique user id
         :return: embeddings result
         """
-       
+        endpoint_url, headers, payloads = self._build_embedding_requests(model, credentials, texts, user)
+
+        response_data_batches = []
+        for payload in payloads:
+            # Make the request to the OpenAI API
+            response = get_requests_session(endpoint_url).post(
+                endpoint_url,
+                headers=headers,
+                data=json.dumps(payload),
+                timeout=(10, 300)
+            )
+
+            self._raise_for_unavailable_status(response.status_code, response.text)
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            response_data_batches.append(response.json())
+
+        return self._build_embedding_result(model, credentials, response_data_batches)
+
+    async def _ainvoke(self, model: str, credentials: dict,
+                       texts: list[str], user: Optional[str] = None) \
+            -> TextEmbeddingResult:
+        """
+        Invoke text embedding model asynchronously
+
+        :param model: model name
+        :param credentials: model credentials
+        :param texts: texts to embed
+        :param user: unique user id
+        :return: embeddings result
+        """
+        endpoint_url, headers, payloads = self._build_embedding_requests(model, credentials, texts, user)
+
+        response_data_batches = []
+        for payload in payloads:
+            response = await get_async_httpx_client(endpoint_url).post(
+                endpoint_url,
+                headers=headers,
+                content=json.dumps(payload),
+                timeout=httpx.Timeout(300, connect=10)
+            )
+
+            self._raise_for_unavailable_status(response.status_code, response.text)
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            response_data_batches.append(response.json())
+
+        return self._build_embedding_result(model, credentials, response_data_batches)
+
+    def _build_embedding_requests(self, model: str, credentials: dict, texts: list[str],
+                                  user: Optional[str] = None) -> tuple[str, dict, list[dict]]:
+        """
+        Build the endpoint url, headers and the payload of each batch of texts
+
+        :param model: model name
+        :param credentials: model credentials
+        :param texts: texts to embed
+        :param user: unique user id
+        :return: endpoint url, headers and payloads
+        """
         # Prepare headers and payload for the request
         headers = {
             'Content-Type': 'application/json'
@@ -66,10 +124,7 @@ class OAICompatEmbeddingModel(_CommonOAI_API_Compat, TextEmbeddingModel):
         max_chunks = self._get_max_chunks(model, credentials)
 
         inputs = []
-        indices = []
-        used_tokens = 0
-
-        for i, text in enumerate(texts):
+        for text in texts:
 
             # Here token count is only an approximation based on the GPT2 tokenizer
             # TODO: Optimize for better token estimation and chunking
@@ -81,36 +136,34 @@ class OAICompatEmbeddingModel(_CommonOAI_API_Compat, TextEmbeddingModel):
                 inputs.append(text[0: cutoff])
             else:
                 inputs.append(text)
-            indices += [i]
-
-        batched_embeddings = []
-        _iter = range(0, len(inputs), max_chunks)
 
-        for i in _iter:
-            # Prepare the payload for the request
-            payload = {
+        payloads = [
+            {
                 'input': inputs[i: i + max_chunks],
                 'model': model,
                 **extra_model_kwargs
             }
+            for i in range(0, len(inputs), max_chunks)
+        ]
 
-            # Make the request to the OpenAI API
-            response = requests.post(
-                endpoint_url,
-                headers=headers,
-                data=json.dumps(payload),
-                timeout=(10, 300)
-            )
+        return endpoint_url, headers, payloads
 
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            response_data = response.json()
+    def _build_embedding_result(self, model: str, credentials: dict,
+                                response_data_batches: list[dict]) -> TextEmbeddingResult:
+        """
+        Build the embeddings result of the responses of all the batches
 
+        :param model: model name
+        :param credentials: model credentials
+        :param response_data_batches: response data of each batch
+        :return: embeddings result
+        """
+        batched_embeddings = []
+        used_tokens = 0
+        for response_data in response_data_batches:
             # Extract embeddings and used tokens from the response
-            embeddings_batch = [data['embedding'] for data in response_data['data']]
-            embedding_used_tokens = response_data['usage']['total_tokens']
-
-            used_tokens += embedding_used_tokens
-            batched_embeddings += embeddings_batch
+            batched_embeddings += [data['embedding'] for data in response_data['data']]
+            used_tokens += response_data['usage']['total_tokens']
 
         # calc usage
         usage = self._calc_response_usage(
@@ -118,7 +171,7 @@ class OAICompatEmbeddingModel(_CommonOAI_API_Compat, TextEmbeddingModel):
             credentials=credentials,
             tokens=used_tokens
         )
-        
+
         return TextEmbeddingResult(
             embeddings=batched_embeddings,
             usage=usage,
@@ -165,7 +218,7 @@ class OAICompatEmbeddingModel(_CommonOAI_API_Compat, TextEmbeddingModel):
                 'model': model
             }
 
-            response = requests.post(
+            response = get_requests_session(endpoint_url).post(
                 url=endpoint_url,
                 headers=headers,
                 data=json.dumps(payload),
@@ -178,7 +231,7 @@ class OAICompatEmbeddingModel(_CommonOAI_API_Compat, TextEmbeddingModel):
 
             try:
                 json_result = response.json()
-            except json.JSONDecodeError as e:
+            except json.JSONDecodeError:
                 raise CredentialsValidateFailedError('Credentials validation failed: JSON decode error')
 
             if 'model' not in json_result:
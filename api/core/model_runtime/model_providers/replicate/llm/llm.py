@@ -25,6 +25,7 @@ from core.model_runtime.entities.model_entities import (
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 from core.model_runtime.model_providers.replicate._common import _CommonReplicate
+from core.model_runtime.utils.client_pool import model_client_pool
 
 
 class ReplicateLargeLanguageModel(_CommonReplicate, LargeLanguageModel):
@@ -35,7 +36,10 @@ class ReplicateLargeLanguageModel(_CommonReplicate, LargeLanguageModel):
 
         version = credentials['model_version']
 
-        client = ReplicateClient(api_token=credentials['replicate_api_token'], timeout=30)
+        client = model_client_pool.get_client(
+            'replicate', {'api_token': credentials['replicate_api_token']},
+            lambda: ReplicateClient(api_token=credentials['replicate_api_token'], timeout=30)
+        )
         model_info = client.models.get(model)
         model_info_version = model_info.versions.get(version)
 
@@ -75,7 +79,10 @@ class ReplicateLargeLanguageModel(_CommonReplicate, LargeLanguageModel):
         version = credentials['model_version']
 
         try:
-            client = ReplicateClient(api_token=credentials['replicate_api_token'], timeout=30)
+            client = model_client_pool.get_client(
+                'replicate', {'api_token': credentials['replicate_api_token']},
+                lambda: ReplicateClient(api_token=credentials['replicate_api_token'], timeout=30)
+            )
             model_info = client.models.get(model)
             model_info_version = model_info.versions.get(version)
 
@@ -115,7 +122,10 @@ class ReplicateLargeLanguageModel(_CommonReplicate, LargeLanguageModel):
     def _get_customizable_model_parameter_rules(cls, model: str, credentials: dict) -> list[ParameterRule]:
         version = credentials['model_version']
 
-        client = ReplicateClient(api_token=credentials['replicate_api_token'], timeout=30)
+        client = model_client_pool.get_client(
+            'replicate', {'api_token': credentials['replicate_api_token']},
+            lambda: ReplicateClient(api_token=credentials['replicate_api_token'], timeout=30)
+        )
         model_info = client.models.get(model)
         model_info_version = model_info.versions.get(version)
 
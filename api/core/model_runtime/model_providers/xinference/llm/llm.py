@@ -58,6 +58,7 @@ from core.model_runtime.model_providers.xinference.xinference_helper import (
     XinferenceModelExtraParameter,
 )
 from core.model_runtime.utils import helper
+from core.model_runtime.utils.client_pool import model_client_pool, new_httpx_client
 
 
 class XinferenceAILargeLanguageModel(LargeLanguageModel):
@@ -379,15 +380,20 @@ class XinferenceAILargeLanguageModel(LargeLanguageModel):
         if credentials['server_url'].endswith('/'):
             credentials['server_url'] = credentials['server_url'][:-1]
 
-        client = OpenAI(
-            base_url=f'{credentials["server_url"]}/v1',
-            api_key='abc',
-            max_retries=3,
-            timeout=60,
+        client_kwargs = {
+            'base_url': f'{credentials["server_url"]}/v1',
+            'api_key': 'abc',
+            'max_retries': 3,
+            'timeout': 60,
+        }
+        client = model_client_pool.get_client(
+            'xinference_openai', client_kwargs,
+            lambda: OpenAI(**client_kwargs, http_client=new_httpx_client())
         )
 
-        xinference_client = Client(
-            base_url=credentials['server_url'],
+        xinference_client = model_client_pool.get_client(
+            'xinference', {'base_url': credentials['server_url']},
+            lambda: Client(base_url=credentials['server_url'])
         )
 
         xinference_model = xinference_client.get_model(credentials['model_uid'])
@@ -15,6 +15,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.rerank_model import RerankModel
+from core.model_runtime.utils.client_pool import model_client_pool
 
 
 class XinferenceRerankModel(RerankModel):
@@ -48,8 +49,9 @@ class XinferenceRerankModel(RerankModel):
             credentials['server_url'] = credentials['server_url'][:-1]
 
         # initialize client
-        client = Client(
-            base_url=credentials['server_url']
+        client = model_client_pool.get_client(
+            'xinference', {'base_url': credentials['server_url']},
+            lambda: Client(base_url=credentials['server_url'])
         )
 
         xinference_client = client.get_model(model_uid=credentials['model_uid'])
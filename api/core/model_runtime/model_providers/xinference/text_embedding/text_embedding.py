@@ -17,6 +17,7 @@ from core.model_runtime.errors.invoke import (
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.model_runtime.model_providers.xinference.xinference_helper import XinferenceHelper
+from core.model_runtime.utils.client_pool import model_client_pool
 
 
 class XinferenceTextEmbeddingModel(TextEmbeddingModel):
@@ -47,7 +48,10 @@ class XinferenceTextEmbeddingModel(TextEmbeddingModel):
         if server_url.endswith('/'):
             server_url = server_url[:-1]
 
-        client = Client(base_url=server_url)
+        client = model_client_pool.get_client(
+            'xinference', {'base_url': server_url},
+            lambda: Client(base_url=server_url)
+        )
         
         try:
             handle = client.get_model(model_uid=model_uid)
@@ -18,6 +18,7 @@ from core.model_runtime.model_providers.zhipuai.zhipuai_sdk._client import Zhipu
 from core.model_runtime.model_providers.zhipuai.zhipuai_sdk.types.chat.chat_completion import Completion
 from core.model_runtime.model_providers.zhipuai.zhipuai_sdk.types.chat.chat_completion_chunk import ChatCompletionChunk
 from core.model_runtime.utils import helper
+from core.model_runtime.utils.client_pool import model_client_pool
 
 GLM_JSON_MODE_PROMPT = """You should always follow the instructions and output a valid JSON object.
 The structure of the JSON object you can found in the instructions, use {"answer": "$your_answer"} as the default structure
@@ -153,8 +154,9 @@ class ZhipuAILargeLanguageModel(_CommonZhipuaiAI, LargeLanguageModel):
         if stop:
             extra_model_kwargs['stop'] = stop
 
-        client = ZhipuAI(
-            api_key=credentials_kwargs['api_key']
+        client = model_client_pool.get_client(
+            'zhipuai', {'api_key': credentials_kwargs['api_key']},
+            lambda: ZhipuAI(api_key=credentials_kwargs['api_key'])
         )
 
         if len(prompt_messages) == 0:
@@ -7,6 +7,7 @@ from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.model_runtime.model_providers.zhipuai._common import _CommonZhipuaiAI
 from core.model_runtime.model_providers.zhipuai.zhipuai_sdk._client import ZhipuAI
+from core.model_runtime.utils.client_pool import model_client_pool
 
 
 class ZhipuAITextEmbeddingModel(_CommonZhipuaiAI, TextEmbeddingModel):
@@ -27,8 +28,9 @@ class ZhipuAITextEmbeddingModel(_CommonZhipuaiAI, TextEmbeddingModel):
         :return: embeddings result
         """
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = ZhipuAI(
-            api_key=credentials_kwargs['api_key']
+        client = model_client_pool.get_client(
+            'zhipuai', {'api_key': credentials_kwargs['api_key']},
+            lambda: ZhipuAI(api_key=credentials_kwargs['api_key'])
         )
 
         embeddings, embedding_used_tokens = self.embed_documents(model, client, texts)
@@ -68,8 +70,9 @@ class ZhipuAITextEmbeddingModel(_CommonZhipuaiAI, TextEmbeddingModel):
         try:
             # transform credentials to kwargs for model instance
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = ZhipuAI(
-                api_key=credentials_kwargs['api_key']
+            client = model_client_pool.get_client(
+                'zhipuai', {'api_key': credentials_kwargs['api_key']},
+                lambda: ZhipuAI(api_key=credentials_kwargs['api_key'])
             )
 
             # call embedding model
@@ -0,0 +1,30 @@
+import asyncio
+from collections.abc import AsyncGenerator, Generator
+from typing import TypeVar
+
+T = TypeVar('T')
+
+_END_OF_GENERATOR = object()
+
+
+async def iterate_in_thread(generator: Generator[T, None, None]) -> AsyncGenerator[T, None]:
+    """
+    Iterate a blocking generator in worker threads, one item per thread hop,
+    so that the event loop is not blocked while the generator waits for the next item.
+
+    :param generator: blocking generator
+    :return: async generator of the same items
+    """
+    try:
+        while True:
+            item = await asyncio.to_thread(next, generator, _END_OF_GENERATOR)
+            if item is _END_OF_GENERATOR:
+                break
+
+            yield item
+    finally:
+        try:
+            generator.close()
+        except ValueError:
+            # the generator is still running in the worker thread when the iteration was cancelled
+            pass
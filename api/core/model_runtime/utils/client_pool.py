@@ -0,0 +1,297 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable
+from typing import Any, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.model_runtime.utils.helper import credentials_fingerprint
+
+T = TypeVar('T')
+
+# clients which are not used for this many seconds are dropped from the pool
+CLIENT_POOL_IDLE_TIMEOUT = 300
+# least recently used clients are dropped beyond this number of clients
+CLIENT_POOL_MAX_CLIENTS = 256
+# each pooled client talks to a single host, so its limits are the limits of that host
+CLIENT_POOL_MAX_CONNECTIONS_PER_HOST = 32
+CLIENT_POOL_MAX_KEEPALIVE_CONNECTIONS_PER_HOST = 16
+
+
+class _ClientPoolEntry:
+    def __init__(self, client: Any) -> None:
+        self.client = client
+        self.last_used_at = time.monotonic()
+
+
+class ClientPool:
+    """
+    Process level pool of model provider SDK clients, keyed by provider and a fingerprint of the credentials.
+
+    Reusing a client reuses its connection pool, so the connection and the TLS handshake to the provider
+    are skipped for all but the first invoke. The clients are never closed by the pool, evicted clients are
+    only dropped so that invokes which are still using them can finish.
+    """
+    def __init__(self, idle_timeout: float = CLIENT_POOL_IDLE_TIMEOUT,
+                 max_clients: int = CLIENT_POOL_MAX_CLIENTS) -> None:
+        self.idle_timeout = idle_timeout
+        self.max_clients = max_clients
+        self._entries: OrderedDict[tuple[str, str], _ClientPoolEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics: dict[str, dict[str, int]] = defaultdict(lambda: {'hits': 0, 'misses': 0, 'evictions': 0})
+
+    def get_client(self, provider: str, credentials: dict, factory: Callable[[], T]) -> T:
+        """
+        Get the pooled client of the provider and credentials, created by the factory on a miss.
+
+        :param provider: provider name, also the namespace of the client type,
+                         e.g. openai and openai_requests for two kinds of clients of the same credentials
+        :param credentials: everything the client is created with, used as the cache key
+        :param factory: function which creates the client
+        :return: client
+        """
+        key = (provider, credentials_fingerprint(credentials))
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.last_used_at = now
+                self._entries.move_to_end(key)
+                self._metrics[provider]['hits'] += 1
+                return entry.client
+
+            self._metrics[provider]['misses'] += 1
+
+        # clients are created outside of the lock, a concurrent miss of the same key creates one more client
+        client = factory()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry.client
+
+            self._entries[key] = _ClientPoolEntry(client)
+            while len(self._entries) > self.max_clients:
+                (evicted_provider, _), _ = self._entries.popitem(last=False)
+                self._metrics[evicted_provider]['evictions'] += 1
+
+        return client
+
+    def get_metrics(self) -> dict:
+        """
+        Get pool reuse metrics, hits, misses and evictions of each provider.
+
+        :return:
+        """
+        with self._lock:
+            clients = defaultdict(int)
+            for provider, _ in self._entries:
+                clients[provider] += 1
+
+            return {
+                'clients': len(self._entries),
+                'providers': {
+                    provider: {**metrics, 'clients': clients[provider]}
+                    for provider, metrics in self._metrics.items()
+                }
+            }
+
+    def clear(self) -> None:
+        """
+        Drop all the pooled clients and metrics.
+
+        :return:
+        """
+        with self._lock:
+            self._entries.clear()
+            self._metrics.clear()
+
+    def _evict_idle(self, now: float) -> None:
+        # entries are ordered by last use, so only the oldest entries have to be checked
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry.last_used_at <= self.idle_timeout:
+                break
+
+            self._entries.popitem(last=False)
+            self._metrics[key[0]]['evictions'] += 1
+
+
+class AsyncClientPool:
+    """
+    Pool of async httpx clients, one registry per event loop.
+
+    Connections of an async client belong to the event loop they were opened in, so a client is only ever
+    given to its own loop. Registries are held weakly by their loop, a loop which is closed and collected,
+    e.g. after asyncio.run, drops its clients and a later loop never gets them even if it reuses the same id.
+    Clients evicted from a running loop are closed in that loop.
+    """
+    def __init__(self, idle_timeout: float = CLIENT_POOL_IDLE_TIMEOUT,
+                 max_clients_per_loop: int = CLIENT_POOL_MAX_CLIENTS) -> None:
+        self.idle_timeout = idle_timeout
+        self.max_clients_per_loop = max_clients_per_loop
+        self._loops: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OrderedDict[str, _ClientPoolEntry]] \
+            = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._metrics = {'hits': 0, 'misses': 0, 'evictions': 0}
+        # closing tasks are referenced until they are done, the loop only keeps weak references to its tasks
+        self._closing_tasks: set[asyncio.Task] = set()
+
+    def get_client(self, host: str, factory: Callable[[], httpx.AsyncClient]) -> httpx.AsyncClient:
+        """
+        Get the pooled client of the host in the running event loop, created by the factory on a miss.
+
+        :param host: scheme and netloc of the host
+        :param factory: function which creates the client
+        :return: client
+        """
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        evicted_clients = []
+
+        with self._lock:
+            entries = self._loops.get(loop)
+            if entries is None:
+                entries = OrderedDict()
+                self._loops[loop] = entries
+
+            # entries are ordered by last use, so only the oldest entries have to be checked
+            while entries:
+                oldest_host, entry = next(iter(entries.items()))
+                if now - entry.last_used_at <= self.idle_timeout:
+                    break
+
+                evicted_clients.append(entries.pop(oldest_host).client)
+
+            entry = entries.get(host)
+            if entry is not None:
+                entry.last_used_at = now
+                entries.move_to_end(host)
+                self._metrics['hits'] += 1
+            else:
+                self._metrics['misses'] += 1
+                entry = _ClientPoolEntry(factory())
+                entries[host] = entry
+                while len(entries) > self.max_clients_per_loop:
+                    _, evicted_entry = entries.popitem(last=False)
+                    evicted_clients.append(evicted_entry.client)
+
+            self._metrics['evictions'] += len(evicted_clients)
+
+        for client in evicted_clients:
+            self._close_later(loop, client)
+
+        return entry.client
+
+    def get_metrics(self) -> dict:
+        """
+        Get pool reuse metrics, hits, misses and evictions of the async clients of all the loops.
+
+        :return:
+        """
+        with self._lock:
+            return {
+                'loops': len(self._loops),
+                'clients': sum(len(entries) for entries in self._loops.values()),
+                **self._metrics
+            }
+
+    def clear(self) -> None:
+        """
+        Drop all the pooled clients and metrics, the clients are not closed.
+
+        :return:
+        """
+        with self._lock:
+            self._loops.clear()
+            self._metrics = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _close_later(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+        # the client is closed in a task of its own loop, so its connections are closed in the loop they belong to
+        task = loop.create_task(client.aclose())
+        self._closing_tasks.add(task)
+        task.add_done_callback(self._closing_tasks.discard)
+
+
+def new_httpx_client(**kwargs: Any) -> httpx.Client:
+    """
+    Create a httpx client with the per host connection limits of the pool,
+    to be passed as the http client of httpx based SDKs.
+    """
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=CLIENT_POOL_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=CLIENT_POOL_MAX_KEEPALIVE_CONNECTIONS_PER_HOST
+        ),
+        **kwargs
+    )
+
+
+def new_async_httpx_client(**kwargs: Any) -> httpx.AsyncClient:
+    """
+    Create an async httpx client with the per host connection limits of the pool.
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=CLIENT_POOL_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=CLIENT_POOL_MAX_KEEPALIVE_CONNECTIONS_PER_HOST
+        ),
+        **kwargs
+    )
+
+
+def new_requests_session() -> requests.Session:
+    """
+    Create a requests session with the per host connection limits of the pool.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=CLIENT_POOL_MAX_CONNECTIONS_PER_HOST)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+model_client_pool = ClientPool()
+model_async_client_pool = AsyncClientPool()
+
+
+def get_requests_session(url: str) -> requests.Session:
+    """
+    Get the pooled requests session of the host of the url, for providers which call their http api directly,
+    credentials are sent in the headers of each request so sessions are only keyed by the host.
+
+    :param url: request url
+    :return:
+    """
+    parsed_url = urlsplit(url)
+    return model_client_pool.get_client(
+        'requests', {'host': f'{parsed_url.scheme}://{parsed_url.netloc}'},
+        new_requests_session
+    )
+
+
+def get_async_httpx_client(url: str) -> httpx.AsyncClient:
+    """
+    Get the pooled async httpx client of the host of the url in the running event loop,
+    the async counterpart of get_requests_session.
+
+    :param url: request url
+    :return:
+    """
+    parsed_url = urlsplit(url)
+    return model_async_client_pool.get_client(f'{parsed_url.scheme}://{parsed_url.netloc}', new_async_httpx_client)
+
+
+# connections must not be shared with the forked worker processes
+os.register_at_fork(after_in_child=model_client_pool.clear)
+os.register_at_fork(after_in_child=model_async_client_pool.clear)
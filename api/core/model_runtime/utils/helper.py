@@ -1,3 +1,6 @@
+import hashlib
+import json
+
 import pydantic
 from pydantic import BaseModel
 
@@ -7,3 +10,14 @@ def dump_model(model: BaseModel) -> dict:
         return pydantic.model_dump(model)
     else:
         return model.dict()
+
+
+def credentials_fingerprint(credentials: dict) -> str:
+    """
+    Get a stable fingerprint of credentials, to key caches by credentials without keeping them in the key
+
+    :param credentials: credentials, objects such as timeouts are compared by their repr
+    :return: sha256 hex digest
+    """
+    serialized = json.dumps(credentials, sort_keys=True, default=repr)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
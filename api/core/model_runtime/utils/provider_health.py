@@ -0,0 +1,300 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Generator
+from enum import Enum
+from typing import Optional
+
+from core.model_runtime.errors.invoke import (
+    InvokeCircuitOpenError,
+    InvokeConcurrencyLimitError,
+    InvokeConnectionError,
+    InvokeError,
+    InvokeRateLimitError,
+    InvokeServerUnavailableError,
+)
+from core.model_runtime.utils.helper import credentials_fingerprint
+
+# consecutive failures which open the circuit
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+# seconds the circuit stays open before a trial invoke is let through
+CIRCUIT_BREAKER_RECOVERY_TIMEOUT = 30
+# upper bound of the adaptive concurrency limit
+MAX_CONCURRENT_INVOKES = 64
+# least recently used health trackers are dropped beyond this number of provider credentials
+MAX_TRACKED_CREDENTIALS = 4096
+
+# errors which mean the provider is unhealthy, other errors mean the provider did answer
+UNHEALTHY_INVOKE_ERRORS = (InvokeRateLimitError, InvokeServerUnavailableError, InvokeConnectionError)
+
+
+class CircuitState(Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class ProviderHealth:
+    """
+    Health of one provider credentials, a circuit breaker and an AIMD concurrency limit.
+
+    Rate limit, server unavailable and connection errors are failures. Consecutive failures open the circuit,
+    while it is open invokes are rejected, after the recovery timeout a single trial invoke is let through,
+    which closes the circuit on success and opens it again on failure.
+    The concurrency limit is raised by one per limit successful invokes and halved by every failure,
+    invokes beyond the limit are rejected instead of waiting for the degraded provider.
+    """
+    def __init__(self, failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                 recovery_timeout: float = CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+                 max_concurrency: int = MAX_CONCURRENT_INVOKES) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.max_concurrency = max_concurrency
+
+        self.state = CircuitState.CLOSED
+        self.opened_at: Optional[float] = None
+        self.consecutive_failures = 0
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejections = 0
+
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        # releases of the garbage collector, which can not take the lock, applied by the next call
+        self._deferred_releases: deque[tuple[bool, Optional[BaseException]]] = deque()
+
+    def acquire(self) -> bool:
+        """
+        Take an invoke slot, to be given back by release once the invoke is done
+
+        :return: whether the invoke is the trial invoke of the half open circuit
+        """
+        with self._lock:
+            self._apply_deferred_releases()
+
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    self.rejections += 1
+                    raise InvokeCircuitOpenError(InvokeCircuitOpenError.description)
+
+                self.state = CircuitState.HALF_OPEN
+
+            if self.state == CircuitState.HALF_OPEN:
+                # only the trial invoke is let through until it is done
+                if self._trial_in_flight:
+                    self.rejections += 1
+                    raise InvokeCircuitOpenError(InvokeCircuitOpenError.description)
+
+                self._trial_in_flight = True
+                self.in_flight += 1
+                return True
+
+            if self.in_flight >= int(self.concurrency_limit):
+                self.rejections += 1
+                raise InvokeConcurrencyLimitError(InvokeConcurrencyLimitError.description)
+
+            self.in_flight += 1
+            return False
+
+    def release(self, is_trial: bool, error: Optional[BaseException] = None) -> None:
+        """
+        Give back the invoke slot and record the outcome of the invoke
+
+        :param is_trial: whether the invoke is the trial invoke, as returned by acquire
+        :param error: error raised by the invoke, None if it succeeded
+        :return:
+        """
+        with self._lock:
+            self._apply_deferred_releases()
+            self._release(is_trial, error)
+
+    def release_deferred(self, is_trial: bool, error: Optional[BaseException] = None) -> None:
+        """
+        Give back the invoke slot without taking the lock, for finalizers run by the garbage collector,
+        which may run while the same thread holds the lock. It is recorded by the next call.
+
+        :param is_trial: whether the invoke is the trial invoke, as returned by acquire
+        :param error: error raised by the invoke, None if it succeeded
+        :return:
+        """
+        self._deferred_releases.append((is_trial, error))
+
+    def _apply_deferred_releases(self) -> None:
+        # called with the lock held
+        while self._deferred_releases:
+            self._release(*self._deferred_releases.popleft())
+
+    def _release(self, is_trial: bool, error: Optional[BaseException]) -> None:
+        # called with the lock held
+        self.in_flight -= 1
+        if is_trial:
+            self._trial_in_flight = False
+
+        if isinstance(error, UNHEALTHY_INVOKE_ERRORS):
+            self.failures += 1
+            self.consecutive_failures += 1
+            # multiplicative decrease
+            self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+
+            if is_trial or self.consecutive_failures >= self.failure_threshold:
+                self.state = CircuitState.OPEN
+                self.opened_at = time.monotonic()
+        elif error is None or isinstance(error, InvokeError):
+            self.successes += 1
+            self.consecutive_failures = 0
+            # additive increase
+            self.concurrency_limit = min(float(self.max_concurrency),
+                                         self.concurrency_limit + 1 / self.concurrency_limit)
+
+            if is_trial:
+                self.state = CircuitState.CLOSED
+                self.opened_at = None
+        # other errors are raised before the provider is called, the trial is retried by the next invoke
+
+    def get_state(self) -> dict:
+        """
+        Get the circuit state, concurrency limit and counters
+
+        :return:
+        """
+        with self._lock:
+            self._apply_deferred_releases()
+
+            retry_after = None
+            if self.state == CircuitState.OPEN:
+                retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+            return {
+                'state': self.state.value,
+                'retry_after': retry_after,
+                'consecutive_failures': self.consecutive_failures,
+                'concurrency_limit': int(self.concurrency_limit),
+                'in_flight': self.in_flight,
+                'successes': self.successes,
+                'failures': self.failures,
+                'rejections': self.rejections
+            }
+
+
+class ProviderHealthStream(Generator):
+    """
+    Stream result of an invoke, which holds the invoke slot until the stream is exhausted, fails or is closed.
+
+    The slot is also given back when the stream is dropped without being consumed or even started,
+    which a generator function would not do since its finally block only runs once it has started.
+    """
+    def __init__(self, health: ProviderHealth, is_trial: bool, stream: Generator) -> None:
+        self._health = health
+        self._is_trial = is_trial
+        self._stream = stream
+        self._released = False
+
+    def send(self, value):
+        try:
+            return self._stream.send(value)
+        except StopIteration:
+            self._release()
+            raise
+        except Exception as e:
+            self._release(e)
+            raise
+
+    def throw(self, typ, val=None, tb=None):
+        try:
+            if val is None and tb is None:
+                return self._stream.throw(typ)
+            return self._stream.throw(typ, val, tb)
+        except StopIteration:
+            self._release()
+            raise
+        except Exception as e:
+            self._release(e)
+            raise
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+    def __del__(self) -> None:
+        # the garbage collector may run while this thread holds the lock of the health
+        if not self._released:
+            self._released = True
+            self._health.release_deferred(self._is_trial)
+
+    def _release(self, error: Optional[BaseException] = None) -> None:
+        # the slot is only given back once, whichever of exhaustion, failure, close or garbage collection comes first
+        if self._released:
+            return
+
+        self._released = True
+        self._health.release(self._is_trial, error)
+
+
+class ProviderHealthTracker:
+    """
+    Process level health of each provider credentials, keyed by provider and a fingerprint of the credentials.
+    """
+    def __init__(self, max_tracked_credentials: int = MAX_TRACKED_CREDENTIALS) -> None:
+        self.max_tracked_credentials = max_tracked_credentials
+        self._healths: OrderedDict[tuple[str, str], ProviderHealth] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_health(self, provider: str, credentials: dict,
+                   failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                   recovery_timeout: float = CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+                   max_concurrency: int = MAX_CONCURRENT_INVOKES) -> ProviderHealth:
+        """
+        Get the health of the provider credentials, settings only apply to the health created by the first call
+
+        :param provider: provider name
+        :param credentials: provider credentials
+        :param failure_threshold: consecutive failures which open the circuit
+        :param recovery_timeout: seconds the circuit stays open
+        :param max_concurrency: upper bound of the concurrency limit
+        :return: provider health
+        """
+        key = (provider, credentials_fingerprint(credentials))
+        with self._lock:
+            health = self._healths.get(key)
+            if health is None:
+                health = ProviderHealth(failure_threshold, recovery_timeout, max_concurrency)
+                self._healths[key] = health
+                while len(self._healths) > self.max_tracked_credentials:
+                    self._healths.popitem(last=False)
+            else:
+                self._healths.move_to_end(key)
+
+            return health
+
+    def get_states(self) -> list[dict]:
+        """
+        Get the state of each tracked provider credentials, credentials are only identified by their fingerprint
+
+        :return:
+        """
+        with self._lock:
+            healths = list(self._healths.items())
+
+        return [
+            {
+                'provider': provider,
+                'credentials_fingerprint': fingerprint[:12],
+                **health.get_state()
+            }
+            for (provider, fingerprint), health in healths
+        ]
+
+    def clear(self) -> None:
+        """
+        Drop the health of all the provider credentials.
+
+        :return:
+        """
+        with self._lock:
+            self._healths.clear()
+
+provider_health_tracker = ProviderHealthTracker()
@@ -16,6 +16,7 @@ from core.entities.provider_entities import (
 )
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+from core.helper.provider_quota_ledger import ProviderQuotaLedger
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.entities.provider_entities import (
     CredentialFormSchema,
@@ -114,72 +115,62 @@ class ProviderManager:
             if not provider_model_records:
                 provider_model_records = []
 
-            # Convert to custom configuration
-            custom_configuration = self._to_custom_configuration(
+            # Get preferred provider type
+            preferred_provider_type_record = provider_name_to_preferred_model_provider_records_dict.get(provider_name)
+
+            provider_configuration = self._to_provider_configuration(
                 tenant_id,
                 provider_entity,
                 provider_records,
-                provider_model_records
+                provider_model_records,
+                preferred_provider_type_record
             )
 
-            # Convert to system configuration
-            system_configuration = self._to_system_configuration(
-                tenant_id,
-                provider_entity,
-                provider_records
-            )
+            provider_configurations[provider_name] = provider_configuration
 
-            # Get preferred provider type
-            preferred_provider_type_record = provider_name_to_preferred_model_provider_records_dict.get(provider_name)
+        # Return the encapsulated object
+        return provider_configurations
 
-            if preferred_provider_type_record:
-                preferred_provider_type = ProviderType.value_of(preferred_provider_type_record.preferred_provider_type)
-            else:
-                if custom_configuration.provider or custom_configuration.models:
-                    preferred_provider_type = ProviderType.CUSTOM
-                elif system_configuration.enabled:
-                    preferred_provider_type = ProviderType.SYSTEM
-                else:
-                    preferred_provider_type = ProviderType.CUSTOM
+    def get_provider_configuration(self, tenant_id: str, provider: str) -> Optional[ProviderConfiguration]:
+        """
+        Get model provider configuration of a single provider,
+        the same configuration as the one of get_configurations, built from the records of this provider only.
+
+        :param tenant_id: workspace id
+        :param provider: provider name
+        :return: provider configuration, None if the provider does not exist
+        """
+        try:
+            provider_entity = model_provider_factory.get_provider(provider)
+        except Exception:
+            return None
 
-            using_provider_type = preferred_provider_type
-            if preferred_provider_type == ProviderType.SYSTEM:
-                if not system_configuration.enabled:
-                    using_provider_type = ProviderType.CUSTOM
+        # Get the provider records of the workspace
+        provider_name_to_provider_records_dict = self._get_all_providers(tenant_id, provider)
 
-                has_valid_quota = False
-                for quota_configuration in system_configuration.quota_configurations:
-                    if quota_configuration.is_valid:
-                        has_valid_quota = True
-                        break
+        # Initialize trial provider records if not exist
+        provider_name_to_provider_records_dict = self._init_trial_provider_records(
+            tenant_id,
+            provider_name_to_provider_records_dict,
+            provider
+        )
 
-                if not has_valid_quota:
-                    using_provider_type = ProviderType.CUSTOM
-            else:
-                if not custom_configuration.provider and not custom_configuration.models:
-                    if system_configuration.enabled:
-                        has_valid_quota = False
-                        for quota_configuration in system_configuration.quota_configurations:
-                            if quota_configuration.is_valid:
-                                has_valid_quota = True
-                                break
-
-                        if has_valid_quota:
-                            using_provider_type = ProviderType.SYSTEM
-
-            provider_configuration = ProviderConfiguration(
-                tenant_id=tenant_id,
-                provider=provider_entity,
-                preferred_provider_type=preferred_provider_type,
-                using_provider_type=using_provider_type,
-                system_configuration=system_configuration,
-                custom_configuration=custom_configuration
-            )
+        # Get the provider model records of the workspace
+        provider_name_to_provider_model_records_dict = self._get_all_provider_models(tenant_id, provider)
 
-            provider_configurations[provider_name] = provider_configuration
+        # Get the preferred provider type of the workspace
+        provider_name_to_preferred_model_provider_records_dict = self._get_all_preferred_model_providers(
+            tenant_id,
+            provider
+        )
 
-        # Return the encapsulated object
-        return provider_configurations
+        return self._to_provider_configuration(
+            tenant_id,
+            provider_entity,
+            provider_name_to_provider_records_dict.get(provider) or [],
+            provider_name_to_provider_model_records_dict.get(provider) or [],
+            provider_name_to_preferred_model_provider_records_dict.get(provider)
+        )
 
     def get_provider_model_bundle(self, tenant_id: str, provider: str, model_type: ModelType) -> ProviderModelBundle:
         """
@@ -189,10 +180,8 @@ class ProviderManager:
         :param model_type: model type
         :return:
         """
-        provider_configurations = self.get_configurations(tenant_id)
-
-        # get provider instance
-        provider_configuration = provider_configurations.get(provider)
+        # only the configuration of the provider is built
+        provider_configuration = self.get_provider_configuration(tenant_id, provider)
         if not provider_configuration:
             raise ValueError(f"Provider {provider} does not exist.")
 
@@ -328,18 +317,24 @@ class ProviderManager:
 
         return default_model
 
-    def _get_all_providers(self, tenant_id: str) -> dict[str, list[Provider]]:
+    def _get_all_providers(self, tenant_id: str, provider: Optional[str] = None) -> dict[str, list[Provider]]:
         """
         Get all provider records of the workspace.
 
         :param tenant_id: workspace id
+        :param provider: only get the records of this provider if given
         :return:
         """
-        providers = db.session.query(Provider) \
+        query = db.session.query(Provider) \
             .filter(
             Provider.tenant_id == tenant_id,
             Provider.is_valid == True
-        ).all()
+        )
+
+        if provider:
+            query = query.filter(Provider.provider_name == provider)
+
+        providers = query.all()
 
         provider_name_to_provider_records_dict = defaultdict(list)
         for provider in providers:
@@ -347,19 +342,26 @@ class ProviderManager:
 
         return provider_name_to_provider_records_dict
 
-    def _get_all_provider_models(self, tenant_id: str) -> dict[str, list[ProviderModel]]:
+    def _get_all_provider_models(self, tenant_id: str, provider: Optional[str] = None) \
+            -> dict[str, list[ProviderModel]]:
         """
         Get all provider model records of the workspace.
 
         :param tenant_id: workspace id
+        :param provider: only get the records of this provider if given
         :return:
         """
         # Get all provider model records of the workspace
-        provider_models = db.session.query(ProviderModel) \
+        query = db.session.query(ProviderModel) \
             .filter(
             ProviderModel.tenant_id == tenant_id,
             ProviderModel.is_valid == True
-        ).all()
+        )
+
+        if provider:
+            query = query.filter(ProviderModel.provider_name == provider)
+
+        provider_models = query.all()
 
         provider_name_to_provider_model_records_dict = defaultdict(list)
         for provider_model in provider_models:
@@ -367,17 +369,24 @@ class ProviderManager:
 
         return provider_name_to_provider_model_records_dict
 
-    def _get_all_preferred_model_providers(self, tenant_id: str) -> dict[str, TenantPreferredModelProvider]:
+    def _get_all_preferred_model_providers(self, tenant_id: str, provider: Optional[str] = None) \
+            -> dict[str, TenantPreferredModelProvider]:
         """
         Get All preferred provider types of the workspace.
 
         :param tenant_id:
+        :param provider: only get the record of this provider if given
         :return:
         """
-        preferred_provider_types = db.session.query(TenantPreferredModelProvider) \
+        query = db.session.query(TenantPreferredModelProvider) \
             .filter(
             TenantPreferredModelProvider.tenant_id == tenant_id
-        ).all()
+        )
+
+        if provider:
+            query = query.filter(TenantPreferredModelProvider.provider_name == provider)
+
+        preferred_provider_types = query.all()
 
         provider_name_to_preferred_provider_type_records_dict = {
             preferred_provider_type.provider_name: preferred_provider_type
@@ -387,12 +396,14 @@ class ProviderManager:
         return provider_name_to_preferred_provider_type_records_dict
 
     def _init_trial_provider_records(self, tenant_id: str,
-                                     provider_name_to_provider_records_dict: dict[str, list]) -> dict[str, list]:
+                                     provider_name_to_provider_records_dict: dict[str, list],
+                                     provider: Optional[str] = None) -> dict[str, list]:
         """
         Initialize trial provider records if not exists.
 
         :param tenant_id: workspace id
         :param provider_name_to_provider_records_dict: provider name to provider records dict
+        :param provider: only initialize the records of this provider if given
         :return:
         """
         # Get hosting configuration
@@ -402,6 +413,9 @@ class ProviderManager:
             if not configuration.enabled:
                 continue
 
+            if provider and provider_name != provider:
+                continue
+
             provider_records = provider_name_to_provider_records_dict.get(provider_name)
             if not provider_records:
                 provider_records = []
@@ -448,6 +462,82 @@ class ProviderManager:
 
         return provider_name_to_provider_records_dict
 
+    def _to_provider_configuration(self,
+                                   tenant_id: str,
+                                   provider_entity: ProviderEntity,
+                                   provider_records: list[Provider],
+                                   provider_model_records: list[ProviderModel],
+                                   preferred_provider_type_record: Optional[TenantPreferredModelProvider]) \
+            -> ProviderConfiguration:
+        """
+        Convert to provider configuration.
+
+        :param tenant_id: workspace id
+        :param provider_entity: provider entity
+        :param provider_records: provider records
+        :param provider_model_records: provider model records
+        :param preferred_provider_type_record: preferred provider type record
+        :return:
+        """
+        # Convert to custom configuration
+        custom_configuration = self._to_custom_configuration(
+            tenant_id,
+            provider_entity,
+            provider_records,
+            provider_model_records
+        )
+
+        # Convert to system configuration
+        system_configuration = self._to_system_configuration(
+            tenant_id,
+            provider_entity,
+            provider_records
+        )
+
+        if preferred_provider_type_record:
+            preferred_provider_type = ProviderType.value_of(preferred_provider_type_record.preferred_provider_type)
+        else:
+            if custom_configuration.provider or custom_configuration.models:
+                preferred_provider_type = ProviderType.CUSTOM
+            elif system_configuration.enabled:
+                preferred_provider_type = ProviderType.SYSTEM
+            else:
+                preferred_provider_type = ProviderType.CUSTOM
+
+        using_provider_type = preferred_provider_type
+        if preferred_provider_type == ProviderType.SYSTEM:
+            if not system_configuration.enabled:
+                using_provider_type = ProviderType.CUSTOM
+
+            has_valid_quota = False
+            for quota_configuration in system_configuration.quota_configurations:
+                if quota_configuration.is_valid:
+                    has_valid_quota = True
+                    break
+
+            if not has_valid_quota:
+                using_provider_type = ProviderType.CUSTOM
+        else:
+            if not custom_configuration.provider and not custom_configuration.models:
+                if system_configuration.enabled:
+                    has_valid_quota = False
+                    for quota_configuration in system_configuration.quota_configurations:
+                        if quota_configuration.is_valid:
+                            has_valid_quota = True
+                            break
+
+                    if has_valid_quota:
+                        using_provider_type = ProviderType.SYSTEM
+
+        return ProviderConfiguration(
+            tenant_id=tenant_id,
+            provider=provider_entity,
+            preferred_provider_type=preferred_provider_type,
+            using_provider_type=using_provider_type,
+            system_configuration=system_configuration,
+            custom_configuration=custom_configuration
+        )
+
     def _to_custom_configuration(self,
                                  tenant_id: str,
                                  provider_entity: ProviderEntity,
@@ -624,6 +714,15 @@ class ProviderManager:
             quota_type_to_provider_records_dict[ProviderQuotaType.value_of(provider_record.quota_type)] \
                 = provider_record
 
+        # usage deducted after the provider records were written back is still in the quota ledger
+        ledger_quota_used = {}
+        if quota_type_to_provider_records_dict:
+            ledger_quota_used = ProviderQuotaLedger.get_quota_used(
+                tenant_id=tenant_id,
+                provider_name=provider_entity.provider,
+                quota_types=[quota_type.value for quota_type in quota_type_to_provider_records_dict]
+            )
+
         quota_configurations = []
         for provider_quota in provider_hosting_configuration.quotas:
             if provider_quota.quota_type not in quota_type_to_provider_records_dict:
@@ -640,13 +739,15 @@ class ProviderManager:
                     continue
             else:
                 provider_record = quota_type_to_provider_records_dict[provider_quota.quota_type]
+                quota_used = max(provider_record.quota_used or 0,
+                                 ledger_quota_used.get(provider_quota.quota_type.value, 0))
 
                 quota_configuration = QuotaConfiguration(
                     quota_type=provider_quota.quota_type,
                     quota_unit=provider_hosting_configuration.quota_unit,
-                    quota_used=provider_record.quota_used,
+                    quota_used=quota_used,
                     quota_limit=provider_record.quota_limit,
-                    is_valid=provider_record.quota_limit > provider_record.quota_used or provider_record.quota_limit == -1,
+                    is_valid=provider_record.quota_limit > quota_used or provider_record.quota_limit == -1,
                     restrict_models=provider_quota.restrict_models
                 )
 
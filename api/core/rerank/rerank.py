@@ -1,7 +1,15 @@
+import hashlib
+import logging
 from typing import Optional
 
+from flask import current_app
+
 from core.model_manager import ModelInstance
+from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
 from core.rag.models.document import Document
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
 
 
 class RerankRunner:
@@ -19,39 +27,117 @@ class RerankRunner:
         :param user: unique user id if needed
         :return:
         """
-        docs = []
-        doc_id = []
+        doc_ids = set()
         unique_documents = []
         for document in documents:
-            if document.metadata['doc_id'] not in doc_id:
-                doc_id.append(document.metadata['doc_id'])
-                docs.append(document.page_content)
+            if document.metadata['doc_id'] not in doc_ids:
+                doc_ids.add(document.metadata['doc_id'])
                 unique_documents.append(document)
 
         documents = unique_documents
+        if not documents:
+            return []
 
-        rerank_result = self.rerank_model_instance.invoke_rerank(
-            query=query,
-            docs=docs,
-            score_threshold=score_threshold,
-            top_n=top_n,
-            user=user
-        )
+        max_tokens = int(current_app.config.get('RERANK_DOCUMENT_MAX_TOKENS', 0))
+        docs = [self._truncate(document.page_content, max_tokens) for document in documents]
 
-        rerank_documents = []
+        cache_ttl = int(current_app.config.get('RERANK_CACHE_TTL', 0))
+        if cache_ttl <= 0:
+            rerank_result = self.rerank_model_instance.invoke_rerank(
+                query=query,
+                docs=docs,
+                score_threshold=score_threshold,
+                top_n=top_n,
+                user=user
+            )
+            return [self._format_document(documents[result.index], result.score) for result in rerank_result.docs]
+
+        # scores of (query, doc, model) are cached, only send the uncached docs to the rerank model
+        cache_keys = [self._get_cache_key(query, doc) for doc in docs]
+        scores = self._get_cached_scores(cache_keys)
 
-        for result in rerank_result.docs:
-            # format document
-            rerank_document = Document(
-                page_content=result.text,
-                metadata={
-                    "doc_id": documents[result.index].metadata['doc_id'],
-                    "doc_hash": documents[result.index].metadata['doc_hash'],
-                    "document_id": documents[result.index].metadata['document_id'],
-                    "dataset_id": documents[result.index].metadata['dataset_id'],
-                    'score': result.score
-                }
+        uncached_indexes = [index for index, score in enumerate(scores) if score is None]
+        if uncached_indexes:
+            # scores of all the uncached docs are needed for caching, apply threshold and top n afterwards
+            rerank_result = self.rerank_model_instance.invoke_rerank(
+                query=query,
+                docs=[docs[index] for index in uncached_indexes],
+                user=user
             )
-            rerank_documents.append(rerank_document)
+
+            new_scores = {}
+            for result in rerank_result.docs:
+                index = uncached_indexes[result.index]
+                scores[index] = result.score
+                new_scores[cache_keys[index]] = result.score
+
+            self._set_cached_scores(new_scores, cache_ttl)
+
+        rerank_documents = []
+        for document, score in sorted(
+                [(document, score) for document, score in zip(documents, scores) if score is not None],
+                key=lambda item: item[1],
+                reverse=True
+        ):
+            if score_threshold is not None and score < score_threshold:
+                continue
+            rerank_documents.append(self._format_document(document, score))
+
+        if top_n is not None:
+            rerank_documents = rerank_documents[:top_n]
 
         return rerank_documents
+
+    def _format_document(self, document: Document, score: float) -> Document:
+        """
+        Format reranked document, keeps the full content of the document even if it was truncated for reranking
+        """
+        return Document(
+            page_content=document.page_content,
+            metadata={
+                "doc_id": document.metadata['doc_id'],
+                "doc_hash": document.metadata['doc_hash'],
+                "document_id": document.metadata['document_id'],
+                "dataset_id": document.metadata['dataset_id'],
+                'score': score
+            }
+        )
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Truncate text to max tokens, gpt2 tokenizer works on bytes so a text never has more tokens than bytes
+        """
+        if max_tokens <= 0 or len(text.encode('utf-8')) <= max_tokens:
+            return text
+
+        encoder = GPT2Tokenizer.get_encoder()
+        tokens = encoder.encode(text, verbose=False)
+        if len(tokens) <= max_tokens:
+            return text
+
+        return encoder.decode(tokens[:max_tokens])
+
+    def _get_cache_key(self, query: str, doc: str) -> str:
+        # normalize whitespaces of the query so near-repeated questions share the cache
+        query_hash = hashlib.sha256(' '.join(query.split()).encode('utf-8')).hexdigest()
+        doc_hash = hashlib.sha256(doc.encode('utf-8')).hexdigest()
+        return (f"rerank_score:provider:{self.rerank_model_instance.provider}"
+                f":model:{self.rerank_model_instance.model}:query:{query_hash}:doc:{doc_hash}")
+
+    def _get_cached_scores(self, cache_keys: list[str]) -> list[Optional[float]]:
+        try:
+            cached_scores = redis_client.mget(cache_keys)
+        except Exception:
+            logger.exception('Failed to get cached rerank scores')
+            return [None] * len(cache_keys)
+
+        return [float(score) if score is not None else None for score in cached_scores]
+
+    def _set_cached_scores(self, scores: dict[str, float], cache_ttl: int) -> None:
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            for cache_key, score in scores.items():
+                pipeline.setex(cache_key, cache_ttl, score)
+            pipeline.execute()
+        except Exception:
+            logger.exception('Failed to cache rerank scores')
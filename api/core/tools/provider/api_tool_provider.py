@@ -11,6 +11,7 @@ from core.tools.entities.tool_entities import (
 from core.tools.provider.tool_provider import ToolProviderController
 from core.tools.tool.api_tool import ApiTool
 from core.tools.tool.tool import Tool
+from core.tools.utils.api_request_plan import ApiToolRequestPlanCache
 from extensions.ext_database import db
 from models.tools import ApiToolProvider
 
@@ -130,6 +131,7 @@ class ApiBasedToolProviderController(ToolProviderController):
                 'llm': tool_bundle.summary or ''
             },
             'parameters' : tool_bundle.parameters if tool_bundle.parameters else [],
+            'request_plan': ApiToolRequestPlanCache.get(tool_bundle),
         })
 
     def load_bundled_tools(self, tools: list[ApiBasedToolBundle]) -> list[ApiTool]:
@@ -269,6 +269,10 @@ class StableDiffusionTool(BuiltinTool):
         except Exception as e:
             return self.create_text_message('Failed to generate image')
 
+    def is_parallel_safe(self) -> bool:
+        # img2img reads image variables which may be produced by other tools of the same turn
+        return False
+
     def get_runtime_parameters(self) -> list[ToolParameter]:
         parameters = [
             ToolParameter(name='prompt',
@@ -73,4 +73,8 @@ class VectorizerTool(BuiltinTool):
         ]
     
     def is_tool_available(self) -> bool:
-        return len(self.list_default_image_variables()) > 0
\ No newline at end of file
+        return len(self.list_default_image_variables()) > 0
+
+    def is_parallel_safe(self) -> bool:
+        # reads image variables which may be produced by other tools of the same turn
+        return False
\ No newline at end of file
@@ -1,6 +1,6 @@
 import json
 from json import dumps
-from typing import Any, Union
+from typing import Any, Optional, Union
 from urllib.parse import urlencode
 
 import httpx
@@ -11,15 +11,20 @@ from core.tools.entities.tool_bundle import ApiBasedToolBundle
 from core.tools.entities.tool_entities import ToolInvokeMessage
 from core.tools.errors import ToolProviderCredentialValidationError
 from core.tools.tool.tool import Tool
+from core.tools.utils.api_request_plan import ApiToolRequestPlan, ApiToolRequestPlanCache
 
 API_TOOL_DEFAULT_TIMEOUT = (10, 60)
 
 class ApiTool(Tool):
     api_bundle: ApiBasedToolBundle
+    request_plan: Optional[ApiToolRequestPlan] = None
     
     """
     Api tool
     """
+    class Config:
+        arbitrary_types_allowed = True
+
     def fork_tool_runtime(self, meta: dict[str, Any]) -> 'Tool':
         """
             fork a new tool with meta data
@@ -32,9 +37,19 @@ class ApiTool(Tool):
             parameters=self.parameters.copy() if self.parameters else None,
             description=self.description.copy() if self.description else None,
             api_bundle=self.api_bundle.copy() if self.api_bundle else None,
+            request_plan=self.request_plan,
             runtime=Tool.Runtime(**meta)
         )
 
+    def get_request_plan(self) -> ApiToolRequestPlan:
+        """
+            get the compiled request plan of the api bundle
+        """
+        if self.request_plan is None:
+            self.request_plan = ApiToolRequestPlanCache.get(self.api_bundle)
+
+        return self.request_plan
+
     def validate_credentials(self, credentials: dict[str, Any], parameters: dict[str, Any], format_only: bool = False) -> str:
         """
             validate the credentials for Api tool
@@ -78,13 +93,9 @@ class ApiTool(Tool):
             
             headers[api_key_header] = credentials['api_key_value']
 
-        needed_parameters = [parameter for parameter in self.api_bundle.parameters if parameter.required]
-        for parameter in needed_parameters:
-            if parameter.required and parameter.name not in parameters:
-                raise ToolProviderCredentialValidationError(f"Missing required parameter {parameter.name}")
-            
-            if parameter.default is not None and parameter.name not in parameters:
-                parameters[parameter.name] = parameter.default
+        for name, default in self.get_request_plan().required_tool_parameters:
+            if name not in parameters:
+                raise ToolProviderCredentialValidationError(f"Missing required parameter {name}")
 
         return headers
 
@@ -132,70 +143,39 @@ class ApiTool(Tool):
         body = {}
         cookies = {}
 
-        # check parameters
-        for parameter in self.api_bundle.openapi.get('parameters', []):
-            if parameter['in'] == 'path':
-                value = ''
-                if parameter['name'] in parameters:
-                    value = parameters[parameter['name']]
-                elif parameter['required']:
-                    raise ToolProviderCredentialValidationError(f"Missing required parameter {parameter['name']}")
-                else:
-                    value = (parameter.get('schema', {}) or {}).get('default', '')
-                path_params[parameter['name']] = value
-
-            elif parameter['in'] == 'query':
-                value = ''
-                if parameter['name'] in parameters:
-                    value = parameters[parameter['name']]
-                elif parameter['required']:
-                    raise ToolProviderCredentialValidationError(f"Missing required parameter {parameter['name']}")
-                else:
-                    value = (parameter.get('schema', {}) or {}).get('default', '')
-                params[parameter['name']] = value
-
-            elif parameter['in'] == 'cookie':
-                value = ''
-                if parameter['name'] in parameters:
-                    value = parameters[parameter['name']]
-                elif parameter['required']:
-                    raise ToolProviderCredentialValidationError(f"Missing required parameter {parameter['name']}")
-                else:
-                    value = (parameter.get('schema', {}) or {}).get('default', '')
-                cookies[parameter['name']] = value
+        plan = self.get_request_plan()
+        locations = {
+            'path': path_params,
+            'query': params,
+            'cookie': cookies,
+            'header': headers,
+        }
 
-            elif parameter['in'] == 'header':
-                value = ''
-                if parameter['name'] in parameters:
-                    value = parameters[parameter['name']]
-                elif parameter['required']:
-                    raise ToolProviderCredentialValidationError(f"Missing required parameter {parameter['name']}")
-                else:
-                    value = (parameter.get('schema', {}) or {}).get('default', '')
-                headers[parameter['name']] = value
+        # check parameters
+        for parameter in plan.parameters:
+            if parameter.name in parameters:
+                value = parameters[parameter.name]
+            elif parameter.required:
+                raise ToolProviderCredentialValidationError(f"Missing required parameter {parameter.name}")
+            else:
+                value = parameter.default
+            locations[parameter.location][parameter.name] = value
 
         # check if there is a request body and handle it
-        if 'requestBody' in self.api_bundle.openapi and self.api_bundle.openapi['requestBody'] is not None:
-            # handle json request body
-            if 'content' in self.api_bundle.openapi['requestBody']:
-                for content_type in self.api_bundle.openapi['requestBody']['content']:
-                    headers['Content-Type'] = content_type
-                    body_schema = self.api_bundle.openapi['requestBody']['content'][content_type]['schema']
-                    required = body_schema['required'] if 'required' in body_schema else []
-                    properties = body_schema['properties'] if 'properties' in body_schema else {}
-                    for name, property in properties.items():
-                        if name in parameters:
-                            # convert type
-                            body[name] = self._convert_body_property_type(property, parameters[name])
-                        elif name in required:
-                            raise ToolProviderCredentialValidationError(
-                                f"Missing required parameter {name} in operation {self.api_bundle.operation_id}"
-                            )
-                        elif 'default' in property:
-                            body[name] = property['default']
-                        else:
-                            body[name] = None
-                    break
+        if plan.body_content_type is not None:
+            headers['Content-Type'] = plan.body_content_type
+            for property in plan.body_properties:
+                if property.name in parameters:
+                    # convert type
+                    body[property.name] = property.converter(parameters[property.name])
+                elif property.required:
+                    raise ToolProviderCredentialValidationError(
+                        f"Missing required parameter {property.name} in operation {self.api_bundle.operation_id}"
+                    )
+                elif property.has_default:
+                    body[property.name] = property.default
+                else:
+                    body[property.name] = None
         
         # replace path parameters
         for name, value in path_params.items():
@@ -230,66 +210,6 @@ class ApiTool(Tool):
         
         return response
     
-    def _convert_body_property_any_of(self, property: dict[str, Any], value: Any, any_of: list[dict[str, Any]], max_recursive=10) -> Any:
-        if max_recursive <= 0:
-            raise Exception("Max recursion depth reached")
-        for option in any_of or []:
-            try:
-                if 'type' in option:
-                    # Attempt to convert the value based on the type.
-                    if option['type'] == 'integer' or option['type'] == 'int':
-                        return int(value)
-                    elif option['type'] == 'number':
-                        if '.' in str(value):
-                            return float(value)
-                        else:
-                            return int(value)
-                    elif option['type'] == 'string':
-                        return str(value)
-                    elif option['type'] == 'boolean':
-                        if str(value).lower() in ['true', '1']:
-                            return True
-                        elif str(value).lower() in ['false', '0']:
-                            return False
-                        else:
-                            continue  # Not a boolean, try next option
-                    elif option['type'] == 'null' and not value:
-                        return None
-                    else:
-                        continue  # Unsupported type, try next option
-                elif 'anyOf' in option and isinstance(option['anyOf'], list):
-                    # Recursive call to handle nested anyOf
-                    return self._convert_body_property_any_of(property, value, option['anyOf'], max_recursive - 1)
-            except ValueError:
-                continue  # Conversion failed, try next option
-        # If no option succeeded, you might want to return the value as is or raise an error
-        return value  # or raise ValueError(f"Cannot convert value '{value}' to any specified type in anyOf")
-
-    def _convert_body_property_type(self, property: dict[str, Any], value: Any) -> Any:
-        try:
-            if 'type' in property:
-                if property['type'] == 'integer' or property['type'] == 'int':
-                    return int(value)
-                elif property['type'] == 'number':
-                    # check if it is a float
-                    if '.' in value:
-                        return float(value)
-                    else:
-                        return int(value)
-                elif property['type'] == 'string':
-                    return str(value)
-                elif property['type'] == 'boolean':
-                    return bool(value)
-                elif property['type'] == 'null':
-                    if value is None:
-                        return None
-                else:
-                    raise ValueError(f"Invalid type {property['type']} for property {property}")
-            elif 'anyOf' in property and isinstance(property['anyOf'], list):
-                return self._convert_body_property_any_of(property, value, property['anyOf'])
-        except ValueError as e:
-            return value
-
     def _invoke(self, user_id: str, tool_parameters: dict[str, Any]) -> ToolInvokeMessage | list[ToolInvokeMessage]:
         """
         invoke http request
@@ -95,3 +95,9 @@ class DatasetRetrieverTool(Tool):
         validate the credentials for dataset retriever tool
         """
         pass
+
+    def is_parallel_safe(self) -> bool:
+        """
+        dataset retriever publishes retriever resources through its hit callback, keep it in order
+        """
+        return False
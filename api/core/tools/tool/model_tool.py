@@ -79,6 +79,12 @@ class ModelTool(Tool):
         """
         pass
 
+    def is_parallel_safe(self) -> bool:
+        """
+            model tools read image variables which may be produced by other tools of the same turn
+        """
+        return False
+
     def _invoke(self, user_id: str, tool_parameters: dict[str, Any]) -> ToolInvokeMessage | list[ToolInvokeMessage]:
         """
         """
@@ -308,6 +308,15 @@ class Tool(BaseModel, ABC):
         """
         return True
 
+    def is_parallel_safe(self) -> bool:
+        """
+            check if the tool can be invoked concurrently with other tools of the same agent turn,
+            tools which depend on the runtime variables or publish events by themselves should return False
+
+            :return: if the tool is parallel safe
+        """
+        return True
+
     def create_image_message(self, image: str, save_as: str = '') -> ToolInvokeMessage:
         """
             create an image message
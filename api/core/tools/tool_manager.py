@@ -7,6 +7,7 @@ from typing import Any, Union
 
 from core.callback_handler.agent_tool_callback_handler import DifyAgentCallbackHandler
 from core.entities.application_entities import AgentToolEntity
+from core.helper.tool_runtime_cache import ToolRuntimeCache
 from core.model_runtime.entities.message_entities import PromptMessage
 from core.provider_manager import ProviderManager
 from core.tools.entities.common_entities import I18nObject
@@ -171,21 +172,27 @@ class ToolManager:
                     'credentials': {},
                 }, agent_callback=agent_callback)
 
-            # get credentials
-            builtin_provider: BuiltinToolProvider = db.session.query(BuiltinToolProvider).filter(
-                BuiltinToolProvider.tenant_id == tenant_id,
-                BuiltinToolProvider.provider == provider_name,
-            ).first()
+            cache = ToolRuntimeCache(tenant_id=tenant_id, provider_type=provider_type, provider_id=provider_name)
+            cached_runtime = cache.get()
+            if cached_runtime:
+                # runtimes may modify their credentials, never share the cached dict
+                decrypted_credentials = dict(cached_runtime.credentials)
+            else:
+                # get credentials
+                builtin_provider: BuiltinToolProvider = db.session.query(BuiltinToolProvider).filter(
+                    BuiltinToolProvider.tenant_id == tenant_id,
+                    BuiltinToolProvider.provider == provider_name,
+                ).first()
 
-            if builtin_provider is None:
-                raise ToolProviderNotFoundError(f'builtin provider {provider_name} not found')
-            
-            # decrypt the credentials
-            credentials = builtin_provider.credentials
-            controller = ToolManager.get_builtin_provider(provider_name)
-            tool_configuration = ToolConfigurationManager(tenant_id=tenant_id, provider_controller=controller)
+                if builtin_provider is None:
+                    raise ToolProviderNotFoundError(f'builtin provider {provider_name} not found')
 
-            decrypted_credentials = tool_configuration.decrypt_tool_credentials(credentials)
+                # decrypt the credentials
+                credentials = builtin_provider.credentials
+                tool_configuration = ToolConfigurationManager(tenant_id=tenant_id, provider_controller=provider_controller)
+
+                decrypted_credentials = tool_configuration.decrypt_tool_credentials(credentials)
+                cache.set(provider_controller, decrypted_credentials)
 
             return builtin_tool.fork_tool_runtime(meta={
                 'tenant_id': tenant_id,
@@ -197,11 +204,19 @@ class ToolManager:
             if tenant_id is None:
                 raise ValueError('tenant id is required for api provider')
             
-            api_provider, credentials = ToolManager.get_api_provider_controller(tenant_id, provider_name)
-
-            # decrypt the credentials
-            tool_configuration = ToolConfigurationManager(tenant_id=tenant_id, provider_controller=api_provider)
-            decrypted_credentials = tool_configuration.decrypt_tool_credentials(credentials)
+            cache = ToolRuntimeCache(tenant_id=tenant_id, provider_type=provider_type, provider_id=provider_name)
+            cached_runtime = cache.get()
+            if cached_runtime:
+                api_provider = cached_runtime.provider_controller
+                # runtimes may modify their credentials, never share the cached dict
+                decrypted_credentials = dict(cached_runtime.credentials)
+            else:
+                api_provider, credentials = ToolManager.get_api_provider_controller(tenant_id, provider_name)
+
+                # decrypt the credentials
+                tool_configuration = ToolConfigurationManager(tenant_id=tenant_id, provider_controller=api_provider)
+                decrypted_credentials = tool_configuration.decrypt_tool_credentials(credentials)
+                cache.set(api_provider, decrypted_credentials)
 
             return api_provider.get_tool(tool_name).fork_tool_runtime(meta={
                 'tenant_id': tenant_id,
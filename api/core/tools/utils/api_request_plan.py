@@ -0,0 +1,231 @@
+import hashlib
+import json
+import threading
+from collections.abc import Callable
+from typing import Any, Optional
+
+from core.helper.lru_cache import LRUCache
+from core.tools.entities.tool_bundle import ApiBasedToolBundle
+
+PropertyConverter = Callable[[Any], Any]
+
+
+class ApiToolRequestParameter:
+    """
+    A parameter of an openapi operation which is located in path, query, cookie or header
+    """
+    __slots__ = ('location', 'name', 'required', 'default')
+
+    def __init__(self, location: str, name: str, required: bool, default: Any):
+        self.location = location
+        self.name = name
+        self.required = required
+        self.default = default
+
+
+class ApiToolRequestBodyProperty:
+    """
+    A property of the request body of an openapi operation
+    """
+    __slots__ = ('name', 'converter', 'required', 'has_default', 'default')
+
+    def __init__(self, name: str, converter: PropertyConverter, required: bool, has_default: bool, default: Any):
+        self.name = name
+        self.converter = converter
+        self.required = required
+        self.has_default = has_default
+        self.default = default
+
+
+class ApiToolRequestPlan:
+    """
+    Precompiled request layout of an openapi operation, compiled once per operation schema
+    and shared by all the invocations of api tools with the same schema.
+    """
+    def __init__(self, fingerprint: str,
+                 required_tool_parameters: list[tuple[str, Any]],
+                 parameters: list[ApiToolRequestParameter],
+                 body_content_type: Optional[str],
+                 body_properties: list[ApiToolRequestBodyProperty]):
+        self.fingerprint = fingerprint
+        # (name, default) of the required tool parameters
+        self.required_tool_parameters = required_tool_parameters
+        self.parameters = parameters
+        self.body_content_type = body_content_type
+        self.body_properties = body_properties
+
+    @classmethod
+    def compile(cls, api_bundle: ApiBasedToolBundle, fingerprint: str = None) -> 'ApiToolRequestPlan':
+        """
+        compile the request plan of an api bundle
+
+        :param api_bundle: the api bundle
+        :param fingerprint: the fingerprint of the api bundle
+        :return: the request plan
+        """
+        required_tool_parameters = [
+            (parameter.name, parameter.default) for parameter in api_bundle.parameters or [] if parameter.required
+        ]
+
+        parameters = []
+        for parameter in api_bundle.openapi.get('parameters', []):
+            if parameter['in'] not in ['path', 'query', 'cookie', 'header']:
+                continue
+            parameters.append(ApiToolRequestParameter(
+                location=parameter['in'],
+                name=parameter['name'],
+                required=parameter.get('required', False),
+                default=(parameter.get('schema', {}) or {}).get('default', '')
+            ))
+
+        body_content_type = None
+        body_properties = []
+        request_body = api_bundle.openapi.get('requestBody')
+        if request_body is not None and 'content' in request_body:
+            # only the first content type is used
+            for content_type in request_body['content']:
+                body_content_type = content_type
+                body_schema = request_body['content'][content_type]['schema']
+                required = body_schema['required'] if 'required' in body_schema else []
+                properties = body_schema['properties'] if 'properties' in body_schema else {}
+                for name, property in properties.items():
+                    body_properties.append(ApiToolRequestBodyProperty(
+                        name=name,
+                        converter=compile_property_converter(property),
+                        required=name in required,
+                        has_default='default' in property,
+                        default=property.get('default')
+                    ))
+                break
+
+        return cls(
+            fingerprint=fingerprint or get_api_bundle_fingerprint(api_bundle),
+            required_tool_parameters=required_tool_parameters,
+            parameters=parameters,
+            body_content_type=body_content_type,
+            body_properties=body_properties
+        )
+
+
+def get_api_bundle_fingerprint(api_bundle: ApiBasedToolBundle) -> str:
+    """
+    get the fingerprint of the parts of an api bundle which decide its request plan
+    """
+    content = json.dumps({
+        'openapi': api_bundle.openapi,
+        'parameters': [
+            (parameter.name, parameter.required, parameter.default) for parameter in api_bundle.parameters or []
+        ],
+    }, sort_keys=True, default=str)
+
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def compile_property_converter(property: dict[str, Any]) -> PropertyConverter:
+    """
+    compile the converter of a request body property, which converts the value given by LLM
+    into the type declared in the schema
+    """
+    if 'type' in property:
+        property_type = property['type']
+        if property_type == 'integer' or property_type == 'int':
+            return _lenient(int)
+        elif property_type == 'number':
+            return _lenient(_to_number)
+        elif property_type == 'string':
+            return str
+        elif property_type == 'boolean':
+            return bool
+        elif property_type == 'null':
+            return lambda value: None
+        else:
+            # unsupported type, keep the value as is
+            return lambda value: value
+    elif 'anyOf' in property and isinstance(property['anyOf'], list):
+        return _compile_any_of_converter(property['anyOf'])
+
+    return lambda value: None
+
+
+def _compile_any_of_converter(any_of: list[dict[str, Any]], max_recursive=10) -> PropertyConverter:
+    if max_recursive <= 0:
+        def _max_recursion_reached(value: Any) -> Any:
+            raise Exception("Max recursion depth reached")
+        return _max_recursion_reached
+
+    options: list[tuple[str, Any]] = []
+    for option in any_of or []:
+        if 'type' in option:
+            options.append(('type', option['type']))
+        elif 'anyOf' in option and isinstance(option['anyOf'], list):
+            options.append(('anyOf', _compile_any_of_converter(option['anyOf'], max_recursive - 1)))
+
+    def _convert(value: Any) -> Any:
+        for kind, option in options:
+            try:
+                if kind == 'anyOf':
+                    # nested anyOf decides the result
+                    return option(value)
+                if option == 'integer' or option == 'int':
+                    return int(value)
+                elif option == 'number':
+                    return _to_number(value)
+                elif option == 'string':
+                    return str(value)
+                elif option == 'boolean':
+                    if str(value).lower() in ['true', '1']:
+                        return True
+                    elif str(value).lower() in ['false', '0']:
+                        return False
+                elif option == 'null' and not value:
+                    return None
+            except ValueError:
+                continue
+        # no option succeeded, return the value as is
+        return value
+
+    return _convert
+
+
+def _to_number(value: Any) -> Any:
+    if '.' in str(value):
+        return float(value)
+    return int(value)
+
+
+def _lenient(converter: PropertyConverter) -> PropertyConverter:
+    def _convert(value: Any) -> Any:
+        try:
+            return converter(value)
+        except ValueError:
+            return value
+    return _convert
+
+
+class ApiToolRequestPlanCache:
+    """
+    Process level cache of compiled request plans, keyed by the fingerprint of the operation schema
+    so plans are shared across providers and tenants with the same schema
+    """
+    _cache = LRUCache(capacity=1024)
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, api_bundle: ApiBasedToolBundle) -> ApiToolRequestPlan:
+        """
+        get or compile the request plan of an api bundle
+
+        :param api_bundle: the api bundle
+        :return: the request plan
+        """
+        fingerprint = get_api_bundle_fingerprint(api_bundle)
+        with cls._lock:
+            plan = cls._cache.get(fingerprint)
+        if plan is not None:
+            return plan
+
+        plan = ApiToolRequestPlan.compile(api_bundle, fingerprint=fingerprint)
+        with cls._lock:
+            cls._cache.put(fingerprint, plan)
+
+        return plan
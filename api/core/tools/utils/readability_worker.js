@@ -0,0 +1,59 @@
+// Long-lived readability worker, reads one JSON request per line from stdin
+// and writes one JSON response per line to stdout.
+//
+// usage: node readability_worker.js <readabilipy javascript dir>
+//
+// request:  {"html": "<html>...</html>"}
+// response: {"article": {...}} or {"error": "..."}
+
+var path = require("path");
+var fs = require("fs");
+var url = require("url");
+var vm = require("vm");
+var readline = require("readline");
+
+var jsDir = process.argv[2];
+var JSDOM = require(path.join(jsDir, "node_modules", "jsdom")).JSDOM;
+
+// Readability is not a commonjs library, load it in a separate scope the same way as ExtractArticle.js,
+// stdout is reserved for responses so any log of Readability goes to stderr
+var readabilityPath = path.join(jsDir, "Readability.js");
+var stderrConsole = new console.Console(process.stderr, process.stderr);
+var scopeContext = {
+  dump: stderrConsole.log,
+  console: stderrConsole,
+  URL: url.URL,
+  JSDOM: JSDOM,
+};
+vm.runInNewContext(fs.readFileSync(readabilityPath), scopeContext, readabilityPath);
+
+function respond(response) {
+  process.stdout.write(JSON.stringify(response) + "\n");
+}
+
+var rl = readline.createInterface({ input: process.stdin, terminal: false });
+
+rl.on("line", function (line) {
+  if (!line) {
+    return;
+  }
+
+  var dom = null;
+  try {
+    var request = JSON.parse(line);
+    dom = new JSDOM((request.html || "").trim());
+    var article = new scopeContext.Readability(dom.window.document).parse();
+    respond({ article: article });
+  } catch (e) {
+    respond({ error: String(e) });
+  } finally {
+    if (dom) {
+      // release the resources held by the document
+      dom.window.close();
+    }
+  }
+});
+
+rl.on("close", function () {
+  process.exit(0);
+});
@@ -0,0 +1,157 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import subprocess
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+READABILITY_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'readability_worker.js')
+# max number of node processes per api process
+READABILITY_WORKER_POOL_SIZE = 2
+# recycle a node process after it handled this many pages to bound its memory
+READABILITY_WORKER_MAX_REQUESTS = 200
+READABILITY_WORKER_TIMEOUT = 30
+
+
+class ReadabilityWorkerError(Exception):
+    pass
+
+
+class ReadabilityWorker:
+    """
+    A long-lived node process running Readability.js, talking line delimited JSON over stdin/stdout
+    """
+    def __init__(self, js_dir: str):
+        self.process = subprocess.Popen(
+            ['node', READABILITY_WORKER_SCRIPT, js_dir],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding='utf-8',
+            bufsize=1,
+        )
+        self.request_count = 0
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def extract(self, html: str, timeout: float) -> Optional[dict]:
+        """
+        Extract article from html
+
+        :param html: html
+        :param timeout: seconds to wait for the article
+        :return: the article parsed by Readability.js, None if there is no article
+        """
+        self.request_count += 1
+        # kill the process if it hangs, which also unblocks the pending readline
+        timer = threading.Timer(timeout, self.close)
+        timer.start()
+        try:
+            self.process.stdin.write(json.dumps({'html': html}) + '\n')
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise ReadabilityWorkerError(f'readability worker is not available: {e}')
+        finally:
+            timer.cancel()
+
+        if not line:
+            raise ReadabilityWorkerError('readability worker exited unexpectedly')
+
+        response = json.loads(line)
+        if 'error' in response:
+            raise ReadabilityWorkerError(response['error'])
+
+        return response.get('article')
+
+    def close(self) -> None:
+        if self.is_alive:
+            self.process.kill()
+
+
+class ReadabilityWorkerPool:
+    """
+    Bounded pool of readability workers, workers are spawned lazily and reused across pages
+    """
+    def __init__(self, js_dir: str, size: int = READABILITY_WORKER_POOL_SIZE):
+        self.js_dir = js_dir
+        self._idle_workers: queue.LifoQueue[ReadabilityWorker] = queue.LifoQueue()
+        self._all_workers: list[ReadabilityWorker] = []
+        self._semaphore = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def extract(self, html: str, timeout: float = READABILITY_WORKER_TIMEOUT) -> Optional[dict]:
+        """
+        Extract article from html with an idle worker, waits if all the workers are busy
+
+        :param html: html
+        :param timeout: seconds to wait for the article
+        :return: the article parsed by Readability.js
+        """
+        with self._semaphore:
+            worker = self._acquire()
+            try:
+                article = worker.extract(html, timeout)
+            except Exception:
+                self._discard(worker)
+                raise
+
+            self._release(worker)
+            return article
+
+    def _acquire(self) -> ReadabilityWorker:
+        while True:
+            try:
+                worker = self._idle_workers.get_nowait()
+            except queue.Empty:
+                worker = ReadabilityWorker(self.js_dir)
+                with self._lock:
+                    self._all_workers.append(worker)
+                return worker
+
+            if worker.is_alive:
+                return worker
+            self._discard(worker)
+
+    def _release(self, worker: ReadabilityWorker) -> None:
+        if worker.request_count >= READABILITY_WORKER_MAX_REQUESTS:
+            self._discard(worker)
+        else:
+            self._idle_workers.put(worker)
+
+    def _discard(self, worker: ReadabilityWorker) -> None:
+        worker.close()
+        with self._lock:
+            if worker in self._all_workers:
+                self._all_workers.remove(worker)
+
+    def close(self) -> None:
+        with self._lock:
+            workers = self._all_workers
+            self._all_workers = []
+        for worker in workers:
+            worker.close()
+
+
+_pool: Optional[ReadabilityWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_readability_worker_pool(js_dir: str) -> ReadabilityWorkerPool:
+    """
+    Get the process wide readability worker pool
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ReadabilityWorkerPool(js_dir)
+                atexit.register(_pool.close)
+
+    return _pool
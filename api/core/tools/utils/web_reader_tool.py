@@ -1,5 +1,6 @@
 import hashlib
 import json
+import logging
 import os
 import re
 import site
@@ -15,6 +16,13 @@ from regex import regex
 
 from core.rag.extractor import extract_processor
 from core.rag.extractor.extract_processor import ExtractProcessor
+from core.tools.utils.readability_worker import get_readability_worker_pool
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# extracted pages are cached by url and ETag, the ETag is revalidated by the HEAD request of each read
+WEB_READER_CACHE_TTL = 86400
 
 FULL_TEMPLATE = """
 TITLE: {title}
@@ -42,20 +50,29 @@ def get_url(url: str, user_agent: str = None) -> str:
     
     supported_content_types = extract_processor.SUPPORT_URL_CONTENT_TYPES + ["text/html"]
 
-    head_response = requests.head(url, headers=headers, allow_redirects=True, timeout=(5, 10))
+    # share the connection between HEAD and GET
+    with requests.Session() as session:
+        head_response = session.head(url, headers=headers, allow_redirects=True, timeout=(5, 10))
+
+        if head_response.status_code != 200:
+            return "URL returned status code {}.".format(head_response.status_code)
+
+        # check content-type
+        main_content_type = head_response.headers.get('Content-Type').split(';')[0].strip()
+        if main_content_type not in supported_content_types:
+            return "Unsupported content-type [{}] of URL.".format(main_content_type)
 
-    if head_response.status_code != 200:
-        return "URL returned status code {}.".format(head_response.status_code)
+        if main_content_type in extract_processor.SUPPORT_URL_CONTENT_TYPES:
+            return ExtractProcessor.load_from_url(url, return_text=True)
 
-    # check content-type
-    main_content_type = head_response.headers.get('Content-Type').split(';')[0].strip()
-    if main_content_type not in supported_content_types:
-        return "Unsupported content-type [{}] of URL.".format(main_content_type)
+        cache_key = _get_cache_key(url, head_response.headers.get('ETag'))
+        if cache_key:
+            cached_result = redis_client.get(cache_key)
+            if cached_result:
+                return cached_result.decode('utf-8')
 
-    if main_content_type in extract_processor.SUPPORT_URL_CONTENT_TYPES:
-        return ExtractProcessor.load_from_url(url, return_text=True)
+        response = session.get(url, headers=headers, allow_redirects=True, timeout=(5, 30))
 
-    response = requests.get(url, headers=headers, allow_redirects=True, timeout=(5, 30))
     a = extract_using_readabilipy(response.text)
 
     if not a['plain_text'] or not a['plain_text'].strip():
@@ -69,9 +86,23 @@ def get_url(url: str, user_agent: str = None) -> str:
         text=a['plain_text'] if a['plain_text'] else "",
     )
 
+    if cache_key:
+        redis_client.setex(cache_key, WEB_READER_CACHE_TTL, res)
+
     return res
 
 
+def _get_cache_key(url: str, etag: str) -> str:
+    """Get the cache key of an extracted page, pages without ETag are not cached."""
+    if not etag:
+        return None
+
+    return 'web_reader:{}:{}'.format(
+        hashlib.sha256(url.encode('utf-8')).hexdigest(),
+        hashlib.sha256(etag.encode('utf-8')).hexdigest()
+    )
+
+
 def get_url_from_newspaper3k(url: str) -> str:
 
     a = Article(url)
@@ -90,6 +121,17 @@ def get_url_from_newspaper3k(url: str) -> str:
 
 
 def extract_using_readabilipy(html):
+    jsdir = os.path.join(find_module_path('readabilipy'), 'javascript')
+    try:
+        input_json = get_readability_worker_pool(jsdir).extract(html)
+    except Exception as e:
+        logger.warning(f'readability worker failed, fallback to a one-off node process: {e}')
+        input_json = extract_using_readabilipy_process(html)
+
+    return parse_readability_article(input_json)
+
+
+def extract_using_readabilipy_process(html):
     with tempfile.NamedTemporaryFile(delete=False, mode='w+') as f_html:
         f_html.write(html)
         f_html.close()
@@ -109,6 +151,10 @@ def extract_using_readabilipy(html):
     os.unlink(article_json_path)
     os.unlink(html_path)
 
+    return input_json
+
+
+def parse_readability_article(input_json):
     article_json = {
         "title": None,
         "byline": None,
@@ -1,8 +1,9 @@
 from core.entities.application_entities import ApplicationGenerateEntity
 from core.entities.provider_entities import QuotaUnit
+from core.helper.background_task_queue import message_side_effect_queue
+from core.helper.provider_quota_ledger import ProviderQuotaLedger
 from events.message_event import message_was_created
-from extensions.ext_database import db
-from models.provider import Provider, ProviderType
+from models.provider import ProviderType
 
 
 @message_was_created.connect
@@ -42,11 +43,18 @@ def handle(sender, **kwargs):
             used_quota = 1
 
     if used_quota is not None:
-        db.session.query(Provider).filter(
-            Provider.tenant_id == application_generate_entity.tenant_id,
-            Provider.provider_name == model_config.provider,
-            Provider.provider_type == ProviderType.SYSTEM.value,
-            Provider.quota_type == system_configuration.current_quota_type.value,
-            Provider.quota_limit > Provider.quota_used
-        ).update({'quota_used': Provider.quota_used + used_quota})
-        db.session.commit()
+        message_side_effect_queue.submit(
+            deduct_quota,
+            tenant_id=application_generate_entity.tenant_id,
+            provider_name=model_config.provider,
+            quota_type=system_configuration.current_quota_type.value,
+            used_quota=used_quota
+        )
+
+
+def deduct_quota(tenant_id: str, provider_name: str, quota_type: str, used_quota: int) -> None:
+    ProviderQuotaLedger(
+        tenant_id=tenant_id,
+        provider_name=provider_name,
+        quota_type=quota_type
+    ).deduct(used_quota)
@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from core.entities.application_entities import ApplicationGenerateEntity
+from core.helper.background_task_queue import message_side_effect_queue
 from events.message_event import message_was_created
 from extensions.ext_database import db
 from models.provider import Provider
@@ -11,8 +12,18 @@ def handle(sender, **kwargs):
     message = sender
     application_generate_entity: ApplicationGenerateEntity = kwargs.get('application_generate_entity')
 
+    message_side_effect_queue.submit(
+        update_provider_last_used_at,
+        tenant_id=application_generate_entity.tenant_id,
+        provider_name=application_generate_entity.app_orchestration_config_entity.model_config.provider,
+        last_used=datetime.utcnow()
+    )
+
+
+def update_provider_last_used_at(tenant_id: str, provider_name: str, last_used: datetime) -> None:
     db.session.query(Provider).filter(
-        Provider.tenant_id == application_generate_entity.tenant_id,
-        Provider.provider_name == application_generate_entity.app_orchestration_config_entity.model_config.provider
-    ).update({'last_used': datetime.utcnow()})
+        Provider.tenant_id == tenant_id,
+        Provider.provider_name == provider_name,
+        db.or_(Provider.last_used.is_(None), Provider.last_used < last_used)
+    ).update({'last_used': last_used}, synchronize_session=False)
     db.session.commit()
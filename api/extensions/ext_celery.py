@@ -41,6 +41,8 @@ def init_app(app: Flask) -> Celery:
     imports = [
         "schedule.clean_embedding_cache_task",
         "schedule.clean_unused_datasets_task",
+        "schedule.reconcile_provider_quota_task",
+        "schedule.update_app_statistic_task",
     ]
 
     beat_schedule = {
@@ -51,6 +53,14 @@ def init_app(app: Flask) -> Celery:
         'clean_unused_datasets_task': {
             'task': 'schedule.clean_unused_datasets_task.clean_unused_datasets_task',
             'schedule': timedelta(days=7),
+        },
+        'reconcile_provider_quota_task': {
+            'task': 'schedule.reconcile_provider_quota_task.reconcile_provider_quota_task',
+            'schedule': timedelta(minutes=1),
+        },
+        'update_app_statistic_task': {
+            'task': 'schedule.update_app_statistic_task.update_app_statistic_task',
+            'schedule': timedelta(minutes=5),
         }
     }
     celery_app.conf.update(
@@ -0,0 +1,71 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, or_
+from werkzeug.exceptions import BadRequest
+
+from extensions.ext_database import db
+
+
+class KeysetPagination:
+    """
+    Page of a keyset pagination on (created_at, id), newest first.
+
+    The attributes match the ones of the offset pagination, so the same marshal fields can be used,
+    `page` and `total` are always None since rows are neither skipped nor counted.
+    """
+    def __init__(self, items: list, per_page: int, has_next: bool, next_cursor: Optional[str]):
+        self.items = items
+        self.per_page = per_page
+        self.has_next = has_next
+        self.next_cursor = next_cursor
+        self.page = None
+        self.total = None
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    return base64.urlsafe_b64encode(f'{created_at.isoformat()}|{id}'.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Decode a cursor returned by a previous page.
+
+    :param cursor: cursor
+    :return: created_at and id of the last row of the previous page
+    """
+    try:
+        created_at, id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(created_at), str(uuid.UUID(id))
+    except ValueError:
+        raise BadRequest('Invalid cursor.')
+
+
+def keyset_paginate(query, model, cursor: Optional[str], limit: int) -> KeysetPagination:
+    """
+    Paginate a select of the model by (created_at, id) descending, starting after the cursor.
+
+    :param query: select of the model, without order, with a single row per model,
+                  joins which return several rows of a model would take several rows of the page
+    :param model: model with created_at and id columns
+    :param cursor: cursor of the previous page, None for the first page
+    :param limit: page size
+    :return:
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.where(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < id)
+        ))
+
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    items = db.session.scalars(query).unique().all()
+
+    has_next = len(items) > limit
+    items = items[:limit]
+    next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if has_next else None
+
+    return KeysetPagination(items=items, per_page=limit, has_next=has_next, next_cursor=next_cursor)
@@ -0,0 +1,87 @@
+"""add message search vector
+
+Revision ID: e5a7c2d9b4f1
+Revises: d1b4e3f2a7c9
+Create Date: 2024-03-12 16:40:08.518291
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c2d9b4f1'
+down_revision = 'd1b4e3f2a7c9'
+branch_labels = None
+depends_on = None
+
+# hiragana, katakana, cjk ideographs and hangul are not separated by spaces,
+# such runs are indexed as overlapping bigrams plus their last character
+CJK_CHARACTERS = r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+'
+
+
+def upgrade():
+    op.execute(f"""
+CREATE OR REPLACE FUNCTION search_text_with_cjk_bigrams(content text) RETURNS text AS $$
+    SELECT regexp_replace(content, '{CJK_CHARACTERS}', ' ', 'g') || ' ' || coalesce((
+        SELECT string_agg(
+            (SELECT string_agg(substr(run, i, 2), ' ') FROM generate_series(1, greatest(length(run) - 1, 1)) AS i)
+            || ' ' || right(run, 1), ' ')
+        FROM (SELECT (regexp_matches(content, '{CJK_CHARACTERS}', 'g'))[1] AS run) AS runs
+    ), '')
+$$ LANGUAGE sql IMMUTABLE;
+""")
+
+    op.execute("""
+CREATE OR REPLACE FUNCTION message_search_vector(query text, answer text) RETURNS tsvector AS $$
+    SELECT to_tsvector('simple', search_text_with_cjk_bigrams(coalesce(query, '') || ' ' || coalesce(answer, '')))
+$$ LANGUAGE sql IMMUTABLE;
+""")
+
+    # every word of the keyword must match, latin words match as prefix
+    op.execute("""
+CREATE OR REPLACE FUNCTION message_search_query(keyword text) RETURNS tsquery AS $$
+    SELECT coalesce(to_tsquery('simple', string_agg(quote_literal(lexeme) || ':*', ' & ')), ''::tsquery)
+        FROM unnest(to_tsvector('simple', search_text_with_cjk_bigrams(keyword)))
+$$ LANGUAGE sql IMMUTABLE;
+""")
+
+    op.execute("""
+CREATE OR REPLACE FUNCTION messages_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := message_search_vector(NEW.query, NEW.answer);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+""")
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    op.execute("""
+CREATE TRIGGER messages_search_vector_update BEFORE INSERT OR UPDATE OF query, answer ON messages
+    FOR EACH ROW EXECUTE PROCEDURE messages_search_vector_trigger();
+""")
+
+    # existing messages are backfilled outside of the migration transaction,
+    # by the backfill-message-search-vector command, until then they are searched by ILIKE
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index('message_search_vector_idx', ['search_vector'], unique=False, postgresql_using='gin')
+        batch_op.create_index('message_search_vector_pending_idx', ['app_id'], unique=False,
+                              postgresql_where=sa.text('search_vector IS NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('message_search_vector_pending_idx', postgresql_where=sa.text('search_vector IS NULL'))
+        batch_op.drop_index('message_search_vector_idx', postgresql_using='gin')
+
+    op.execute('DROP TRIGGER IF EXISTS messages_search_vector_update ON messages;')
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_column('search_vector')
+
+    op.execute('DROP FUNCTION IF EXISTS messages_search_vector_trigger();')
+    op.execute('DROP FUNCTION IF EXISTS message_search_query(text);')
+    op.execute('DROP FUNCTION IF EXISTS message_search_vector(text, text);')
+    op.execute('DROP FUNCTION IF EXISTS search_text_with_cjk_bigrams(text);')
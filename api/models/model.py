@@ -1,19 +1,114 @@
+import functools
 import json
 import uuid
+from collections import defaultdict
+from datetime import datetime
 
-from flask import current_app, request
+from flask import current_app, g, has_app_context, request
 from flask_login import UserMixin
-from sqlalchemy import Float, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Float, func, inspect, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 
 from core.file.tool_file_parser import ToolFileParser
 from core.file.upload_file_parser import UploadFileParser
+from core.helper.app_model_config_cache import AppModelConfigCache
 from extensions.ext_database import db
 from libs.helper import generate_string
 
 from .account import Account, Tenant
 
 
+def prefetched_property(getter):
+    """
+    Property which returns the value prefetched by a batch loader if there is one,
+    otherwise it is queried lazily by the getter.
+    """
+    name = getter.__name__
+
+    @functools.wraps(getter)
+    def wrapper(self):
+        prefetched = self.__dict__.get('_prefetched')
+        if prefetched is not None and name in prefetched:
+            return prefetched[name]
+
+        return getter(self)
+
+    return property(wrapper)
+
+
+def set_prefetched(instance, name: str, value) -> None:
+    instance.__dict__.setdefault('_prefetched', {})[name] = value
+
+
+def _preload_accounts(records: list, account_id_attribute: str, attributes: list[str]) -> None:
+    account_ids = {getattr(record, account_id_attribute) for record in records}
+    account_ids.discard(None)
+    accounts = {
+        account.id: account
+        for account in db.session.query(Account).filter(Account.id.in_(account_ids))
+    } if account_ids else {}
+
+    for record in records:
+        for attribute in attributes:
+            set_prefetched(record, attribute, accounts.get(getattr(record, account_id_attribute)))
+
+
+def _request_cached(model, key: tuple, loader):
+    """
+    Get a record from the identity cache of the current app context, loading it on a miss.
+
+    An app context lives as long as a request, a generate thread or a celery task,
+    records which are not found are not cached so they can still be created later on,
+    and records detached by closing the session are loaded again.
+    """
+    if not has_app_context():
+        return loader()
+
+    cache = g.setdefault('_model_identity_cache', {})
+    cache_key = (model.__tablename__, *key)
+    record = cache.get(cache_key)
+    if record is not None and not inspect(record).detached:
+        return record
+
+    record = loader()
+    if record is not None:
+        cache[cache_key] = record
+
+    return record
+
+
+def _get_by_id(model, id):
+    if not id:
+        return None
+
+    return _request_cached(model, ('id', id), lambda: db.session.get(model, id))
+
+
+def _get_app_model_config(app_model_config_id):
+    """
+    Get app model config by id, the configs are also cached in redis across the requests.
+
+    A config read from redis is not attached to the session, it must not be modified.
+    """
+    if not app_model_config_id:
+        return None
+
+    def load():
+        app_model_config_cache = AppModelConfigCache(app_model_config_id)
+        cached_app_model_config = app_model_config_cache.get()
+        if cached_app_model_config:
+            return AppModelConfig.from_cache_dict(cached_app_model_config)
+
+        app_model_config = db.session.get(AppModelConfig, app_model_config_id)
+        if app_model_config:
+            app_model_config_cache.set(app_model_config.to_cache_dict())
+
+        return app_model_config
+
+    return _request_cached(AppModelConfig, ('id', app_model_config_id), load)
+
+
 class DifySetup(db.Model):
     __tablename__ = 'dify_setups'
     __table_args__ = (
@@ -51,13 +146,13 @@ class App(db.Model):
 
     @property
     def site(self):
-        site = db.session.query(Site).filter(Site.app_id == self.id).first()
+        site = _request_cached(Site, ('app_id', self.id),
+                               lambda: db.session.query(Site).filter(Site.app_id == self.id).first())
         return site
 
     @property
     def app_model_config(self):
-        app_model_config = db.session.query(AppModelConfig).filter(
-            AppModelConfig.id == self.app_model_config_id).first()
+        app_model_config = _get_app_model_config(self.app_model_config_id)
         return app_model_config
 
     @property
@@ -67,7 +162,7 @@ class App(db.Model):
 
     @property
     def tenant(self):
-        tenant = db.session.query(Tenant).filter(Tenant.id == self.tenant_id).first()
+        tenant = _get_by_id(Tenant, self.tenant_id)
         return tenant
     
     @property
@@ -165,7 +260,7 @@ class AppModelConfig(db.Model):
 
     @property
     def app(self):
-        app = db.session.query(App).filter(App.id == self.app_id).first()
+        app = _get_by_id(App, self.app_id)
         return app
 
     @property
@@ -198,8 +293,10 @@ class AppModelConfig(db.Model):
 
     @property
     def annotation_reply_dict(self) -> dict:
-        annotation_setting = db.session.query(AppAnnotationSetting).filter(
-            AppAnnotationSetting.app_id == self.app_id).first()
+        annotation_setting = _request_cached(
+            AppAnnotationSetting, ('app_id', self.app_id),
+            lambda: db.session.query(AppAnnotationSetting).filter(AppAnnotationSetting.app_id == self.app_id).first()
+        )
         if annotation_setting:
             collection_binding_detail = annotation_setting.collection_binding_detail
             return {
@@ -322,6 +419,19 @@ class AppModelConfig(db.Model):
             if model_config.get('file_upload') else None
         return self
 
+    def to_cache_dict(self) -> dict:
+        cache_dict = {column.key: getattr(self, column.key) for column in self.__table__.columns}
+        cache_dict['created_at'] = self.created_at.isoformat()
+        cache_dict['updated_at'] = self.updated_at.isoformat()
+        return cache_dict
+
+    @classmethod
+    def from_cache_dict(cls, cache_dict: dict) -> 'AppModelConfig':
+        cache_dict = dict(cache_dict)
+        cache_dict['created_at'] = datetime.fromisoformat(cache_dict['created_at'])
+        cache_dict['updated_at'] = datetime.fromisoformat(cache_dict['updated_at'])
+        return cls(**cache_dict)
+
     def copy(self):
         new_app_model_config = AppModelConfig(
             id=self.id,
@@ -376,7 +486,7 @@ class RecommendedApp(db.Model):
 
     @property
     def app(self):
-        app = db.session.query(App).filter(App.id == self.app_id).first()
+        app = _get_by_id(App, self.app_id)
         return app
 
 
@@ -400,12 +510,12 @@ class InstalledApp(db.Model):
 
     @property
     def app(self):
-        app = db.session.query(App).filter(App.id == self.app_id).first()
+        app = _get_by_id(App, self.app_id)
         return app
 
     @property
     def tenant(self):
-        tenant = db.session.query(Tenant).filter(Tenant.id == self.tenant_id).first()
+        tenant = _get_by_id(Tenant, self.tenant_id)
         return tenant
 
     @property
@@ -419,7 +529,8 @@ class Conversation(db.Model):
     __tablename__ = 'conversations'
     __table_args__ = (
         db.PrimaryKeyConstraint('id', name='conversation_pkey'),
-        db.Index('conversation_app_from_user_idx', 'app_id', 'from_source', 'from_end_user_id')
+        db.Index('conversation_app_from_user_idx', 'app_id', 'from_source', 'from_end_user_id'),
+        db.Index('conversation_app_created_at_idx', 'app_id', 'created_at', 'id'),
     )
 
     id = db.Column(UUID, server_default=db.text('uuid_generate_v4()'))
@@ -463,10 +574,7 @@ class Conversation(db.Model):
             else:
                 model_config['configs'] = override_model_configs
         else:
-            app_model_config = db.session.query(AppModelConfig).filter(
-                AppModelConfig.id == self.app_model_config_id).first()
-
-            model_config = app_model_config.to_dict()
+            model_config = self.app_model_config.to_dict()
 
         model_config['model_id'] = self.model_id
         model_config['provider'] = self.model_provider
@@ -484,19 +592,23 @@ class Conversation(db.Model):
             else:
                 return ''
 
-    @property
+    @prefetched_property
+    def app_model_config(self):
+        return _get_app_model_config(self.app_model_config_id)
+
+    @prefetched_property
     def annotated(self):
         return db.session.query(MessageAnnotation).filter(MessageAnnotation.conversation_id == self.id).count() > 0
 
-    @property
+    @prefetched_property
     def annotation(self):
         return db.session.query(MessageAnnotation).filter(MessageAnnotation.conversation_id == self.id).first()
 
-    @property
+    @prefetched_property
     def message_count(self):
         return db.session.query(Message).filter(Message.conversation_id == self.id).count()
 
-    @property
+    @prefetched_property
     def user_feedback_stats(self):
         like = db.session.query(MessageFeedback) \
             .filter(MessageFeedback.conversation_id == self.id,
@@ -510,7 +622,7 @@ class Conversation(db.Model):
 
         return {'like': like, 'dislike': dislike}
 
-    @property
+    @prefetched_property
     def admin_feedback_stats(self):
         like = db.session.query(MessageFeedback) \
             .filter(MessageFeedback.conversation_id == self.id,
@@ -524,15 +636,15 @@ class Conversation(db.Model):
 
         return {'like': like, 'dislike': dislike}
 
-    @property
+    @prefetched_property
     def first_message(self):
         return db.session.query(Message).filter(Message.conversation_id == self.id).first()
 
     @property
     def app(self):
-        return db.session.query(App).filter(App.id == self.app_id).first()
+        return _get_by_id(App, self.app_id)
 
-    @property
+    @prefetched_property
     def from_end_user_session_id(self):
         if self.from_end_user_id:
             end_user = db.session.query(EndUser).filter(EndUser.id == self.from_end_user_id).first()
@@ -545,6 +657,84 @@ class Conversation(db.Model):
     def in_debug_mode(self):
         return self.override_model_configs is not None
 
+    @classmethod
+    def preload(cls, conversations: list['Conversation']) -> None:
+        """
+        Prefetch the properties used when listing conversations, in a constant number of queries for the whole page.
+
+        :param conversations: conversations
+        :return:
+        """
+        if not conversations:
+            return
+
+        conversation_ids = [conversation.id for conversation in conversations]
+
+        message_counts = dict(
+            db.session.query(Message.conversation_id, func.count(Message.id))
+            .filter(Message.conversation_id.in_(conversation_ids))
+            .group_by(Message.conversation_id)
+            .all()
+        )
+
+        feedback_stats = defaultdict(lambda: {
+            'user': {'like': 0, 'dislike': 0},
+            'admin': {'like': 0, 'dislike': 0}
+        })
+        feedback_counts = db.session.query(
+            MessageFeedback.conversation_id, MessageFeedback.from_source, MessageFeedback.rating,
+            func.count(MessageFeedback.id)
+        ).filter(
+            MessageFeedback.conversation_id.in_(conversation_ids)
+        ).group_by(
+            MessageFeedback.conversation_id, MessageFeedback.from_source, MessageFeedback.rating
+        ).all()
+        for conversation_id, from_source, rating, count in feedback_counts:
+            stats = feedback_stats[conversation_id].get(from_source)
+            if stats is not None and rating in stats:
+                stats[rating] = count
+
+        annotations = {
+            annotation.conversation_id: annotation
+            for annotation in db.session.query(MessageAnnotation)
+            .filter(MessageAnnotation.conversation_id.in_(conversation_ids))
+            .distinct(MessageAnnotation.conversation_id)
+            .order_by(MessageAnnotation.conversation_id, MessageAnnotation.created_at.asc())
+        }
+        _preload_accounts(list(annotations.values()), 'account_id', ['account', 'annotation_create_account'])
+
+        first_messages = {
+            message.conversation_id: message
+            for message in db.session.query(Message)
+            .filter(Message.conversation_id.in_(conversation_ids))
+            .distinct(Message.conversation_id)
+            .order_by(Message.conversation_id, Message.created_at.asc())
+        }
+
+        end_user_ids = {conversation.from_end_user_id for conversation in conversations
+                        if conversation.from_end_user_id}
+        end_user_session_ids = dict(
+            db.session.query(EndUser.id, EndUser.session_id).filter(EndUser.id.in_(end_user_ids)).all()
+        ) if end_user_ids else {}
+
+        app_model_config_ids = {conversation.app_model_config_id for conversation in conversations}
+        app_model_configs = {
+            app_model_config.id: app_model_config
+            for app_model_config in db.session.query(AppModelConfig)
+            .filter(AppModelConfig.id.in_(app_model_config_ids))
+        }
+
+        for conversation in conversations:
+            set_prefetched(conversation, 'message_count', message_counts.get(conversation.id, 0))
+            set_prefetched(conversation, 'user_feedback_stats', feedback_stats[conversation.id]['user'])
+            set_prefetched(conversation, 'admin_feedback_stats', feedback_stats[conversation.id]['admin'])
+            set_prefetched(conversation, 'annotated', conversation.id in annotations)
+            set_prefetched(conversation, 'annotation', annotations.get(conversation.id))
+            set_prefetched(conversation, 'first_message', first_messages.get(conversation.id))
+            set_prefetched(conversation, 'from_end_user_session_id',
+                           end_user_session_ids.get(conversation.from_end_user_id))
+            set_prefetched(conversation, 'app_model_config', app_model_configs.get(conversation.app_model_config_id))
+
 
 class Message(db.Model):
     __tablename__ = 'messages'
@@ -554,6 +744,8 @@ class Message(db.Model):
         db.Index('message_conversation_id_idx', 'conversation_id'),
         db.Index('message_end_user_idx', 'app_id', 'from_source', 'from_end_user_id'),
         db.Index('message_account_idx', 'app_id', 'from_source', 'from_account_id'),
+        db.Index('message_search_vector_idx', 'search_vector', postgresql_using='gin'),
+        db.Index('message_search_vector_pending_idx', 'app_id', postgresql_where=db.text('search_vector IS NULL')),
     )
 
     id = db.Column(UUID, server_default=db.text('uuid_generate_v4()'))
@@ -581,30 +773,32 @@ class Message(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text('CURRENT_TIMESTAMP(0)'))
     updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text('CURRENT_TIMESTAMP(0)'))
     agent_based = db.Column(db.Boolean, nullable=False, server_default=db.text('false'))
+    # full text search of query and answer, maintained by the messages_search_vector_update trigger
+    search_vector = deferred(db.Column(TSVECTOR, nullable=True))
 
-    @property
+    @prefetched_property
     def user_feedback(self):
         feedback = db.session.query(MessageFeedback).filter(MessageFeedback.message_id == self.id,
                                                             MessageFeedback.from_source == 'user').first()
         return feedback
 
-    @property
+    @prefetched_property
     def admin_feedback(self):
         feedback = db.session.query(MessageFeedback).filter(MessageFeedback.message_id == self.id,
                                                             MessageFeedback.from_source == 'admin').first()
         return feedback
 
-    @property
+    @prefetched_property
     def feedbacks(self):
         feedbacks = db.session.query(MessageFeedback).filter(MessageFeedback.message_id == self.id).all()
         return feedbacks
 
-    @property
+    @prefetched_property
     def annotation(self):
         annotation = db.session.query(MessageAnnotation).filter(MessageAnnotation.message_id == self.id).first()
         return annotation
 
-    @property
+    @prefetched_property
     def annotation_hit_history(self):
         annotation_history = (db.session.query(AppAnnotationHitHistory)
                               .filter(AppAnnotationHitHistory.message_id == self.id).first())
@@ -614,12 +808,11 @@ class Message(db.Model):
             return annotation
         return None
 
-    @property
+    @prefetched_property
     def app_model_config(self):
-        conversation = db.session.query(Conversation).filter(Conversation.id == self.conversation_id).first()
+        conversation = _get_by_id(Conversation, self.conversation_id)
         if conversation:
-            return db.session.query(AppModelConfig).filter(
-                AppModelConfig.id == conversation.app_model_config_id).first()
+            return _get_app_model_config(conversation.app_model_config_id)
 
         return None
 
@@ -627,17 +820,17 @@ class Message(db.Model):
     def in_debug_mode(self):
         return self.override_model_configs is not None
 
-    @property
+    @prefetched_property
     def agent_thoughts(self):
         return db.session.query(MessageAgentThought).filter(MessageAgentThought.message_id == self.id) \
             .order_by(MessageAgentThought.position.asc()).all()
 
-    @property
+    @prefetched_property
     def retriever_resources(self):
         return db.session.query(DatasetRetrieverResource).filter(DatasetRetrieverResource.message_id == self.id) \
             .order_by(DatasetRetrieverResource.position.asc()).all()
 
-    @property
+    @prefetched_property
     def message_files(self):
         return db.session.query(MessageFile).filter(MessageFile.message_id == self.id).all()
 
@@ -650,13 +843,8 @@ class Message(db.Model):
             url = message_file.url
             if message_file.type == 'image':
                 if message_file.transfer_method == 'local_file':
-                    upload_file = (db.session.query(UploadFile)
-                                   .filter(
-                        UploadFile.id == message_file.upload_file_id
-                    ).first())
-
                     url = UploadFileParser.get_image_data(
-                        upload_file=upload_file,
+                        upload_file=message_file.upload_file,
                         force_url=True
                     )
                 if message_file.transfer_method == 'tool_file':
@@ -679,6 +867,105 @@ class Message(db.Model):
 
         return files
 
+    @classmethod
+    def preload(cls, messages: list['Message']) -> None:
+        """
+        Prefetch the properties used when listing messages, in a constant number of queries for the whole page.
+
+        :param messages: messages
+        :return:
+        """
+        if not messages:
+            return
+
+        message_ids = [message.id for message in messages]
+
+        feedbacks = defaultdict(list)
+        feedback_records = db.session.query(MessageFeedback) \
+            .filter(MessageFeedback.message_id.in_(message_ids)) \
+            .order_by(MessageFeedback.created_at.asc()) \
+            .all()
+        for feedback in feedback_records:
+            feedbacks[feedback.message_id].append(feedback)
+
+        annotations = {
+            annotation.message_id: annotation
+            for annotation in db.session.query(MessageAnnotation)
+            .filter(MessageAnnotation.message_id.in_(message_ids))
+            .distinct(MessageAnnotation.message_id)
+            .order_by(MessageAnnotation.message_id, MessageAnnotation.created_at.asc())
+        }
+
+        hit_annotation_ids = dict(
+            db.session.query(AppAnnotationHitHistory.message_id, AppAnnotationHitHistory.annotation_id)
+            .filter(AppAnnotationHitHistory.message_id.in_(message_ids))
+            .distinct(AppAnnotationHitHistory.message_id)
+            .order_by(AppAnnotationHitHistory.message_id, AppAnnotationHitHistory.created_at.asc())
+            .all()
+        )
+        hit_annotations = {
+            annotation.id: annotation
+            for annotation in db.session.query(MessageAnnotation)
+            .filter(MessageAnnotation.id.in_(set(hit_annotation_ids.values())))
+        } if hit_annotation_ids else {}
+
+        _preload_accounts(feedback_records, 'from_account_id', ['from_account'])
+        _preload_accounts(list(annotations.values()) + list(hit_annotations.values()), 'account_id',
+                          ['account', 'annotation_create_account'])
+
+        agent_thoughts = defaultdict(list)
+        for agent_thought in db.session.query(MessageAgentThought) \
+                .filter(MessageAgentThought.message_id.in_(message_ids)) \
+                .order_by(MessageAgentThought.position.asc()):
+            agent_thoughts[agent_thought.message_id].append(agent_thought)
+
+        retriever_resources = defaultdict(list)
+        for retriever_resource in db.session.query(DatasetRetrieverResource) \
+                .filter(DatasetRetrieverResource.message_id.in_(message_ids)) \
+                .order_by(DatasetRetrieverResource.position.asc()):
+            retriever_resources[retriever_resource.message_id].append(retriever_resource)
+
+        message_files = defaultdict(list)
+        message_file_records = db.session.query(MessageFile).filter(MessageFile.message_id.in_(message_ids)).all()
+        for message_file in message_file_records:
+            message_files[message_file.message_id].append(message_file)
+
+        upload_file_ids = {message_file.upload_file_id for message_file in message_file_records}
+        upload_file_ids.discard(None)
+        upload_files = {
+            upload_file.id: upload_file
+            for upload_file in db.session.query(UploadFile).filter(UploadFile.id.in_(upload_file_ids))
+        } if upload_file_ids else {}
+        for message_file in message_file_records:
+            set_prefetched(message_file, 'upload_file', upload_files.get(message_file.upload_file_id))
+
+        app_model_config_ids = dict(
+            db.session.query(Conversation.id, Conversation.app_model_config_id)
+            .filter(Conversation.id.in_({message.conversation_id for message in messages}))
+            .all()
+        )
+        app_model_configs = {
+            app_model_config.id: app_model_config
+            for app_model_config in db.session.query(AppModelConfig)
+            .filter(AppModelConfig.id.in_(set(app_model_config_ids.values())))
+        } if app_model_config_ids else {}
+
+        for message in messages:
+            message_feedbacks = feedbacks[message.id]
+            set_prefetched(message, 'feedbacks', message_feedbacks)
+            set_prefetched(message, 'user_feedback', next(
+                (feedback for feedback in message_feedbacks if feedback.from_source == 'user'), None))
+            set_prefetched(message, 'admin_feedback', next(
+                (feedback for feedback in message_feedbacks if feedback.from_source == 'admin'), None))
+            set_prefetched(message, 'annotation', annotations.get(message.id))
+            set_prefetched(message, 'annotation_hit_history',
+                           hit_annotations.get(hit_annotation_ids.get(message.id)))
+            set_prefetched(message, 'agent_thoughts', agent_thoughts[message.id])
+            set_prefetched(message, 'retriever_resources', retriever_resources[message.id])
+            set_prefetched(message, 'message_files', message_files[message.id])
+            set_prefetched(message, 'app_model_config',
+                           app_model_configs.get(app_model_config_ids.get(message.conversation_id)))
+
 
 class MessageFeedback(db.Model):
     __tablename__ = 'message_feedbacks'
@@ -701,7 +988,7 @@ class MessageFeedback(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text('CURRENT_TIMESTAMP(0)'))
     updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text('CURRENT_TIMESTAMP(0)'))
 
-    @property
+    @prefetched_property
     def from_account(self):
         account = db.session.query(Account).filter(Account.id == self.from_account_id).first()
         return account
@@ -726,11 +1013,16 @@ class MessageFile(db.Model):
     created_by = db.Column(UUID, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text('CURRENT_TIMESTAMP(0)'))
 
+    @prefetched_property
+    def upload_file(self):
+        return db.session.query(UploadFile).filter(UploadFile.id == self.upload_file_id).first()
+
 class MessageAnnotation(db.Model):
     __tablename__ = 'message_annotations'
     __table_args__ = (
         db.PrimaryKeyConstraint('id', name='message_annotation_pkey'),
         db.Index('message_annotation_app_idx', 'app_id'),
+        db.Index('message_annotation_app_created_at_idx', 'app_id', 'created_at', 'id'),
         db.Index('message_annotation_conversation_idx', 'conversation_id'),
         db.Index('message_annotation_message_idx', 'message_id')
     )
@@ -746,12 +1038,12 @@ class MessageAnnotation(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text('CURRENT_TIMESTAMP(0)'))
     updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text('CURRENT_TIMESTAMP(0)'))
 
-    @property
+    @prefetched_property
     def account(self):
         account = db.session.query(Account).filter(Account.id == self.account_id).first()
         return account
 
-    @property
+    @prefetched_property
     def annotation_create_account(self):
         account = db.session.query(Account).filter(Account.id == self.account_id).first()
         return account
@@ -1068,3 +1360,31 @@ class DatasetRetrieverResource(db.Model):
     retriever_from = db.Column(db.Text, nullable=False)
     created_by = db.Column(UUID, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
+
+
+class AppStatisticRollup(db.Model):
+    __tablename__ = 'app_statistic_rollups'
+    __table_args__ = (
+        db.PrimaryKeyConstraint('id', name='app_statistic_rollup_pkey'),
+        db.UniqueConstraint('app_id', 'period_start', name='unique_app_statistic_rollup_app_period')
+    )
+
+    id = db.Column(UUID, server_default=db.text('uuid_generate_v4()'))
+    app_id = db.Column(UUID, nullable=False)
+    # start of the 15 minutes utc period, every timezone offset is a multiple of 15 minutes,
+    # so the periods can be grouped into the days of any timezone
+    period_start = db.Column(db.DateTime, nullable=False)
+    # measures of the messages created in the period
+    message_count = db.Column(db.Integer, nullable=False, server_default=db.text('0'))
+    feedback_count = db.Column(db.Integer, nullable=False, server_default=db.text('0'))
+    token_count = db.Column(db.BigInteger, nullable=False, server_default=db.text('0'))
+    answer_tokens = db.Column(db.BigInteger, nullable=False, server_default=db.text('0'))
+    total_price = db.Column(db.Numeric, nullable=False, server_default=db.text('0'))
+    provider_response_latency = db.Column(db.Float, nullable=False, server_default=db.text('0'))
+    conversation_ids = db.Column(ARRAY(UUID), nullable=False, server_default=db.text("'{}'"))
+    end_user_ids = db.Column(ARRAY(UUID), nullable=False, server_default=db.text("'{}'"))
+    # measures of the non-debug conversations created in the period
+    session_count = db.Column(db.Integer, nullable=False, server_default=db.text('0'))
+    session_message_count = db.Column(db.Integer, nullable=False, server_default=db.text('0'))
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.text('CURRENT_TIMESTAMP(0)'))
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text('CURRENT_TIMESTAMP(0)'))
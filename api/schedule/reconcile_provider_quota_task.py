@@ -0,0 +1,16 @@
+import time
+
+import click
+
+import app
+from core.helper.provider_quota_ledger import ProviderQuotaLedger
+
+
+@app.celery.task(queue='dataset')
+def reconcile_provider_quota_task():
+    click.echo(click.style('Start reconcile provider quota.', fg='green'))
+    start_at = time.perf_counter()
+    flushed = ProviderQuotaLedger.flush_all()
+    end_at = time.perf_counter()
+    click.echo(click.style('Reconciled {} provider quota ledgers latency: {}'.format(flushed, end_at - start_at),
+                           fg='green'))
@@ -0,0 +1,26 @@
+import time
+
+import click
+
+import app
+from extensions.ext_redis import redis_client
+from services.app_statistic_service import AppStatisticService
+
+
+@app.celery.task(queue='dataset')
+def update_app_statistic_task():
+    # skip if the previous run, e.g. the first full roll up, is still running
+    lock = redis_client.lock('update_app_statistic_task_lock', timeout=3600)
+    if not lock.acquire(blocking=False):
+        click.echo(click.style('Update app statistic is already running, skip.', fg='yellow'))
+        return
+
+    try:
+        click.echo(click.style('Start update app statistic.', fg='green'))
+        start_at = time.perf_counter()
+        windows = AppStatisticService.update_statistics()
+        end_at = time.perf_counter()
+        click.echo(click.style('Updated app statistic of {} windows latency: {}'.format(windows, end_at - start_at),
+                               fg='green'))
+    finally:
+        lock.release()
@@ -9,6 +9,7 @@ from werkzeug.exceptions import NotFound
 
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
+from libs.keyset_pagination import KeysetPagination, keyset_paginate
 from models.model import App, AppAnnotationHitHistory, AppAnnotationSetting, Message, MessageAnnotation
 from services.feature_service import FeatureService
 from tasks.annotation.add_annotation_to_index_task import add_annotation_to_index_task
@@ -146,6 +147,29 @@ class AppAnnotationService:
                            .paginate(page=page, per_page=limit, max_per_page=100, error_out=False))
         return annotations.items, annotations.total
 
+    @classmethod
+    def get_annotation_list_by_cursor(cls, app_id: str, cursor: str, limit: int, keyword: str) -> KeysetPagination:
+        # get app info
+        app = db.session.query(App).filter(
+            App.id == app_id,
+            App.tenant_id == current_user.current_tenant_id,
+            App.status == 'normal'
+        ).first()
+
+        if not app:
+            raise NotFound("App not found")
+
+        query = db.select(MessageAnnotation).where(MessageAnnotation.app_id == app_id)
+        if keyword:
+            query = query.where(
+                or_(
+                    MessageAnnotation.question.ilike('%{}%'.format(keyword)),
+                    MessageAnnotation.content.ilike('%{}%'.format(keyword))
+                )
+            )
+
+        return keyset_paginate(query, MessageAnnotation, cursor, limit)
+
     @classmethod
     def export_annotation_list_by_app_id(cls, app_id: str):
         # get app info
@@ -0,0 +1,134 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional
+
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.model import ApiToken, App, EndUser
+
+# revoked tokens are removed from the cache explicitly, the ttl only bounds stale entries
+API_TOKEN_CACHE_TTL = 600
+# last_used_at of a token is written at most once in this many seconds
+API_TOKEN_LAST_USED_UPDATE_INTERVAL = 60
+END_USER_CACHE_TTL = 600
+
+
+class ApiTokenService:
+    @classmethod
+    def get_api_token(cls, token: str, scope: Optional[str]) -> Optional[ApiToken]:
+        """
+        Get api token by token and scope, the token is cached in redis to avoid a query for every request.
+
+        The returned token is not attached to the session, it must not be modified.
+
+        :param token: token
+        :param scope: token type, app or dataset
+        :return:
+        """
+        cache_key = cls._get_api_token_cache_key(token, scope)
+        cached_token = redis_client.get(cache_key)
+        if cached_token:
+            return ApiToken(**json.loads(cached_token))
+
+        api_token = db.session.query(ApiToken).filter(
+            ApiToken.token == token,
+            ApiToken.type == scope,
+        ).first()
+
+        if not api_token:
+            return None
+
+        redis_client.setex(cache_key, API_TOKEN_CACHE_TTL, json.dumps({
+            'id': api_token.id,
+            'app_id': api_token.app_id,
+            'tenant_id': api_token.tenant_id,
+            'type': api_token.type,
+            'token': api_token.token,
+        }))
+
+        return api_token
+
+    @classmethod
+    def delete_api_token_cache(cls, api_token: ApiToken) -> None:
+        """
+        Delete the cached api token, must be called when the token is revoked.
+
+        :param api_token: api token
+        :return:
+        """
+        redis_client.delete(cls._get_api_token_cache_key(api_token.token, api_token.type))
+
+    @classmethod
+    def update_last_used_at(cls, api_token: ApiToken) -> None:
+        """
+        Update last used time of the api token, debounced to at most once per interval for each token.
+
+        :param api_token: api token
+        :return:
+        """
+        debounce_key = f"api_token_last_used:{api_token.id}"
+        if not redis_client.set(debounce_key, 1, ex=API_TOKEN_LAST_USED_UPDATE_INTERVAL, nx=True):
+            return
+
+        db.session.query(ApiToken).filter(ApiToken.id == api_token.id).update(
+            {'last_used_at': datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.session.commit()
+
+    @classmethod
+    def get_or_create_end_user(cls, app_model: App, session_id: str) -> EndUser:
+        """
+        Get or create the service api end user of session id, the end user is cached in redis.
+
+        :param app_model: app model
+        :param session_id: session id, the user id passed by the api caller
+        :return:
+        """
+        cache_key = f"service_api_end_user:app_id:{app_model.id}:session_id:{session_id}"
+        cached_end_user = redis_client.get(cache_key)
+        if cached_end_user:
+            end_user_dict = json.loads(cached_end_user)
+            for field in ['created_at', 'updated_at']:
+                end_user_dict[field] = datetime.fromisoformat(end_user_dict[field])
+            return EndUser(**end_user_dict)
+
+        end_user = db.session.query(EndUser) \
+            .filter(
+            EndUser.tenant_id == app_model.tenant_id,
+            EndUser.app_id == app_model.id,
+            EndUser.session_id == session_id,
+            EndUser.type == 'service_api'
+        ).first()
+
+        if end_user is None:
+            end_user = EndUser(
+                tenant_id=app_model.tenant_id,
+                app_id=app_model.id,
+                type='service_api',
+                is_anonymous=True if session_id == 'DEFAULT-USER' else False,
+                session_id=session_id
+            )
+            db.session.add(end_user)
+            db.session.commit()
+
+        redis_client.setex(cache_key, END_USER_CACHE_TTL, json.dumps({
+            'id': end_user.id,
+            'tenant_id': end_user.tenant_id,
+            'app_id': end_user.app_id,
+            'type': end_user.type,
+            'external_user_id': end_user.external_user_id,
+            'name': end_user.name,
+            'is_anonymous': end_user.is_anonymous,
+            'session_id': end_user.session_id,
+            'created_at': end_user.created_at.isoformat(),
+            'updated_at': end_user.updated_at.isoformat(),
+        }))
+
+        return end_user
+
+    @staticmethod
+    def _get_api_token_cache_key(token: str, scope: Optional[str]) -> str:
+        token_hash = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        return f"api_token:scope:{scope}:token:{token_hash}"
@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+from collections.abc import Generator
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import case, func, select
+
+from extensions.ext_database import db
+from models.model import App, Message, MessageAnnotation, MessageFeedback
+
+# rows fetched from the server side cursor at a time, bounds the memory of an export
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    'id',
+    'conversation_id',
+    'created_at',
+    'from_source',
+    'from_end_user_id',
+    'from_account_id',
+    'query',
+    'answer',
+    'message_tokens',
+    'answer_tokens',
+    'total_price',
+    'currency',
+    'provider_response_latency',
+    'user_feedback',
+    'admin_feedback',
+    'annotation_question',
+    'annotation_content',
+]
+
+
+class AppLogExportService:
+    @classmethod
+    def export_messages(cls, app_model: App, export_format: str,
+                        start: Optional[datetime] = None,
+                        end: Optional[datetime] = None) -> Generator[str, None, None]:
+        """
+        Export messages of the app with their feedbacks and annotations, oldest first.
+
+        :param app_model: app model
+        :param export_format: ndjson or csv
+        :param start: created at or after, utc
+        :param end: created before, utc
+        :return: chunks of the export
+        """
+        # a message may have several feedbacks or annotations, they are reduced to one row per message
+        # before the join so that messages are never exported twice
+        feedbacks = select(
+            MessageFeedback.message_id,
+            func.max(case((MessageFeedback.from_source == 'user', MessageFeedback.rating))).label('user_feedback'),
+            func.max(case((MessageFeedback.from_source == 'admin', MessageFeedback.rating))).label('admin_feedback'),
+        ).where(
+            MessageFeedback.app_id == app_model.id
+        ).group_by(
+            MessageFeedback.message_id
+        ).subquery()
+
+        annotations = select(
+            MessageAnnotation.message_id,
+            MessageAnnotation.question,
+            MessageAnnotation.content,
+        ).where(
+            MessageAnnotation.app_id == app_model.id,
+            MessageAnnotation.message_id.isnot(None)
+        ).distinct(
+            MessageAnnotation.message_id
+        ).order_by(
+            MessageAnnotation.message_id, MessageAnnotation.created_at.desc()
+        ).subquery()
+
+        query = select(
+            Message.id,
+            Message.conversation_id,
+            Message.created_at,
+            Message.from_source,
+            Message.from_end_user_id,
+            Message.from_account_id,
+            Message.query,
+            Message.answer,
+            Message.message_tokens,
+            Message.answer_tokens,
+            Message.total_price,
+            Message.currency,
+            Message.provider_response_latency,
+            feedbacks.c.user_feedback,
+            feedbacks.c.admin_feedback,
+            annotations.c.question.label('annotation_question'),
+            annotations.c.content.label('annotation_content'),
+        ).outerjoin(
+            feedbacks, feedbacks.c.message_id == Message.id
+        ).outerjoin(
+            annotations, annotations.c.message_id == Message.id
+        ).where(
+            Message.app_id == app_model.id
+        )
+
+        if start:
+            query = query.where(Message.created_at >= start)
+
+        if end:
+            query = query.where(Message.created_at < end)
+
+        query = query.order_by(Message.created_at.asc(), Message.id.asc())
+
+        if export_format == 'csv':
+            yield cls._to_csv([EXPORT_COLUMNS])
+
+        # a server side cursor, rows are fetched in batches instead of loading the whole result
+        with db.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=EXPORT_BATCH_SIZE).execute(query)
+            for rows in result.partitions(EXPORT_BATCH_SIZE):
+                if export_format == 'csv':
+                    yield cls._to_csv([[cls._format_value(row[column]) for column in EXPORT_COLUMNS]
+                                       for row in (row._mapping for row in rows)])
+                else:
+                    yield ''.join(
+                        json.dumps({column: cls._format_value(row[column]) for column in EXPORT_COLUMNS},
+                                   ensure_ascii=False) + '\n'
+                        for row in (row._mapping for row in rows)
+                    )
+
+    @staticmethod
+    def _format_value(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    @staticmethod
+    def _to_csv(rows: list[list]) -> str:
+        output = io.StringIO()
+        csv.writer(output).writerows(rows)
+        return output.getvalue()
@@ -0,0 +1,226 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.model import Message
+
+ROLLED_UP_UNTIL_KEY = 'app_statistic_rollup:rolled_up_until'
+REROLLED_AT_KEY = 'app_statistic_rollup:rerolled_at'
+STALE_PERIODS_KEY = 'app_statistic_rollup:stale_periods'
+# every timezone offset is a multiple of 15 minutes, so periods never straddle a local midnight
+ROLLUP_PERIOD = timedelta(minutes=15)
+# messages are committed a moment after their created_at, so recent periods are rolled up again in the next run
+ROLLUP_SAFETY_MARGIN = timedelta(minutes=5)
+# the first run rolls up the whole history, one window per transaction
+ROLLUP_WINDOW = timedelta(days=1)
+# rows which are deleted leave nothing to detect them by, so the trailing days are rolled up again once a day
+REROLL_INTERVAL = timedelta(days=1)
+REROLL_DAYS = 7
+
+
+def _period_start(column: str) -> str:
+    return f"DATE_TRUNC('hour', {column}) + FLOOR(EXTRACT(MINUTE FROM {column}) / 15) * INTERVAL '15 minutes'"
+
+
+# periods of the messages created or the feedbacks updated in the window
+_WINDOW_MESSAGE_PERIODS_SQL = f"""
+SELECT DISTINCT app_id, {_period_start('created_at')} AS period_start
+    FROM messages
+    WHERE created_at >= :since AND created_at < :until
+UNION
+SELECT DISTINCT m.app_id, {_period_start('m.created_at')} AS period_start
+    FROM message_feedbacks mf
+    JOIN messages m ON m.id = mf.message_id
+    WHERE mf.updated_at >= :since AND mf.updated_at < :until
+"""
+
+# periods of the conversations which got messages in the window
+_WINDOW_SESSION_PERIODS_SQL = f"""
+SELECT DISTINCT c.app_id, {_period_start('c.created_at')} AS period_start
+    FROM messages m
+    JOIN conversations c ON c.id = m.conversation_id
+    WHERE m.created_at >= :since AND m.created_at < :until
+"""
+
+# periods marked as stale, passed as a json array of {app_id, period_start}
+_STALE_PERIODS_SQL = """
+SELECT app_id, period_start FROM json_to_recordset(CAST(:periods AS json)) AS p(app_id uuid, period_start timestamp)
+"""
+
+_MESSAGE_STATISTIC_SQL = """
+WITH affected AS ({affected})
+INSERT INTO app_statistic_rollups (app_id, period_start, message_count, feedback_count, token_count, answer_tokens,
+    total_price, provider_response_latency, conversation_ids, end_user_ids)
+SELECT m.app_id, a.period_start,
+    COUNT(m.id),
+    COALESCE(SUM(mf.feedback_count), 0),
+    COALESCE(SUM(m.message_tokens + m.answer_tokens), 0),
+    COALESCE(SUM(m.answer_tokens), 0),
+    COALESCE(SUM(m.total_price), 0),
+    COALESCE(SUM(m.provider_response_latency), 0),
+    ARRAY_AGG(DISTINCT m.conversation_id),
+    ARRAY_REMOVE(ARRAY_AGG(DISTINCT m.from_end_user_id), NULL)
+FROM affected a
+JOIN messages m ON m.app_id = a.app_id
+    AND m.created_at >= a.period_start AND m.created_at < a.period_start + INTERVAL '15 minutes'
+LEFT JOIN LATERAL (
+    SELECT COUNT(*) AS feedback_count FROM message_feedbacks WHERE message_id = m.id
+) mf ON true
+GROUP BY m.app_id, a.period_start
+ON CONFLICT (app_id, period_start) DO UPDATE SET
+    message_count = EXCLUDED.message_count,
+    feedback_count = EXCLUDED.feedback_count,
+    token_count = EXCLUDED.token_count,
+    answer_tokens = EXCLUDED.answer_tokens,
+    total_price = EXCLUDED.total_price,
+    provider_response_latency = EXCLUDED.provider_response_latency,
+    conversation_ids = EXCLUDED.conversation_ids,
+    end_user_ids = EXCLUDED.end_user_ids,
+    updated_at = CURRENT_TIMESTAMP(0)
+"""
+
+_SESSION_STATISTIC_SQL = """
+WITH affected AS ({affected})
+INSERT INTO app_statistic_rollups (app_id, period_start, session_count, session_message_count)
+SELECT c.app_id, a.period_start, COUNT(DISTINCT c.id), COUNT(m.id)
+FROM affected a
+JOIN conversations c ON c.app_id = a.app_id
+    AND c.created_at >= a.period_start AND c.created_at < a.period_start + INTERVAL '15 minutes'
+JOIN messages m ON m.conversation_id = c.id
+WHERE c.override_model_configs IS NULL
+GROUP BY c.app_id, a.period_start
+ON CONFLICT (app_id, period_start) DO UPDATE SET
+    session_count = EXCLUDED.session_count,
+    session_message_count = EXCLUDED.session_message_count,
+    updated_at = CURRENT_TIMESTAMP(0)
+"""
+
+
+def floor_rollup_period(value: datetime) -> datetime:
+    """
+    Get the start of the rollup period of a datetime.
+
+    :param value: naive utc datetime
+    :return:
+    """
+    return value.replace(minute=value.minute - value.minute % 15, second=0, microsecond=0)
+
+
+class AppStatisticService:
+    @classmethod
+    def get_rollup_until(cls) -> datetime:
+        """
+        Get the utc period before which the statistics rollup is complete,
+        statistics of the later messages have to be read from the messages.
+
+        :return:
+        """
+        rolled_up_until = redis_client.get(ROLLED_UP_UNTIL_KEY)
+        if not rolled_up_until:
+            return datetime(1970, 1, 1)
+
+        rolled_up_until = datetime.fromisoformat(rolled_up_until.decode('utf-8')) - ROLLUP_SAFETY_MARGIN
+        return floor_rollup_period(rolled_up_until)
+
+    @classmethod
+    def mark_stale(cls, app_id: str, created_at: datetime) -> None:
+        """
+        Mark the period of a message as stale after a change which is not detected by the incremental rollup,
+        such as a deleted feedback, so that the next run rolls it up again.
+
+        :param app_id: app id
+        :param created_at: created at of the message
+        :return:
+        """
+        redis_client.sadd(STALE_PERIODS_KEY, json.dumps({
+            'app_id': str(app_id),
+            'period_start': floor_rollup_period(created_at).isoformat()
+        }))
+
+    @classmethod
+    def update_statistics(cls) -> int:
+        """
+        Roll up the periods of all the apps which got new messages or feedbacks since the last run,
+        the periods marked as stale, and once a day the trailing days.
+
+        :return: number of rolled up windows
+        """
+        started_at = datetime.utcnow()
+
+        rolled_up_until = redis_client.get(ROLLED_UP_UNTIL_KEY)
+        if rolled_up_until:
+            since = datetime.fromisoformat(rolled_up_until.decode('utf-8')) - ROLLUP_SAFETY_MARGIN
+        else:
+            since = db.session.query(func.min(Message.created_at)).scalar()
+
+        windows = 0
+        while since is not None and since < started_at:
+            until = min(since + ROLLUP_WINDOW, started_at)
+            cls._update_window(since, until)
+            # a failed run resumes from the last rolled up window
+            redis_client.set(ROLLED_UP_UNTIL_KEY, until.isoformat())
+            since = until
+            windows += 1
+
+        cls._update_stale_periods()
+
+        rerolled_at = redis_client.get(REROLLED_AT_KEY)
+        if not rerolled_at or datetime.fromisoformat(rerolled_at.decode('utf-8')) <= started_at - REROLL_INTERVAL:
+            windows += cls.reroll(started_at - timedelta(days=REROLL_DAYS), started_at)
+            redis_client.set(REROLLED_AT_KEY, started_at.isoformat())
+
+        return windows
+
+    @classmethod
+    def reroll(cls, since: datetime, until: datetime) -> int:
+        """
+        Roll up all the periods of a time range from scratch, so that deleted messages, conversations
+        and feedbacks are subtracted.
+
+        :param since: utc start of the range
+        :param until: utc end of the range
+        :return: number of rolled up windows
+        """
+        since = floor_rollup_period(since)
+        windows = 0
+        while since < until:
+            window_until = min(since + ROLLUP_WINDOW, until)
+            db.session.execute(db.text('''
+                DELETE FROM app_statistic_rollups WHERE period_start >= :since AND period_start < :until
+            '''), {'since': since, 'until': window_until})
+            cls._update_window(since, window_until)
+            since = window_until
+            windows += 1
+
+        return windows
+
+    @classmethod
+    def _update_window(cls, since: datetime, until: datetime) -> None:
+        arg_dict = {'since': since, 'until': until}
+        db.session.execute(db.text(_MESSAGE_STATISTIC_SQL.format(affected=_WINDOW_MESSAGE_PERIODS_SQL)), arg_dict)
+        db.session.execute(db.text(_SESSION_STATISTIC_SQL.format(affected=_WINDOW_SESSION_PERIODS_SQL)), arg_dict)
+        db.session.commit()
+
+    @classmethod
+    def _update_stale_periods(cls) -> None:
+        stale_periods = redis_client.smembers(STALE_PERIODS_KEY)
+        if not stale_periods:
+            return
+
+        periods = [json.loads(stale_period) for stale_period in stale_periods]
+        arg_dict = {'periods': json.dumps(periods)}
+
+        # periods left without messages are dropped, the others are rolled up again
+        db.session.execute(db.text(f'''
+            DELETE FROM app_statistic_rollups r
+            USING ({_STALE_PERIODS_SQL}) p
+            WHERE r.app_id = p.app_id AND r.period_start = p.period_start
+        '''), arg_dict)
+        db.session.execute(db.text(_MESSAGE_STATISTIC_SQL.format(affected=_STALE_PERIODS_SQL)), arg_dict)
+        db.session.execute(db.text(_SESSION_STATISTIC_SQL.format(affected=_STALE_PERIODS_SQL)), arg_dict)
+        db.session.commit()
+
+        redis_client.srem(STALE_PERIODS_KEY, *stale_periods)
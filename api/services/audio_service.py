@@ -1,6 +1,10 @@
-import io
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+from flask import current_app
+from pydub import AudioSegment
 from werkzeug.datastructures import FileStorage
 
 from core.model_manager import ModelManager
@@ -15,10 +19,41 @@ from services.errors.audio import (
 
 FILE_SIZE = 30
 FILE_SIZE_LIMIT = FILE_SIZE * 1024 * 1024
+# the multipart request body carries the boundaries and the other form fields besides the audio
+REQUEST_SIZE_LIMIT = FILE_SIZE_LIMIT + 1024 * 1024
+SPOOL_CHUNK_SIZE = 64 * 1024
 ALLOWED_EXTENSIONS = ['mp3', 'mp4', 'mpeg', 'mpga', 'm4a', 'wav', 'webm', 'amr']
 
+_normalization_executor: Optional[ThreadPoolExecutor] = None
+_normalization_executor_lock = threading.Lock()
+
+
+class SpooledAudioFile(tempfile.SpooledTemporaryFile):
+    """
+    Audio file kept in memory up to max_size bytes and rolled over to a temporary file beyond,
+    named so that providers can tell the audio format from the file name.
+    """
+    def __init__(self, max_size: int, name: str) -> None:
+        super().__init__(max_size=max_size)
+        self._audio_file_name = name
+
+    @property
+    def name(self) -> str:
+        return self._audio_file_name
+
 
 class AudioService:
+    @classmethod
+    def check_upload_size(cls, content_length: Optional[int]) -> None:
+        """
+        Reject the upload by the Content-Length header, before the request body is read
+
+        :param content_length: request content length
+        :return:
+        """
+        if content_length and content_length > REQUEST_SIZE_LIMIT:
+            raise AudioTooLargeServiceError(f"Audio size larger than {FILE_SIZE} mb")
+
     @classmethod
     def transcript_asr(cls, tenant_id: str, file: FileStorage, end_user: Optional[str] = None):
         if file is None:
@@ -28,13 +63,6 @@ class AudioService:
         if extension not in [f'audio/{ext}' for ext in ALLOWED_EXTENSIONS]:
             raise UnsupportedAudioTypeServiceError()
 
-        file_content = file.read()
-        file_size = len(file_content)
-
-        if file_size > FILE_SIZE_LIMIT:
-            message = f"Audio size larger than {FILE_SIZE} mb"
-            raise AudioTooLargeServiceError(message)
-
         model_manager = ModelManager()
         model_instance = model_manager.get_default_model_instance(
             tenant_id=tenant_id,
@@ -43,10 +71,82 @@ class AudioService:
         if model_instance is None:
             raise ProviderNotSupportSpeechToTextServiceError()
 
-        buffer = io.BytesIO(file_content)
-        buffer.name = 'temp.mp3'
+        with cls._spool_audio(file) as audio_file:
+            if current_app.config['ASR_AUDIO_NORMALIZATION_ENABLED']:
+                with cls._normalize_audio(audio_file) as normalized_audio_file:
+                    return {"text": model_instance.invoke_speech2text(file=normalized_audio_file, user=end_user)}
+
+            return {"text": model_instance.invoke_speech2text(file=audio_file, user=end_user)}
+
+    @classmethod
+    def _spool_audio(cls, file: FileStorage) -> SpooledAudioFile:
+        """
+        Copy the uploaded audio into a spooled file chunk by chunk, stop as soon as it exceeds the size limit
+
+        :param file: uploaded audio
+        :return: spooled audio file
+        """
+        audio_file = cls._new_spooled_audio_file()
+        file_size = 0
+        try:
+            while chunk := file.stream.read(SPOOL_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > FILE_SIZE_LIMIT:
+                    message = f"Audio size larger than {FILE_SIZE} mb"
+                    raise AudioTooLargeServiceError(message)
+
+                audio_file.write(chunk)
+        except Exception:
+            audio_file.close()
+            raise
+
+        audio_file.seek(0)
+        return audio_file
+
+    @classmethod
+    def _normalize_audio(cls, audio_file: SpooledAudioFile) -> SpooledAudioFile:
+        """
+        Transcode the audio to 16kHz mono mp3 in the bounded normalization worker pool,
+        which bounds the number of concurrent ffmpeg processes and decoded audio in memory
+
+        :param audio_file: audio file
+        :return: normalized audio file
+        """
+        normalized_audio_file = cls._new_spooled_audio_file()
+
+        def normalize():
+            audio_segment = AudioSegment.from_file(audio_file)
+            audio_segment.set_channels(1).set_frame_rate(16000).export(normalized_audio_file, format='mp3')
+
+        try:
+            cls._get_normalization_executor().submit(normalize).result()
+        except Exception:
+            normalized_audio_file.close()
+            raise
+
+        normalized_audio_file.seek(0)
+        return normalized_audio_file
+
+    @staticmethod
+    def _new_spooled_audio_file() -> SpooledAudioFile:
+        # the mp3 file name is kept from before, providers detect the actual format from the content
+        return SpooledAudioFile(
+            max_size=current_app.config['ASR_AUDIO_SPOOL_MAX_SIZE'] * 1024 * 1024,
+            name='temp.mp3'
+        )
+
+    @staticmethod
+    def _get_normalization_executor() -> ThreadPoolExecutor:
+        global _normalization_executor
+        if _normalization_executor is None:
+            with _normalization_executor_lock:
+                if _normalization_executor is None:
+                    _normalization_executor = ThreadPoolExecutor(
+                        max_workers=current_app.config['ASR_AUDIO_NORMALIZATION_MAX_WORKERS'],
+                        thread_name_prefix='asr-audio-normalization'
+                    )
 
-        return {"text": model_instance.invoke_speech2text(file=buffer, user=end_user)}
+        return _normalization_executor
 
     @classmethod
     def transcript_tts(cls, tenant_id: str, text: str, voice: str, streaming: bool, end_user: Optional[str] = None):
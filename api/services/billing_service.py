@@ -1,23 +1,153 @@
+import hmac
+import json
+import logging
 import os
+import time
+from typing import Optional
 
 import requests
+from flask import current_app
 
+from core.helper.background_task_queue import billing_info_refresh_queue
 from extensions.ext_database import db
+from extensions.ext_redis import redis_client
 from models.account import TenantAccountJoin
 
+logger = logging.getLogger(__name__)
+
+# cached billing info is fresh for this many seconds, usage sizes are counted by the billing api
+BILLING_INFO_FRESH_TTL = 60
+# after that it is still served while it is refreshed in the background, until it expires
+BILLING_INFO_STALE_TTL = 600
+# concurrent misses of a tenant wait for the request which fetches the billing info
+BILLING_INFO_FETCH_LOCK_TIMEOUT = 10
+BILLING_INFO_FETCH_WAIT_TIMEOUT = 3
+
 
 class BillingService:
     base_url = os.environ.get('BILLING_API_URL', 'BILLING_API_URL')
     secret_key = os.environ.get('BILLING_API_SECRET_KEY', 'BILLING_API_SECRET_KEY')
 
+    @staticmethod
+    def is_webhook_secret_key_valid(secret_key: str) -> bool:
+        """
+        Check the secret key sent by the billing api to a webhook,
+        webhooks are refused while billing is disabled or no secret key is configured.
+
+        :param secret_key: secret key of the request
+        :return:
+        """
+        configured_secret_key = os.environ.get('BILLING_API_SECRET_KEY')
+        if not current_app.config.get('BILLING_ENABLED') or not configured_secret_key:
+            return False
+
+        return hmac.compare_digest(secret_key.encode('utf-8'), configured_secret_key.encode('utf-8'))
+
     @classmethod
     def get_info(cls, tenant_id: str):
+        """
+        Get billing info of the tenant, cached in redis with stale-while-revalidate.
+
+        :param tenant_id: tenant id
+        :return:
+        """
+        cached_info = cls._get_cached_info(tenant_id)
+        if cached_info:
+            if time.time() - cached_info['fetched_at'] > BILLING_INFO_FRESH_TTL \
+                    and cls._acquire_fetch_lock(tenant_id):
+                billing_info_refresh_queue.submit(cls._refresh_info, tenant_id)
+
+            return cached_info['info']
+
+        if cls._acquire_fetch_lock(tenant_id):
+            return cls._refresh_info(tenant_id)
+
+        # another request is fetching the billing info, wait for it instead of sending the same request
+        deadline = time.time() + BILLING_INFO_FETCH_WAIT_TIMEOUT
+        while time.time() < deadline:
+            time.sleep(0.1)
+            cached_info = cls._get_cached_info(tenant_id)
+            if cached_info:
+                return cached_info['info']
+
+        return cls._fetch_info(tenant_id)
+
+    @classmethod
+    def delete_info_cache(cls, tenant_id: str) -> None:
+        """
+        Delete the cached billing info, must be called when the subscription of the tenant is changed.
+
+        :param tenant_id: tenant id
+        :return:
+        """
+        redis_client.delete(cls._get_info_cache_key(tenant_id))
+
+    @classmethod
+    def mark_info_stale(cls, tenant_id: str) -> None:
+        """
+        Mark the cached billing info as stale after the usage of the tenant is changed,
+        so that the next read still serves it and refreshes it in the background.
+
+        :param tenant_id: tenant id
+        :return:
+        """
+        cache_key = cls._get_info_cache_key(tenant_id)
+        cached_info = cls._get_cached_info(tenant_id)
+        ttl = redis_client.ttl(cache_key)
+        if not cached_info or ttl <= 0:
+            return
+
+        cached_info['fetched_at'] = 0
+        redis_client.setex(cache_key, ttl, json.dumps(cached_info))
+
+    @classmethod
+    def _refresh_info(cls, tenant_id: str):
+        # called with the fetch lock of the tenant acquired
+        try:
+            return cls._fetch_info(tenant_id)
+        finally:
+            redis_client.delete(cls._get_fetch_lock_key(tenant_id))
+
+    @classmethod
+    def _fetch_info(cls, tenant_id: str):
         params = {'tenant_id': tenant_id}
 
         billing_info = cls._send_request('GET', '/subscription/info', params=params)
 
+        # error responses are not cached
+        if isinstance(billing_info, dict) and 'enabled' in billing_info:
+            redis_client.setex(cls._get_info_cache_key(tenant_id), BILLING_INFO_STALE_TTL, json.dumps({
+                'info': billing_info,
+                'fetched_at': time.time()
+            }))
+
         return billing_info
 
+    @classmethod
+    def _get_cached_info(cls, tenant_id: str) -> Optional[dict]:
+        cached_info = redis_client.get(cls._get_info_cache_key(tenant_id))
+        if not cached_info:
+            return None
+
+        try:
+            return json.loads(cached_info)
+        except json.JSONDecodeError:
+            logger.warning(f'invalid cached billing info of tenant {tenant_id}')
+            return None
+
+    @classmethod
+    def _acquire_fetch_lock(cls, tenant_id: str) -> bool:
+        return bool(redis_client.set(cls._get_fetch_lock_key(tenant_id), 1,
+                                     ex=BILLING_INFO_FETCH_LOCK_TIMEOUT, nx=True))
+
+    @staticmethod
+    def _get_info_cache_key(tenant_id: str) -> str:
+        return f"billing_info:tenant_id:{tenant_id}"
+
+    @staticmethod
+    def _get_fetch_lock_key(tenant_id: str) -> str:
+        return f"billing_info_fetch_lock:tenant_id:{tenant_id}"
+
     @classmethod
     def get_subscription(cls, plan: str,
                          interval: str,
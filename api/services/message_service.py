@@ -9,6 +9,7 @@ from extensions.ext_database import db
 from libs.infinite_scroll_pagination import InfiniteScrollPagination
 from models.account import Account
 from models.model import App, AppModelConfig, EndUser, Message, MessageFeedback
+from services.app_statistic_service import AppStatisticService
 from services.conversation_service import ConversationService
 from services.errors.app_model_config import AppModelConfigBrokenError
 from services.errors.conversation import ConversationCompletedError, ConversationNotExistsError
@@ -66,6 +67,7 @@ class MessageService:
                 has_more = True
 
         history_messages = list(reversed(history_messages))
+        Message.preload(history_messages)
 
         return InfiniteScrollPagination(
             data=history_messages,
@@ -158,6 +160,10 @@ class MessageService:
 
         db.session.commit()
 
+        if not rating:
+            # deleted feedbacks are not picked up by the incremental statistics rollup
+            AppStatisticService.mark_stale(message.app_id, message.created_at)
+
         return feedback
 
     @classmethod
@@ -3,6 +3,7 @@ import json
 from flask import current_app
 from httpx import get
 
+from core.helper.tool_runtime_cache import ToolRuntimeCache
 from core.tools.entities.common_entities import I18nObject
 from core.tools.entities.tool_bundle import ApiBasedToolBundle
 from core.tools.entities.tool_entities import (
@@ -402,6 +403,8 @@ class ToolManageService:
             # delete cache
             tool_configuration.delete_tool_credentials_cache()
 
+        ToolRuntimeCache.invalidate(tenant_id)
+
         return { 'result': 'success' }
     
     @staticmethod
@@ -467,6 +470,7 @@ class ToolManageService:
 
         # delete cache
         tool_configuration.delete_tool_credentials_cache()
+        ToolRuntimeCache.invalidate(tenant_id)
 
         return { 'result': 'success' }
     
@@ -492,6 +496,7 @@ class ToolManageService:
         provider_controller = ToolManager.get_builtin_provider(provider_name)
         tool_configuration = ToolConfigurationManager(tenant_id=tenant_id, provider_controller=provider_controller)
         tool_configuration.delete_tool_credentials_cache()
+        ToolRuntimeCache.invalidate(tenant_id)
 
         return { 'result': 'success' }
     
@@ -566,6 +571,9 @@ class ToolManageService:
         db.session.delete(provider)
         db.session.commit()
 
+        # delete cache
+        ToolRuntimeCache.invalidate(tenant_id)
+
         return { 'result': 'success' }
     
     @staticmethod
@@ -0,0 +1,44 @@
+import logging
+import time
+
+import click
+from celery import shared_task
+
+from core.generator.llm_generator import LLMGenerator
+from extensions.ext_database import db
+from models.model import App, Conversation, Message
+
+
+@shared_task(queue='generation')
+def generate_conversation_name_task(conversation_id: str, message_id: str):
+    """
+    Async generate the name of a conversation from its first message
+    :param conversation_id: conversation id
+    :param message_id: first message id
+
+    Usage: generate_conversation_name_task.delay(conversation_id, message_id)
+    """
+    logging.info(click.style('Start generate conversation name: {}'.format(conversation_id), fg='green'))
+    start_at = time.perf_counter()
+
+    conversation = db.session.query(Conversation).filter(Conversation.id == conversation_id).first()
+    message = db.session.query(Message).filter(Message.id == message_id).first()
+    if not conversation or not message:
+        return
+
+    app_model = db.session.query(App).filter(App.id == conversation.app_id).first()
+    if not app_model:
+        return
+
+    try:
+        name = LLMGenerator.generate_conversation_name(app_model.tenant_id, message.query)
+        conversation.name = name
+        db.session.commit()
+    except Exception:
+        logging.exception("generate conversation name failed: {}".format(conversation_id))
+        return
+
+    end_at = time.perf_counter()
+    logging.info(
+        click.style('Generate conversation name {} succeeded: latency: {}'.format(conversation_id, end_at - start_at),
+                    fg='green'))
@@ -0,0 +1,72 @@
+"""
+Benchmark of the stream response serialization of message chunks in GenerateTaskPipeline.
+
+Run from the api directory:
+
+    python -m tests.benchmarks.sse_serialization_benchmark
+"""
+import json
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from core.app_runner.generate_task_pipeline import GenerateTaskPipeline
+
+TOKENS = 200000
+DELTAS = ['Hello', ',', ' world', '!', ' 你好', '世界', ' "quoted"', ' line\n', ' the', ' quick', ' brown', ' fox']
+
+
+def _build_pipeline() -> GenerateTaskPipeline:
+    # only the attributes used by the chunk serialization are set
+    pipeline = GenerateTaskPipeline.__new__(GenerateTaskPipeline)
+    pipeline._application_generate_entity = SimpleNamespace(task_id=str(uuid.uuid4()))
+    pipeline._message = SimpleNamespace(id=str(uuid.uuid4()), created_at=datetime.utcnow())
+    pipeline._conversation = SimpleNamespace(id=str(uuid.uuid4()), mode='chat')
+    pipeline._chunk_envelopes = {}
+    return pipeline
+
+
+def _serialize_chunk_with_dict(pipeline: GenerateTaskPipeline, text: str) -> str:
+    # the serialization before the envelope was precomputed
+    response = {
+        'event': 'message',
+        'id': pipeline._message.id,
+        'task_id': pipeline._application_generate_entity.task_id,
+        'message_id': pipeline._message.id,
+        'answer': text,
+        'created_at': int(pipeline._message.created_at.timestamp())
+    }
+
+    if pipeline._conversation.mode == 'chat':
+        response['conversation_id'] = pipeline._conversation.id
+
+    return "data: " + json.dumps(response) + "\n\n"
+
+
+def _tokens_per_second(serialize) -> float:
+    deltas = [DELTAS[i % len(DELTAS)] for i in range(TOKENS)]
+    started_at = time.perf_counter()
+    for delta in deltas:
+        serialize(delta)
+    return TOKENS / (time.perf_counter() - started_at)
+
+
+def main() -> None:
+    pipeline = _build_pipeline()
+
+    # both serializations must decode to the same event
+    for delta in DELTAS:
+        assert json.loads(pipeline._handle_chunk(delta)[6:]) \
+            == json.loads(_serialize_chunk_with_dict(pipeline, delta)[6:])
+
+    before = _tokens_per_second(lambda text: _serialize_chunk_with_dict(pipeline, text))
+    after = _tokens_per_second(lambda text: pipeline._handle_chunk(text))
+
+    print(f'dict + json.dumps:        {before:>12,.0f} tokens/s')
+    print(f'envelope + orjson.dumps:  {after:>12,.0f} tokens/s')
+    print(f'speedup:                  {after / before:>12.2f}x')
+
+
+if __name__ == '__main__':
+    main()
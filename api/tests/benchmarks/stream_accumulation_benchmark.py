@@ -0,0 +1,106 @@
+"""
+Benchmark of the streaming chunk construction and answer accumulation for 4k token answers.
+
+A streamed answer passes through the provider stream handler, which builds a chunk per delta,
+LargeLanguageModel._invoke_result_generator and GenerateTaskPipeline, which both accumulate the answer.
+
+Run from the api directory:
+
+    python -m tests.benchmarks.stream_accumulation_benchmark
+"""
+import time
+
+from core.model_runtime.entities.llm_entities import LLMResultChunk, LLMResultChunkDelta
+from core.model_runtime.entities.message_entities import (
+    AssistantPromptMessage,
+    PromptMessage,
+    SystemPromptMessage,
+    UserPromptMessage,
+)
+
+ANSWER_TOKENS = 4096
+ROUNDS = 20
+DELTAS = ['Hello', ',', ' world', '!', ' 你好', '世界', ' "quoted"', ' line\n', ' the', ' quick', ' brown', ' fox']
+
+
+def _build_prompt_messages() -> list[PromptMessage]:
+    # a system prompt with some context and a short conversation history
+    prompt_messages: list[PromptMessage] = [SystemPromptMessage(content='You are a helpful assistant. ' * 200)]
+    for i in range(10):
+        prompt_messages.append(UserPromptMessage(content=f'question {i} ' * 20))
+        prompt_messages.append(AssistantPromptMessage(content=f'answer {i} ' * 50))
+
+    prompt_messages.append(UserPromptMessage(content='Tell me a long story.'))
+    return prompt_messages
+
+
+def _stream_with_validation(prompt_messages: list[PromptMessage], deltas: list[str]) -> str:
+    # chunks validated by pydantic and the answer appended to the message content, before the fast path
+    llm_message = AssistantPromptMessage(content='')
+    task_message = AssistantPromptMessage(content='')
+    for index, delta in enumerate(deltas):
+        chunk = LLMResultChunk(
+            model='gpt-3.5-turbo',
+            prompt_messages=prompt_messages,
+            delta=LLMResultChunkDelta(
+                index=index,
+                message=AssistantPromptMessage(content=delta)
+            )
+        )
+
+        llm_message.content += chunk.delta.message.content
+        task_message.content += chunk.delta.message.content
+
+    assert llm_message.content == task_message.content
+    return task_message.content
+
+
+def _stream_with_fast_path(prompt_messages: list[PromptMessage], deltas: list[str]) -> str:
+    # chunks constructed without validation and the answer joined once from list buffers
+    llm_chunks = []
+    task_chunks = []
+    for index, delta in enumerate(deltas):
+        chunk = LLMResultChunk.construct(
+            model='gpt-3.5-turbo',
+            prompt_messages=prompt_messages,
+            delta=LLMResultChunkDelta.construct(
+                index=index,
+                message=AssistantPromptMessage.construct(content=delta)
+            )
+        )
+
+        if chunk.delta.message.content:
+            llm_chunks.append(chunk.delta.message.content)
+        task_chunks.append(chunk.delta.message.content)
+
+    llm_message = AssistantPromptMessage(content=''.join(llm_chunks))
+    task_message = AssistantPromptMessage(content=''.join(task_chunks))
+
+    assert llm_message.content == task_message.content
+    return task_message.content
+
+
+def _tokens_per_second(stream, prompt_messages: list[PromptMessage], deltas: list[str]) -> float:
+    started_at = time.perf_counter()
+    for _ in range(ROUNDS):
+        stream(prompt_messages, deltas)
+    return ANSWER_TOKENS * ROUNDS / (time.perf_counter() - started_at)
+
+
+def main() -> None:
+    prompt_messages = _build_prompt_messages()
+    deltas = [DELTAS[i % len(DELTAS)] for i in range(ANSWER_TOKENS)]
+
+    # both paths must accumulate the same answer
+    assert _stream_with_validation(prompt_messages, deltas) == _stream_with_fast_path(prompt_messages, deltas)
+
+    before = _tokens_per_second(_stream_with_validation, prompt_messages, deltas)
+    after = _tokens_per_second(_stream_with_fast_path, prompt_messages, deltas)
+
+    print(f'validated chunks + str +=:    {before:>12,.0f} tokens/s')
+    print(f'constructed chunks + join:    {after:>12,.0f} tokens/s')
+    print(f'speedup:                      {after / before:>12.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from flask_restful import marshal
+from sqlalchemy import event
+
+from app import app as flask_app
+from extensions.ext_database import db
+from fields.conversation_fields import conversation_fields, conversation_with_summary_fields, message_detail_fields
+from fields.message_fields import message_fields
+from models.model import (
+    AppAnnotationHitHistory,
+    AppModelConfig,
+    Conversation,
+    DatasetRetrieverResource,
+    EndUser,
+    Message,
+    MessageAgentThought,
+    MessageAnnotation,
+    MessageFeedback,
+    MessageFile,
+    UploadFile,
+)
+
+MESSAGES_PER_CONVERSATION = 3
+
+
+@pytest.fixture
+def session():
+    """Rows added by a test are flushed in a transaction which is rolled back afterwards."""
+    with flask_app.app_context(), flask_app.test_request_context():
+        try:
+            yield db.session
+        finally:
+            db.session.rollback()
+            db.session.close()
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _create_conversations(session, app_id: str, count: int) -> None:
+    """
+    Create conversations with every kind of row the page properties are prefetched from:
+    end users, feedbacks, annotations, annotation hit histories, agent thoughts, retriever resources,
+    and message files both uploaded and created by tools.
+    """
+    tenant_id = str(uuid.uuid4())
+    account_id = str(uuid.uuid4())
+
+    app_model_config = AppModelConfig(app_id=app_id, provider='openai', model_id='gpt-3.5-turbo', configs={})
+    session.add(app_model_config)
+    session.flush()
+
+    for i in range(count):
+        end_user = EndUser(tenant_id=tenant_id, app_id=app_id, type='browser', session_id=f'session {i}')
+        session.add(end_user)
+        session.flush()
+
+        conversation = Conversation(
+            app_id=app_id, app_model_config_id=app_model_config.id, model_provider='openai',
+            model_id='gpt-3.5-turbo', mode='chat', name=f'conversation {i}', status='normal',
+            from_source='api', from_end_user_id=end_user.id
+        )
+        session.add(conversation)
+        session.flush()
+
+        for j in range(MESSAGES_PER_CONVERSATION):
+            message = Message(
+                app_id=app_id, model_provider='openai', model_id='gpt-3.5-turbo', conversation_id=conversation.id,
+                query=f'query {j}', message=[], answer=f'answer {j}', message_unit_price=0, answer_unit_price=0,
+                currency='USD', from_source='api', from_end_user_id=end_user.id
+            )
+            session.add(message)
+            session.flush()
+
+            session.add(MessageFeedback(
+                app_id=app_id, conversation_id=conversation.id, message_id=message.id, rating='like',
+                from_source='admin', from_account_id=account_id
+            ))
+            session.add(MessageFeedback(
+                app_id=app_id, conversation_id=conversation.id, message_id=message.id, rating='dislike',
+                from_source='user', from_end_user_id=end_user.id
+            ))
+
+            annotation = MessageAnnotation(
+                app_id=app_id, conversation_id=conversation.id, message_id=message.id, question=f'query {j}',
+                content=f'annotated answer {j}', account_id=account_id
+            )
+            session.add(annotation)
+            session.flush()
+
+            session.add(AppAnnotationHitHistory(
+                app_id=app_id, annotation_id=annotation.id, source='api', question=f'query {j}',
+                account_id=account_id, message_id=message.id, annotation_question=annotation.question,
+                annotation_content=annotation.content
+            ))
+            session.add(MessageAgentThought(
+                message_id=message.id, position=1, thought=f'thought {j}', tool='dalle3', tool_input='{}',
+                observation='done', message_files='[]', created_by_role='end_user', created_by=end_user.id
+            ))
+            session.add(DatasetRetrieverResource(
+                message_id=message.id, position=1, dataset_id=str(uuid.uuid4()), dataset_name='dataset',
+                document_id=str(uuid.uuid4()), document_name='document.txt', data_source_type='upload_file',
+                segment_id=str(uuid.uuid4()), content='segment', retriever_from='api', created_by=end_user.id
+            ))
+
+            upload_file = UploadFile(
+                tenant_id=tenant_id, storage_type='local', key=f'upload_files/{uuid.uuid4()}.png',
+                name='image.png', size=1, extension='png', mime_type='image/png',
+                created_by_role='end_user', created_by=end_user.id
+            )
+            session.add(upload_file)
+            session.flush()
+
+            session.add(MessageFile(
+                message_id=message.id, type='image', transfer_method='local_file', upload_file_id=upload_file.id,
+                belongs_to='user', created_by_role='end_user', created_by=end_user.id
+            ))
+            session.add(MessageFile(
+                message_id=message.id, type='image', transfer_method='tool_file', url=f'{uuid.uuid4()}.png',
+                belongs_to='assistant', created_by_role='end_user', created_by=end_user.id
+            ))
+
+    session.flush()
+    session.expire_all()
+
+
+def _count_conversation_page_queries(session, page_size: int) -> int:
+    app_id = str(uuid.uuid4())
+    _create_conversations(session, app_id, page_size)
+
+    conversations = session.query(Conversation).filter(Conversation.app_id == app_id).all()
+    assert len(conversations) == page_size
+
+    with count_queries() as statements:
+        Conversation.preload(conversations)
+        marshal(conversations, conversation_fields)
+        marshal(conversations, conversation_with_summary_fields)
+
+    return len(statements)
+
+
+def _count_message_page_queries(session, page_size: int) -> int:
+    app_id = str(uuid.uuid4())
+    _create_conversations(session, app_id, page_size // MESSAGES_PER_CONVERSATION)
+
+    messages = session.query(Message).filter(Message.app_id == app_id).all()
+    assert len(messages) == page_size
+
+    with count_queries() as statements:
+        Message.preload(messages)
+        marshal(messages, message_detail_fields)
+        marshal(messages, message_fields)
+
+    # every prefetched path is loaded, so a missing prefetch would show up as a growing query count
+    assert all(message.files and message.agent_thoughts and message.retriever_resources
+               and message.annotation_hit_history for message in messages)
+
+    return len(statements)
+
+
+def test_conversation_page_query_count_is_constant(session):
+    assert _count_conversation_page_queries(session, 2) == _count_conversation_page_queries(session, 10)
+
+
+def test_message_page_query_count_is_constant(session):
+    assert _count_message_page_queries(session, 3) == _count_message_page_queries(session, 30)
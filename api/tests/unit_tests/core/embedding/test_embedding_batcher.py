@@ -0,0 +1,107 @@
+import threading
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+from core.embedding.embedding_batcher import EmbeddingBatcher
+from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage, TextEmbeddingResult
+from core.model_runtime.errors.invoke import InvokeServerUnavailableError
+
+
+class FakeModelInstance:
+    provider = 'openai'
+    model = 'text-embedding-ada-002'
+
+    def __init__(self, error: Optional[Exception] = None) -> None:
+        self.credentials = {'openai_api_key': 'key'}
+        self.error = error
+        self.calls: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def invoke_text_embedding(self, texts: list[str], user: Optional[str] = None) -> TextEmbeddingResult:
+        with self._lock:
+            self.calls.append(texts)
+
+        if self.error is not None:
+            raise self.error
+
+        return TextEmbeddingResult(
+            model=self.model,
+            embeddings=[[float(ord(text[0])), float(len(text))] for text in texts],
+            usage=EmbeddingUsage(
+                tokens=len(texts),
+                total_tokens=len(texts),
+                unit_price=Decimal('0'),
+                price_unit=Decimal('0'),
+                total_price=Decimal('0'),
+                currency='USD',
+                latency=0.0
+            )
+        )
+
+
+def _embed_concurrently(batcher: EmbeddingBatcher, model_instance: FakeModelInstance,
+                        texts: list[str]) -> list:
+    """
+    Embed each text from its own thread, all threads calling the batcher at the same time.
+    """
+    barrier = threading.Barrier(len(texts))
+    results: list = [None] * len(texts)
+
+    def embed(index: int) -> None:
+        barrier.wait()
+        try:
+            results[index] = batcher.embed(model_instance, texts[index], max_wait=5, max_batch_size=len(texts))
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=embed, args=(index,)) for index in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    return results
+
+
+def test_concurrent_texts_are_embedded_with_one_call():
+    model_instance = FakeModelInstance()
+    texts = ['apple', 'banana', 'apple', 'cherry']
+
+    results = _embed_concurrently(EmbeddingBatcher(), model_instance, texts)
+
+    assert len(model_instance.calls) == 1
+    # the duplicated text is only embedded once
+    assert sorted(model_instance.calls[0]) == ['apple', 'banana', 'cherry']
+
+    for text, result in zip(texts, results):
+        assert isinstance(result, TextEmbeddingResult)
+        assert result.embeddings == [[float(ord(text[0])), float(len(text))]]
+        assert result.usage.tokens == 3
+
+
+def test_error_is_raised_to_every_caller():
+    error = InvokeServerUnavailableError('provider is down')
+    model_instance = FakeModelInstance(error=error)
+
+    results = _embed_concurrently(EmbeddingBatcher(), model_instance, ['apple', 'banana', 'cherry'])
+
+    assert len(model_instance.calls) == 1
+    assert all(result is error for result in results)
+
+
+def test_single_text_batch_is_not_batched():
+    model_instance = FakeModelInstance()
+
+    result = EmbeddingBatcher().embed(model_instance, 'apple', max_batch_size=1)
+
+    assert model_instance.calls == [['apple']]
+    assert result.embeddings == [[float(ord('a')), float(len('apple'))]]
+
+
+def test_error_of_single_text_is_raised():
+    model_instance = FakeModelInstance(error=InvokeServerUnavailableError('provider is down'))
+
+    with pytest.raises(InvokeServerUnavailableError):
+        EmbeddingBatcher().embed(model_instance, 'apple', max_batch_size=2, max_wait=0.01)
@@ -0,0 +1,124 @@
+import asyncio
+import gc
+import os
+
+from core.model_runtime.utils import client_pool
+from core.model_runtime.utils.client_pool import AsyncClientPool, ClientPool, model_client_pool
+
+
+def test_get_client_reuses_client_of_same_credentials():
+    pool = ClientPool()
+
+    client = pool.get_client('openai', {'api_key': 'a'}, object)
+
+    assert pool.get_client('openai', {'api_key': 'a'}, object) is client
+    assert pool.get_client('openai', {'api_key': 'b'}, object) is not client
+    assert pool.get_client('openai_requests', {'api_key': 'a'}, object) is not client
+
+    metrics = pool.get_metrics()
+    assert metrics['clients'] == 3
+    assert metrics['providers']['openai'] == {'hits': 1, 'misses': 2, 'evictions': 0, 'clients': 2}
+
+
+def test_least_recently_used_client_is_evicted():
+    pool = ClientPool(max_clients=2)
+
+    first = pool.get_client('openai', {'api_key': 'a'}, object)
+    second = pool.get_client('openai', {'api_key': 'b'}, object)
+    # using the first client makes the second one the least recently used
+    pool.get_client('openai', {'api_key': 'a'}, object)
+    pool.get_client('openai', {'api_key': 'c'}, object)
+
+    assert pool.get_client('openai', {'api_key': 'a'}, object) is first
+    assert pool.get_client('openai', {'api_key': 'b'}, object) is not second
+    assert pool.get_metrics()['providers']['openai']['evictions'] == 2
+
+
+def test_idle_client_is_evicted(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(client_pool.time, 'monotonic', lambda: now)
+    pool = ClientPool(idle_timeout=60)
+
+    idle = pool.get_client('openai', {'api_key': 'a'}, object)
+    active = pool.get_client('openai', {'api_key': 'b'}, object)
+
+    now += 45
+    assert pool.get_client('openai', {'api_key': 'b'}, object) is active
+
+    now += 45
+    assert pool.get_client('openai', {'api_key': 'b'}, object) is active
+    assert pool.get_client('openai', {'api_key': 'a'}, object) is not idle
+
+    metrics = pool.get_metrics()
+    assert metrics['clients'] == 2
+    assert metrics['providers']['openai']['evictions'] == 1
+
+
+def test_clear_drops_clients_and_metrics():
+    pool = ClientPool()
+    client = pool.get_client('openai', {'api_key': 'a'}, object)
+
+    pool.clear()
+
+    assert pool.get_metrics() == {'clients': 0, 'providers': {}}
+    assert pool.get_client('openai', {'api_key': 'a'}, object) is not client
+
+
+def test_forked_process_does_not_inherit_clients():
+    model_client_pool.get_client('openai', {'api_key': 'a'}, object)
+    try:
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            os.write(write_fd, str(model_client_pool.get_metrics()['clients']).encode())
+            os._exit(0)
+
+        os.close(write_fd)
+        child_clients = int(os.read(read_fd, 16).decode())
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+
+        assert child_clients == 0
+        assert model_client_pool.get_metrics()['clients'] == 1
+    finally:
+        model_client_pool.clear()
+
+
+class FakeAsyncClient:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def test_async_clients_are_not_shared_between_loops():
+    pool = AsyncClientPool()
+
+    async def get_clients():
+        return (pool.get_client('https://api.openai.com', FakeAsyncClient),
+                pool.get_client('https://api.openai.com', FakeAsyncClient))
+
+    first, again = asyncio.run(get_clients())
+    gc.collect()
+    second, _ = asyncio.run(get_clients())
+
+    assert first is again
+    assert second is not first
+    assert pool.get_metrics()['loops'] <= 1
+
+
+def test_evicted_async_client_is_closed():
+    pool = AsyncClientPool(max_clients_per_loop=1)
+
+    async def get_clients():
+        evicted = pool.get_client('https://api.openai.com', FakeAsyncClient)
+        pool.get_client('https://api.anthropic.com', FakeAsyncClient)
+        await asyncio.sleep(0)
+        return evicted
+
+    evicted = asyncio.run(get_clients())
+
+    assert evicted.closed
+    assert pool.get_metrics()['evictions'] == 1
@@ -0,0 +1,219 @@
+import pytest
+
+from core.model_runtime.errors.invoke import (
+    InvokeBadRequestError,
+    InvokeCircuitOpenError,
+    InvokeConcurrencyLimitError,
+    InvokeServerUnavailableError,
+)
+from core.model_runtime.utils import provider_health
+from core.model_runtime.utils.provider_health import ProviderHealth, ProviderHealthStream, ProviderHealthTracker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = {'now': 1000.0}
+    monkeypatch.setattr(provider_health.time, 'monotonic', lambda: clock['now'])
+    return clock
+
+
+def _fail(health: ProviderHealth) -> None:
+    is_trial = health.acquire()
+    health.release(is_trial, InvokeServerUnavailableError('unavailable'))
+
+
+def _succeed(health: ProviderHealth) -> None:
+    is_trial = health.acquire()
+    health.release(is_trial)
+
+
+def test_consecutive_failures_open_the_circuit(clock):
+    health = ProviderHealth(failure_threshold=3, recovery_timeout=30)
+
+    _fail(health)
+    _fail(health)
+    _succeed(health)
+    _fail(health)
+    _fail(health)
+    assert health.get_state()['state'] == 'closed'
+
+    _fail(health)
+    assert health.get_state()['state'] == 'open'
+    assert health.get_state()['retry_after'] == 30
+
+    with pytest.raises(InvokeCircuitOpenError):
+        health.acquire()
+    assert health.get_state()['rejections'] == 1
+
+
+def test_successful_trial_closes_the_circuit(clock):
+    health = ProviderHealth(failure_threshold=1, recovery_timeout=30)
+    _fail(health)
+
+    clock['now'] += 31
+    assert health.acquire() is True
+    assert health.get_state()['state'] == 'half_open'
+
+    # only the trial invoke is let through
+    with pytest.raises(InvokeCircuitOpenError):
+        health.acquire()
+
+    health.release(True)
+    assert health.get_state()['state'] == 'closed'
+    assert health.acquire() is False
+
+
+def test_failed_trial_opens_the_circuit_again(clock):
+    health = ProviderHealth(failure_threshold=3, recovery_timeout=30)
+    for _ in range(3):
+        _fail(health)
+
+    clock['now'] += 31
+    is_trial = health.acquire()
+    health.release(is_trial, InvokeServerUnavailableError('unavailable'))
+
+    state = health.get_state()
+    assert state['state'] == 'open'
+    assert state['retry_after'] == 30
+    assert state['in_flight'] == 0
+
+
+def test_trial_which_does_not_reach_the_provider_is_retried(clock):
+    health = ProviderHealth(failure_threshold=1, recovery_timeout=30)
+    _fail(health)
+
+    clock['now'] += 31
+    is_trial = health.acquire()
+    health.release(is_trial, ValueError('invalid arguments'))
+
+    assert health.get_state()['state'] == 'half_open'
+    assert health.acquire() is True
+
+
+def test_answered_errors_are_successes():
+    health = ProviderHealth(failure_threshold=1)
+
+    is_trial = health.acquire()
+    health.release(is_trial, InvokeBadRequestError('bad request'))
+
+    state = health.get_state()
+    assert state['state'] == 'closed'
+    assert state['successes'] == 1
+    assert state['failures'] == 0
+
+
+def test_concurrency_limit_rejects_invokes_beyond_the_limit():
+    health = ProviderHealth(max_concurrency=2)
+
+    health.acquire()
+    health.acquire()
+    with pytest.raises(InvokeConcurrencyLimitError):
+        health.acquire()
+
+    health.release(False)
+    health.acquire()
+    assert health.get_state()['in_flight'] == 2
+
+
+def test_concurrency_limit_is_halved_by_failures_and_raised_by_successes():
+    health = ProviderHealth(failure_threshold=100, max_concurrency=8)
+
+    _fail(health)
+    assert health.get_state()['concurrency_limit'] == 4
+    _fail(health)
+    assert health.get_state()['concurrency_limit'] == 2
+
+    # additive increase, one per limit successful invokes
+    _succeed(health)
+    _succeed(health)
+    assert health.get_state()['concurrency_limit'] == 2
+    _succeed(health)
+    assert health.get_state()['concurrency_limit'] == 3
+
+    for _ in range(100):
+        _succeed(health)
+    assert health.get_state()['concurrency_limit'] == 8
+
+    for _ in range(10):
+        _fail(health)
+    assert health.get_state()['concurrency_limit'] == 1
+
+
+def _stream():
+    yield 'a'
+    yield 'b'
+
+
+def _failing_stream():
+    yield 'a'
+    raise InvokeServerUnavailableError('unavailable')
+
+
+def test_stream_holds_the_slot_until_exhausted():
+    health = ProviderHealth()
+    stream = ProviderHealthStream(health, health.acquire(), _stream())
+
+    assert next(stream) == 'a'
+    assert health.get_state()['in_flight'] == 1
+
+    assert list(stream) == ['b']
+    assert health.get_state()['in_flight'] == 0
+    assert health.get_state()['successes'] == 1
+
+
+def test_stream_error_is_recorded():
+    health = ProviderHealth()
+    stream = ProviderHealthStream(health, health.acquire(), _failing_stream())
+
+    with pytest.raises(InvokeServerUnavailableError):
+        list(stream)
+
+    assert health.get_state()['in_flight'] == 0
+    assert health.get_state()['failures'] == 1
+
+
+def test_stream_releases_the_slot_once():
+    health = ProviderHealth()
+    stream = ProviderHealthStream(health, health.acquire(), _stream())
+
+    next(stream)
+    stream.close()
+    stream.close()
+    del stream
+
+    assert health.get_state()['in_flight'] == 0
+    assert health.get_state()['successes'] == 1
+
+
+def test_stream_which_is_never_started_releases_the_slot():
+    health = ProviderHealth()
+    stream = ProviderHealthStream(health, health.acquire(), _stream())
+    assert health.get_state()['in_flight'] == 1
+
+    del stream
+
+    assert health.get_state()['in_flight'] == 0
+
+
+def test_tracker_keeps_one_health_per_credentials():
+    tracker = ProviderHealthTracker(max_tracked_credentials=2)
+
+    health = tracker.get_health('openai', {'api_key': 'a'})
+    assert tracker.get_health('openai', {'api_key': 'a'}) is health
+    tracker.get_health('openai', {'api_key': 'b'})
+    tracker.get_health('openai', {'api_key': 'c'})
+
+    assert len(tracker.get_states()) == 2
+    assert tracker.get_health('openai', {'api_key': 'a'}) is not health
+
+
+def test_stream_collected_while_the_lock_is_held_does_not_deadlock():
+    health = ProviderHealth()
+    stream = ProviderHealthStream(health, health.acquire(), _stream())
+
+    # the garbage collector may finalize the stream in a thread which holds the lock
+    with health._lock:
+        del stream
+
+    assert health.get_state()['in_flight'] == 0
+    assert health.acquire() is False